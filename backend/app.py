@@ -1,63 +1,289 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, current_app, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
-from flask_migrate import Migrate
-from models import db, Campaign, AdGroup
+from sqlalchemy import delete, func, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from models import db, Campaign, AdGroup, Keyword, PublishJob, CampaignRemoteState, CampaignDailyMetric, SyncState, ScheduleRun
 from config import Config
-from google_ads_service import GoogleAdsService
-from datetime import datetime
+from extensions import ads_service, response_cache, publish_queue, remote_sync, scheduler
+from serializers import FastJSONProvider, select_fields, rows_to_dicts, iter_ndjson, iter_csv
+from keywords import MATCH_TYPES, normalize_keyword, parse_keywords, format_keywords
+import campaign_summary
+import extensions
+import instrumentation
+import replicas
+from datetime import datetime, timedelta
+from collections import Counter
 import traceback
 import random
+import base64
+import click
+import json
+import uuid
 
-app = Flask(__name__)
-app.config.from_object(Config)
-CORS(app)
+# Every route and CLI command; create_app() registers it on the app
+api = Blueprint('api', __name__, cli_group=None)
 
-db.init_app(app)
-migrate = Migrate(app, db)
-ads_service = GoogleAdsService(Config())
-
-with app.app_context():
-    db.create_all()
+def cached_json(scope, key, build):
+    """Serve build()'s JSON from response_cache with a strong ETag, answering 304 when
+    the client's If-None-Match already has it. Write paths must invalidate `scope`; clients
+    pinned to the primary after a write (see replicas.py) rebuild rather than risk an entry
+    read from a lagging replica, and replica reads aren't stored until the scope's last write
+    is older than the pin window."""
+    settle_seconds = current_app.config.get('REPLICA_PIN_SECONDS', 0) if replicas.from_replica() else 0
+    body, etag = response_cache.get_or_build(scope, key, build, lambda data: current_app.json.dumps(data) + '\n',
+                                             refresh=replicas.pinned(), settle_seconds=settle_seconds)
+    if request.if_none_match.contains(etag):
+        response_cache.record_not_modified()
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response
 
 # ============================================
 # CAMPAIGN ENDPOINTS
 # ============================================
 
-@app.route('/api/campaigns', methods=['POST'])
+def parse_campaign(data):
+    """Validate a campaign payload and return column values for a new DRAFT campaign.
+    Raises ValueError with a client-facing message on invalid input."""
+    if not isinstance(data, dict):
+        raise ValueError('Campaign must be a JSON object')
+
+    required_fields = ['name', 'objective', 'daily_budget', 'start_date', 'end_date']
+    for field in required_fields:
+        if field not in data:
+            raise ValueError(f'Missing field: {field}')
+
+    try:
+        start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
+        end_date = datetime.strptime(data['end_date'], '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError('Invalid date format. Use YYYY-MM-DD')
+
+    return dict(
+        name=data['name'],
+        objective=data['objective'],
+        campaign_type=data.get('campaign_type', 'Demand Gen'),
+        daily_budget=data['daily_budget'],
+        target_cpa=data.get('target_cpa'),
+        bidding_strategy=data.get('bidding_strategy', 'MAXIMIZE_CONVERSIONS'),
+        start_date=start_date,
+        end_date=end_date,
+        ad_group_name=data.get('ad_group_name'),
+        ad_headline=data.get('ad_headline'),
+        ad_description=data.get('ad_description'),
+        asset_url=data.get('asset_url'),
+        status='DRAFT'
+    )
+
+
+def parse_ad_group(data, campaign_id):
+    """Validate an ad group payload and return column values for a new ad group.
+    Raises ValueError with a client-facing message on invalid input."""
+    if not isinstance(data, dict):
+        raise ValueError('Ad group must be a JSON object')
+
+    if 'name' not in data:
+        raise ValueError('Missing field: name')
+
+    keywords = parse_keywords(data.get('keywords'))
+
+    return dict(
+        campaign_id=campaign_id,
+        name=data['name'],
+        status=data.get('status', 'ENABLED'),
+        target_audience=data.get('target_audience'),
+        keywords=format_keywords(keywords),
+        keyword_items=[dict(keyword, campaign_id=campaign_id) for keyword in keywords],
+        cpc_bid=data.get('cpc_bid'),
+        cpm_bid=data.get('cpm_bid'),
+        ad_headline=data.get('ad_headline'),
+        ad_headline_2=data.get('ad_headline_2'),
+        ad_headline_3=data.get('ad_headline_3'),
+        ad_description=data.get('ad_description'),
+        ad_description_2=data.get('ad_description_2'),
+        final_url=data.get('final_url'),
+        display_url=data.get('display_url')
+    )
+
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+IN_CLAUSE_CHUNK_SIZE = 5000
+
+
+def chunked(items, size=IN_CLAUSE_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# Ad group fields clients may change with PUT / PATCH; other keys in the body are ignored
+AD_GROUP_UPDATABLE_FIELDS = (
+    'name', 'status', 'target_audience', 'keywords', 'cpc_bid', 'cpm_bid', 'ad_headline',
+    'ad_headline_2', 'ad_headline_3', 'ad_description', 'ad_description_2', 'final_url',
+    'display_url'
+)
+
+
+def parse_ad_group_changes(data):
+    """Validate an ad group update payload. Returns (column values, parsed keywords or None
+    when keywords are not being changed). Raises ValueError with a client-facing message."""
+    if not isinstance(data, dict):
+        raise ValueError('Ad group changes must be a JSON object')
+
+    values = {field: data[field] for field in AD_GROUP_UPDATABLE_FIELDS if field in data}
+    if 'name' in values and not values['name']:
+        raise ValueError('name cannot be empty')
+
+    keywords = None
+    if 'keywords' in values:
+        keywords = parse_keywords(values['keywords'])
+        values['keywords'] = format_keywords(keywords)
+    return values, keywords
+
+
+def parse_version(value):
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError('version must be an integer')
+    return value
+
+
+def update_ad_groups(ids, values, keywords=None, versions=None, fields=AdGroup.SERIALIZABLE_FIELDS):
+    """
+    Write `values` to the given ad groups and bump their version, with one UPDATE ...
+    RETURNING per IN-clause chunk. With `versions` ({id: version}) only rows still at that
+    version are updated. When `keywords` is given, the keyword rows of the updated ad
+    groups are replaced too; a keyword without a cpc_bid keeps the bid stored for the
+    same text and match type. Returns the updated rows as dicts of `fields` (which must
+    include id and campaign_id); the caller commits.
+    """
+    rows = []
+    for chunk in chunked(ids):
+        if versions is None:
+            condition = AdGroup.id.in_(chunk)
+        else:
+            condition = tuple_(AdGroup.id, AdGroup.version).in_([(i, versions[i]) for i in chunk])
+        result = db.session.execute(
+            update(AdGroup)
+            .where(condition)
+            .values(**values, version=AdGroup.version + 1)
+            .returning(*[getattr(AdGroup, field) for field in fields])
+            .execution_options(synchronize_session=False)
+        )
+        rows.extend(rows_to_dicts(result, fields))
+
+    if keywords is not None and rows:
+        # Keywords sent without a bid (e.g. as plain text) keep the one stored for them
+        stored_bids = {}
+        for chunk in chunked([row['id'] for row in rows]):
+            if any(keyword['cpc_bid'] is None for keyword in keywords):
+                stored_bids.update(
+                    ((ad_group_id, normalized_text, match_type), cpc_bid)
+                    for ad_group_id, normalized_text, match_type, cpc_bid in db.session.execute(
+                        select(Keyword.ad_group_id, Keyword.normalized_text, Keyword.match_type, Keyword.cpc_bid)
+                        .where(Keyword.ad_group_id.in_(chunk), Keyword.cpc_bid.isnot(None))
+                    )
+                )
+            db.session.execute(delete(Keyword).where(Keyword.ad_group_id.in_(chunk)))
+        keyword_rows = [
+            dict(keyword, id=uuid.uuid4(), ad_group_id=row['id'], campaign_id=row['campaign_id'], created_at=datetime.utcnow(),
+                 cpc_bid=keyword['cpc_bid'] if keyword['cpc_bid'] is not None
+                 else stored_bids.get((row['id'], keyword['normalized_text'], keyword['match_type'])))
+            for row in rows for keyword in keywords
+        ]
+        for start in range(0, len(keyword_rows), current_app.config['BULK_INSERT_CHUNK_SIZE']):
+            db.session.execute(insert(Keyword), keyword_rows[start:start + current_app.config['BULK_INSERT_CHUNK_SIZE']])
+    return rows
+
+
+def read_batch_items():
+    """Items of a batch request body: a JSON array, or NDJSON (one object per line)
+    when sent as application/x-ndjson. Returns (items, errors)."""
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        items, errors = [], []
+        for line_no, line in enumerate(request.get_data(as_text=True).splitlines()):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                errors.append({'index': len(items), 'line': line_no + 1, 'error': 'Invalid JSON'})
+                items.append(None)
+        return items, errors
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        return None, [{'error': 'Request body must be a JSON array or NDJSON'}]
+    return data, []
+
+
+def bulk_insert(model, rows, children=None, on_chunk=None):
+    """Insert rows with executemany-style bulk INSERTs, one transaction per chunk.
+
+    `children` is an optional (key, child model, foreign key) triple: each row's list of
+    child rows under `key` is inserted in the same transaction as the row itself.
+    `on_chunk(chunk)` is called after each chunk is inserted, inside its transaction."""
+    chunk_size = current_app.config['BULK_INSERT_CHUNK_SIZE']
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        child_rows = []
+        if children:
+            key, child_model, foreign_key = children
+            for row in chunk:
+                for child in row.pop(key):
+                    child_rows.append(dict(child, id=uuid.uuid4(), created_at=row['created_at'], **{foreign_key: row['id']}))
+        db.session.execute(insert(model), chunk)
+        if child_rows:
+            db.session.execute(insert(child_model), child_rows)
+        if on_chunk:
+            on_chunk(chunk)
+        db.session.commit()
+
+
+def create_batch(model, parse, children=None, on_chunk=None):
+    """Shared body of the :batch endpoints. Every item is validated up front; if any
+    fail, nothing is written and all per-item errors are returned."""
+    items, errors = read_batch_items()
+    if items is None:
+        return jsonify({'errors': errors}), 400
+    if len(items) > current_app.config['BULK_MAX_ITEMS']:
+        return jsonify({'error': f"Batch exceeds {current_app.config['BULK_MAX_ITEMS']} items"}), 413
+
+    rows = []
+    for index, item in enumerate(items):
+        if item is None:
+            continue
+        try:
+            row = parse(item)
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+            continue
+        row['id'] = uuid.uuid4()
+        row['created_at'] = datetime.utcnow()
+        rows.append(row)
+
+    if errors:
+        return jsonify({'errors': sorted(errors, key=lambda e: e['index'])}), 400
+
+    bulk_insert(model, rows, children, on_chunk)
+    return jsonify({'created': len(rows), 'ids': [str(row['id']) for row in rows]}), 201
+
+
+@api.route('/api/campaigns', methods=['POST'])
 def create_campaign():
     try:
-        data = request.json
-        
-        # Validation
-        required_fields = ['name', 'objective', 'daily_budget', 'start_date', 'end_date']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing field: {field}'}), 400
-        
-        # Date parsing
         try:
-            start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
-            end_date = datetime.strptime(data['end_date'], '%Y-%m-%d').date()
-        except ValueError:
-            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+            values = parse_campaign(request.json)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
 
-        campaign = Campaign(
-            name=data['name'],
-            objective=data['objective'],
-            campaign_type=data.get('campaign_type', 'Demand Gen'),
-            daily_budget=data['daily_budget'],
-            target_cpa=data.get('target_cpa'),
-            bidding_strategy=data.get('bidding_strategy', 'MAXIMIZE_CONVERSIONS'),
-            start_date=start_date,
-            end_date=end_date,
-            ad_group_name=data.get('ad_group_name'),
-            ad_headline=data.get('ad_headline'),
-            ad_description=data.get('ad_description'),
-            asset_url=data.get('asset_url'),
-            status='DRAFT'
-        )
+        campaign = Campaign(**values)
         
         db.session.add(campaign)
+        db.session.flush()
+        campaign_summary.add_campaigns([campaign.id])
         db.session.commit()
         
         return jsonify(campaign.to_dict()), 201
@@ -66,56 +292,188 @@ def create_campaign():
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/campaigns', methods=['GET'])
+@api.route('/api/campaigns:batch', methods=['POST'])
+def create_campaigns_batch():
+    """Create many DRAFT campaigns in one request (JSON array or NDJSON body)"""
+    try:
+        return create_batch(Campaign, parse_campaign,
+                            on_chunk=lambda chunk: campaign_summary.add_campaigns(row['id'] for row in chunk))
+    except Exception as e:
+        db.session.rollback()
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+CAMPAIGN_PAGE_SIZE = 50
+CAMPAIGN_MAX_PAGE_SIZE = 500
+CAMPAIGN_FILTERS = ('status', 'objective', 'campaign_type')
+
+
+def encode_cursor(created_at, campaign_id):
+    """Opaque keyset cursor pointing just past the campaign at (created_at, campaign_id)."""
+    raw = f"{created_at.isoformat()}|{campaign_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    created_at, campaign_id = raw.split('|')
+    return datetime.fromisoformat(created_at), uuid.UUID(campaign_id)
+
+
+@api.route('/api/campaigns', methods=['GET'])
+@replicas.read_only
 def get_campaigns():
+    """List campaigns newest first, one keyset page at a time.
+
+    Query params: limit, cursor (from the X-Next-Cursor response header),
+    status / objective / campaign_type (comma-separated values), and
+    fields (comma-separated subset of Campaign.SERIALIZABLE_FIELDS).
+    """
+    try:
+        try:
+            limit = min(int(request.args.get('limit', CAMPAIGN_PAGE_SIZE)), CAMPAIGN_MAX_PAGE_SIZE)
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        if limit < 1:
+            return jsonify({'error': 'limit must be positive'}), 400
+
+        fields = list(Campaign.SERIALIZABLE_FIELDS)
+        if request.args.get('fields'):
+            fields = request.args['fields'].split(',')
+            unknown = set(fields) - set(Campaign.SERIALIZABLE_FIELDS)
+            if unknown:
+                return jsonify({'error': f"Unknown fields: {', '.join(sorted(unknown))}"}), 400
+
+        # created_at and id are always selected (after the requested fields) for the next cursor
+        columns = fields + [f for f in ('created_at', 'id') if f not in fields]
+        query = select_fields(Campaign, columns)
+
+        for name in CAMPAIGN_FILTERS:
+            if request.args.get(name):
+                query = query.where(getattr(Campaign, name).in_(request.args[name].split(',')))
+
+        if request.args.get('cursor'):
+            try:
+                created_at, campaign_id = decode_cursor(request.args['cursor'])
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            query = query.where(tuple_(Campaign.created_at, Campaign.id) < tuple_(created_at, campaign_id))
+
+        query = query.order_by(Campaign.created_at.desc(), Campaign.id.desc()).limit(limit + 1)
+        rows = db.session.execute(query).all()
+
+        # zip() stops at len(fields), dropping the cursor-only columns
+        response = jsonify(rows_to_dicts(rows[:limit], fields))
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            response.headers['X-Next-Cursor'] = encode_cursor(last[columns.index('created_at')], last[columns.index('id')])
+        return response, 200
+    except Exception as e:
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/campaigns/summary', methods=['GET'])
+@replicas.read_only
+def get_campaign_summary():
+    """Dashboard totals: campaigns, daily budget and ad groups overall and by status, objective
+    and bidding strategy. Read from the campaign_summary table, not aggregated per request."""
     try:
-        campaigns = Campaign.query.order_by(Campaign.created_at.desc()).all()
-        return jsonify([c.to_dict() for c in campaigns]), 200
+        return jsonify(campaign_summary.summarize()), 200
     except Exception as e:
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/campaigns/<uuid:id>', methods=['GET'])
+@api.cli.command('rebuild-campaign-summary')
+def rebuild_campaign_summary():
+    """Recompute the campaign_summary table from the campaigns and ad groups tables."""
+    campaign_summary.rebuild()
+    print('Rebuilt campaign_summary')
+
+@api.route('/api/campaigns/<uuid:id>', methods=['GET'])
+@replicas.read_only
 def get_campaign(id):
     try:
-        campaign = Campaign.query.get_or_404(id)
-        result = campaign.to_dict()
-        result['ad_groups'] = [ag.to_dict() for ag in campaign.ad_groups]
-        return jsonify(result), 200
+        def build():
+            campaign = Campaign.query.get_or_404(id)
+            result = campaign.to_dict()
+            ad_groups = db.session.execute(select_fields(AdGroup).where(AdGroup.campaign_id == id))
+            result['ad_groups'] = rows_to_dicts(ad_groups, AdGroup.SERIALIZABLE_FIELDS)
+            return result
+
+        return cached_json(id, 'campaign', build)
     except Exception as e:
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/campaigns/<uuid:id>/publish', methods=['POST'])
+# Header clients send to make a publish request safe to retry
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+@api.route('/api/campaigns/<uuid:id>/publish', methods=['POST'])
 def publish_campaign(id):
+    """Queue the campaign for publishing; poll GET /api/publish-jobs/<job_id> for the outcome.
+    Repeating the request with the same Idempotency-Key header returns the original job."""
     try:
+        idempotency_key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if idempotency_key:
+            if len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+                return jsonify({'error': f'{IDEMPOTENCY_KEY_HEADER} is limited to {IDEMPOTENCY_KEY_MAX_LENGTH} characters'}), 400
+            job = PublishJob.query.filter_by(idempotency_key=idempotency_key).first()
+            if job is not None:
+                return publish_job_response(job, id)
+
         campaign = Campaign.query.get_or_404(id)
         
-        if campaign.status == 'PUBLISHED':
+        if campaign.status in ('SCHEDULED', 'PUBLISHED', 'PAUSED', 'ENDED'):
             return jsonify({'message': 'Campaign already published', 'google_id': campaign.google_campaign_id}), 200
 
-        # Prepare data for Google Ads
-        campaign_data = campaign.to_dict()
-        
-        # Call Google Ads Service
-        try:
-            google_id = ads_service.publish_campaign(campaign_data)
-        except Exception as ads_error:
-            # Re-raise to be caught by outer block or handle specific generic errors
-             return jsonify({'error': f"Google Ads API Error: {str(ads_error)}"}), 500
-        
-        # Update Local DB
-        campaign.google_campaign_id = google_id
-        campaign.status = 'PUBLISHED'
-        db.session.commit()
-        
-        return jsonify(campaign.to_dict()), 200
+        # DRAFT -> PUBLISHING claims the campaign: of concurrent requests only one matches,
+        # and the others get its job back below
+        claimed = Campaign.query.filter_by(id=id, status='DRAFT').update({'status': 'PUBLISHING'}, synchronize_session=False)
+        if claimed:
+            campaign_summary.move_campaigns([id], 'DRAFT')
+            job = PublishJob(campaign_id=id, status='PENDING', idempotency_key=idempotency_key)
+            db.session.add(job)
+            response_cache.invalidate(id)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another request took this Idempotency-Key meanwhile
+                db.session.rollback()
+                return publish_job_response(PublishJob.query.filter_by(idempotency_key=idempotency_key).one(), id)
+            publish_queue.submit(job.id)
+            return jsonify(job.to_dict()), 202
+
+        db.session.rollback()
+        job = PublishJob.query.filter(
+            PublishJob.campaign_id == id, PublishJob.status.in_(['PENDING', 'RUNNING'])
+        ).order_by(PublishJob.created_at.desc()).first()
+        if job is None:
+            # Lost the claim to a publish that has finished since
+            return jsonify({'message': 'Campaign already published', 'google_id': campaign.google_campaign_id}), 200
+        return jsonify(job.to_dict()), 202
         
     except Exception as e:
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/campaigns/<uuid:id>/pause', methods=['POST'])
+def publish_job_response(job, campaign_id):
+    """The response for a publish request whose Idempotency-Key already belongs to `job`."""
+    if job.campaign_id != campaign_id:
+        return jsonify({'error': f'{IDEMPOTENCY_KEY_HEADER} was already used for another campaign'}), 422
+    return jsonify(job.to_dict()), 202 if job.status in ('PENDING', 'RUNNING') else 200
+
+@api.route('/api/publish-jobs/<uuid:id>', methods=['GET'])
+def get_publish_job(id):
+    """Get the state of a publish job"""
+    try:
+        job = PublishJob.query.get_or_404(id)
+        return jsonify(job.to_dict()), 200
+    except Exception as e:
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/campaigns/<uuid:id>/pause', methods=['POST'])
 def pause_campaign(id):
     try:
         campaign = Campaign.query.get_or_404(id)
@@ -129,8 +487,11 @@ def pause_campaign(id):
         except Exception as ads_error:
             return jsonify({'error': f"Google Ads API Error: {str(ads_error)}"}), 500
         
-        # Update Local DB
-        campaign.status = 'PAUSED'
+        # Update Local DB (conditionally, so a concurrent pause isn't counted twice)
+        paused = Campaign.query.filter_by(id=id, status='PUBLISHED').update({'status': 'PAUSED'}, synchronize_session=False)
+        if paused:
+            campaign_summary.move_campaigns([id], 'PUBLISHED')
+        response_cache.invalidate(id)
         db.session.commit()
         
         return jsonify(campaign.to_dict()), 200
@@ -144,46 +505,41 @@ def pause_campaign(id):
 # AD GROUP ENDPOINTS
 # ============================================
 
-@app.route('/api/campaigns/<uuid:campaign_id>/ad-groups', methods=['GET'])
+@api.route('/api/campaigns/<uuid:campaign_id>/ad-groups', methods=['GET'])
+@replicas.read_only
 def get_ad_groups(campaign_id):
     """Get all ad groups for a campaign"""
     try:
-        campaign = Campaign.query.get_or_404(campaign_id)
-        ad_groups = AdGroup.query.filter_by(campaign_id=campaign_id).order_by(AdGroup.created_at.desc()).all()
-        return jsonify([ag.to_dict() for ag in ad_groups]), 200
+        def build():
+            Campaign.query.get_or_404(campaign_id)
+            ad_groups = db.session.execute(
+                select_fields(AdGroup).where(AdGroup.campaign_id == campaign_id).order_by(AdGroup.created_at.desc())
+            )
+            return rows_to_dicts(ad_groups, AdGroup.SERIALIZABLE_FIELDS)
+
+        return cached_json(campaign_id, 'ad_groups', build)
     except Exception as e:
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/campaigns/<uuid:campaign_id>/ad-groups', methods=['POST'])
+@api.route('/api/campaigns/<uuid:campaign_id>/ad-groups', methods=['POST'])
 def create_ad_group(campaign_id):
     """Create a new ad group for a campaign"""
     try:
-        campaign = Campaign.query.get_or_404(campaign_id)
-        data = request.json
-        
-        # Validation
-        if 'name' not in data:
-            return jsonify({'error': 'Missing field: name'}), 400
-
-        ad_group = AdGroup(
-            campaign_id=campaign_id,
-            name=data['name'],
-            status=data.get('status', 'ENABLED'),
-            target_audience=data.get('target_audience'),
-            keywords=data.get('keywords'),
-            cpc_bid=data.get('cpc_bid'),
-            cpm_bid=data.get('cpm_bid'),
-            ad_headline=data.get('ad_headline'),
-            ad_headline_2=data.get('ad_headline_2'),
-            ad_headline_3=data.get('ad_headline_3'),
-            ad_description=data.get('ad_description'),
-            ad_description_2=data.get('ad_description_2'),
-            final_url=data.get('final_url'),
-            display_url=data.get('display_url')
-        )
+        # Locked until the commit, so the campaign summary counts the ad group under the right status
+        campaign = Campaign.query.filter_by(id=campaign_id).with_for_update().first_or_404()
+
+        try:
+            values = parse_ad_group(request.json, campaign_id)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        keyword_items = [Keyword(**keyword) for keyword in values.pop('keyword_items')]
+        ad_group = AdGroup(**values, keyword_items=keyword_items)
         
         db.session.add(ad_group)
+        campaign_summary.add_ad_groups(campaign, 1)
+        response_cache.invalidate(campaign_id)
         db.session.commit()
         
         return jsonify(ad_group.to_dict()), 201
@@ -192,65 +548,136 @@ def create_ad_group(campaign_id):
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/ad-groups/<uuid:id>', methods=['GET'])
+@api.route('/api/campaigns/<uuid:campaign_id>/ad-groups:batch', methods=['POST'])
+def create_ad_groups_batch(campaign_id):
+    """Create many ad groups for a campaign in one request (JSON array or NDJSON body)"""
+    try:
+        Campaign.query.get_or_404(campaign_id)
+        response = create_batch(
+            AdGroup, lambda data: parse_ad_group(data, campaign_id), children=('keyword_items', Keyword, 'ad_group_id'),
+            on_chunk=lambda chunk: campaign_summary.add_ad_groups(
+                db.session.get(Campaign, campaign_id, with_for_update=True), len(chunk)
+            )
+        )
+        response_cache.invalidate(campaign_id)
+        db.session.commit()
+        return response
+    except Exception as e:
+        db.session.rollback()
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/ad-groups/<uuid:id>', methods=['GET'])
+@replicas.read_only
 def get_ad_group(id):
     """Get a single ad group by ID"""
     try:
-        ad_group = AdGroup.query.get_or_404(id)
-        return jsonify(ad_group.to_dict()), 200
+        return cached_json(id, 'ad_group', lambda: AdGroup.query.get_or_404(id).to_dict())
     except Exception as e:
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/ad-groups/<uuid:id>', methods=['PUT'])
+@api.route('/api/ad-groups/<uuid:id>', methods=['PUT'])
 def update_ad_group(id):
-    """Update an ad group"""
+    """
+    Update an ad group. Only the updatable fields present in the body are written, in a
+    single UPDATE that returns the new row. If the body carries the `version` the client
+    last read, the update only applies while the ad group is still at that version and
+    fails with 409 otherwise.
+    """
     try:
-        ad_group = AdGroup.query.get_or_404(id)
-        data = request.json
-        
-        # Update fields
-        if 'name' in data:
-            ad_group.name = data['name']
-        if 'status' in data:
-            ad_group.status = data['status']
-        if 'target_audience' in data:
-            ad_group.target_audience = data['target_audience']
-        if 'keywords' in data:
-            ad_group.keywords = data['keywords']
-        if 'cpc_bid' in data:
-            ad_group.cpc_bid = data['cpc_bid']
-        if 'cpm_bid' in data:
-            ad_group.cpm_bid = data['cpm_bid']
-        if 'ad_headline' in data:
-            ad_group.ad_headline = data['ad_headline']
-        if 'ad_headline_2' in data:
-            ad_group.ad_headline_2 = data['ad_headline_2']
-        if 'ad_headline_3' in data:
-            ad_group.ad_headline_3 = data['ad_headline_3']
-        if 'ad_description' in data:
-            ad_group.ad_description = data['ad_description']
-        if 'ad_description_2' in data:
-            ad_group.ad_description_2 = data['ad_description_2']
-        if 'final_url' in data:
-            ad_group.final_url = data['final_url']
-        if 'display_url' in data:
-            ad_group.display_url = data['display_url']
-        
+        data = request.get_json(silent=True)
+        try:
+            values, keywords = parse_ad_group_changes(data)
+            version = parse_version(data.get('version'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        rows = update_ad_groups([id], values, keywords, versions=None if version is None else {id: version})
+        if not rows:
+            db.session.rollback()
+            current = db.session.execute(select(AdGroup.version).where(AdGroup.id == id)).scalar()
+            if current is None:
+                return jsonify({'error': 'Ad group not found'}), 404
+            return jsonify({'error': 'Ad group was modified by another request. Reload it and try again.',
+                            'version': current}), 409
+
+        response_cache.invalidate(id, rows[0]['campaign_id'])
         db.session.commit()
-        
-        return jsonify(ad_group.to_dict()), 200
-    
+
+        return jsonify(rows[0]), 200
+
+    except Exception as e:
+        db.session.rollback()
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/ad-groups', methods=['PATCH'])
+def bulk_update_ad_groups():
+    """
+    Apply the same changes to many ad groups with one UPDATE per IN-clause chunk.
+    Body: {"changes": {...}, "ids": [...]} or, to guard each row with its version,
+    {"changes": {...}, "items": [{"id": ..., "version": ...}, ...]}. Rows that changed
+    since (or no longer exist) are reported in `conflicts` / `not_found`, not updated.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Body must be a JSON object'}), 400
+        try:
+            values, keywords = parse_ad_group_changes(data.get('changes'))
+            if not values:
+                raise ValueError(f"changes must include at least one of: {', '.join(AD_GROUP_UPDATABLE_FIELDS)}")
+            versions = None
+            if 'items' in data:
+                if not isinstance(data['items'], list):
+                    raise ValueError('items must be a list')
+                versions = {}
+                for item in data['items']:
+                    if not isinstance(item, dict) or 'id' not in item or 'version' not in item:
+                        raise ValueError('Each item needs an id and a version')
+                    versions[uuid.UUID(str(item['id']))] = parse_version(item['version'])
+                ids = list(versions)
+            elif isinstance(data.get('ids'), list):
+                ids = list(dict.fromkeys(uuid.UUID(str(i)) for i in data['ids']))
+            else:
+                raise ValueError('Provide either ids or items')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if len(ids) > current_app.config['BULK_MAX_ITEMS']:
+            return jsonify({'error': f"Batch exceeds {current_app.config['BULK_MAX_ITEMS']} items"}), 413
+
+        rows = update_ad_groups(ids, values, keywords, versions, fields=('id', 'campaign_id', 'version'))
+        updated = {row['id'] for row in rows}
+        response_cache.invalidate(*updated, *{row['campaign_id'] for row in rows})
+        db.session.commit()
+
+        missed = [i for i in ids if i not in updated]
+        existing = set()
+        for chunk in chunked(missed):
+            existing.update(db.session.execute(select(AdGroup.id).where(AdGroup.id.in_(chunk))).scalars())
+
+        return jsonify({
+            'updated': [{'id': row['id'], 'version': row['version']} for row in rows],
+            'conflicts': [i for i in missed if i in existing],
+            'not_found': [i for i in missed if i not in existing]
+        }), 200
+
     except Exception as e:
+        db.session.rollback()
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/ad-groups/<uuid:id>', methods=['DELETE'])
+@api.route('/api/ad-groups/<uuid:id>', methods=['DELETE'])
 def delete_ad_group(id):
     """Delete an ad group"""
     try:
         ad_group = AdGroup.query.get_or_404(id)
+        campaign_id = ad_group.campaign_id
+        campaign = db.session.get(Campaign, campaign_id, with_for_update=True)
         db.session.delete(ad_group)
+        campaign_summary.add_ad_groups(campaign, -1)
+        response_cache.invalidate(id, campaign_id)
         db.session.commit()
         
         return jsonify({'message': 'Ad group deleted successfully'}), 200
@@ -259,12 +686,14 @@ def delete_ad_group(id):
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/ad-groups/<uuid:id>/pause', methods=['POST'])
+@api.route('/api/ad-groups/<uuid:id>/pause', methods=['POST'])
 def pause_ad_group(id):
     """Pause an ad group"""
     try:
         ad_group = AdGroup.query.get_or_404(id)
         ad_group.status = 'PAUSED'
+        ad_group.version = AdGroup.version + 1
+        response_cache.invalidate(id, ad_group.campaign_id)
         db.session.commit()
         
         return jsonify(ad_group.to_dict()), 200
@@ -273,12 +702,14 @@ def pause_ad_group(id):
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/ad-groups/<uuid:id>/enable', methods=['POST'])
+@api.route('/api/ad-groups/<uuid:id>/enable', methods=['POST'])
 def enable_ad_group(id):
     """Enable an ad group"""
     try:
         ad_group = AdGroup.query.get_or_404(id)
         ad_group.status = 'ENABLED'
+        ad_group.version = AdGroup.version + 1
+        response_cache.invalidate(id, ad_group.campaign_id)
         db.session.commit()
         
         return jsonify(ad_group.to_dict()), 200
@@ -288,5 +719,578 @@ def enable_ad_group(id):
         return jsonify({'error': str(e)}), 500
 
 
+# ============================================
+# KEYWORD ENDPOINTS
+# ============================================
+
+KEYWORD_SEARCH_LIMIT = 100
+KEYWORD_SEARCH_MAX_LIMIT = 1000
+
+
+def keyword_rows(query):
+    """Keyword rows joined with the ad group they belong to, as dicts."""
+    fields = list(Keyword.SERIALIZABLE_FIELDS) + ['ad_group_name', 'ad_group_status']
+    rows = db.session.execute(
+        query.add_columns(AdGroup.name, AdGroup.status).join(AdGroup, AdGroup.id == Keyword.ad_group_id)
+    )
+    return rows_to_dicts(rows, fields)
+
+
+@api.route('/api/ad-groups/<uuid:id>/keywords', methods=['GET'])
+@replicas.read_only
+def get_ad_group_keywords(id):
+    """Keywords of an ad group with their match types and bids"""
+    try:
+        rows = db.session.execute(
+            select_fields(Keyword).where(Keyword.ad_group_id == id).order_by(Keyword.created_at, Keyword.id)
+        )
+        return jsonify(rows_to_dicts(rows, Keyword.SERIALIZABLE_FIELDS)), 200
+    except Exception as e:
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/keywords/search', methods=['GET'])
+@replicas.read_only
+def search_keywords():
+    """
+    Find the ad groups targeting a keyword. `q` is matched against normalized keyword
+    text, exactly or as a prefix (?prefix=true), through ix_keywords_normalized_text.
+    Optional filters: match_type, campaign_id. Paged with limit/offset.
+    """
+    try:
+        q = normalize_keyword(request.args.get('q', ''))
+        if not q:
+            return jsonify({'error': 'Missing query parameter: q'}), 400
+
+        try:
+            limit = min(int(request.args.get('limit', KEYWORD_SEARCH_LIMIT)), KEYWORD_SEARCH_MAX_LIMIT)
+            offset = int(request.args.get('offset', 0))
+        except ValueError:
+            return jsonify({'error': 'limit and offset must be integers'}), 400
+
+        query = select_fields(Keyword)
+        if request.args.get('prefix', '').lower() in ('1', 'true'):
+            # A range rather than LIKE, so the index is used regardless of collation
+            query = query.where(Keyword.normalized_text >= q, Keyword.normalized_text < q + '\U0010ffff')
+        else:
+            query = query.where(Keyword.normalized_text == q)
+
+        if request.args.get('match_type'):
+            match_type = request.args['match_type'].upper()
+            if match_type not in MATCH_TYPES:
+                return jsonify({'error': f"match_type must be one of: {', '.join(MATCH_TYPES)}"}), 400
+            query = query.where(Keyword.match_type == match_type)
+        if request.args.get('campaign_id'):
+            try:
+                query = query.where(Keyword.campaign_id == uuid.UUID(request.args['campaign_id']))
+            except ValueError:
+                return jsonify({'error': 'Invalid campaign_id'}), 400
+
+        query = query.order_by(Keyword.normalized_text, Keyword.id).limit(limit).offset(offset)
+        return jsonify(keyword_rows(query)), 200
+    except Exception as e:
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/campaigns/<uuid:id>/keywords/duplicates', methods=['GET'])
+@replicas.read_only
+def get_duplicate_keywords(id):
+    """
+    Keywords that appear in more than one ad group of the campaign with the same match
+    type. Grouped on ix_keywords_campaign_id_normalized_text, then the members of each
+    duplicate group are fetched with a second indexed query.
+    """
+    try:
+        duplicates = db.session.execute(
+            select(Keyword.normalized_text, Keyword.match_type)
+            .where(Keyword.campaign_id == id)
+            .group_by(Keyword.normalized_text, Keyword.match_type)
+            .having(func.count(func.distinct(Keyword.ad_group_id)) > 1)
+            .order_by(Keyword.normalized_text, Keyword.match_type)
+        ).all()
+
+        report = {tuple(row): [] for row in duplicates}
+        for start in range(0, len(duplicates), IN_CLAUSE_CHUNK_SIZE):
+            query = select_fields(Keyword).where(
+                Keyword.campaign_id == id,
+                tuple_(Keyword.normalized_text, Keyword.match_type).in_(duplicates[start:start + IN_CLAUSE_CHUNK_SIZE])
+            ).order_by(Keyword.ad_group_id)
+            for row in keyword_rows(query):
+                report[(row['normalized_text'], row['match_type'])].append(row)
+
+        return jsonify([
+            {'normalized_text': text, 'match_type': match_type, 'ad_group_count': len(keywords), 'keywords': keywords}
+            for (text, match_type), keywords in report.items()
+        ]), 200
+    except Exception as e:
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================
+# EXPORT ENDPOINTS
+# ============================================
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def export_rows(model, filter_fields, filename):
+    """
+    Stream every row of `model` matching the query-string filters as NDJSON (default) or
+    CSV (?format=csv). Rows are read through a server-side cursor in yield_per batches and
+    written out as they arrive, so memory stays flat however many rows match.
+
+    Filters: any of `filter_fields` (comma-separated values), plus created_from / created_to
+    (YYYY-MM-DD, inclusive) on created_at.
+    """
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+
+    query = select_fields(model)
+    for name in filter_fields:
+        if request.args.get(name):
+            values = request.args[name].split(',')
+            if name == 'campaign_id':
+                try:
+                    values = [uuid.UUID(v) for v in values]
+                except ValueError:
+                    return jsonify({'error': 'Invalid campaign_id'}), 400
+            query = query.where(getattr(model, name).in_(values))
+
+    try:
+        if request.args.get('created_from'):
+            query = query.where(model.created_at >= datetime.strptime(request.args['created_from'], '%Y-%m-%d'))
+        if request.args.get('created_to'):
+            created_to = datetime.strptime(request.args['created_to'], '%Y-%m-%d')
+            query = query.where(model.created_at < created_to + timedelta(days=1))
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+
+    query = query.order_by(model.created_at, model.id).execution_options(yield_per=current_app.config['EXPORT_BATCH_SIZE'])
+    fields = list(model.SERIALIZABLE_FIELDS)
+
+    @stream_with_context
+    def generate():
+        rows = db.session.execute(query)
+        if export_format == 'csv':
+            yield from iter_csv(rows, fields, batch_size=current_app.config['EXPORT_BATCH_SIZE'])
+        else:
+            yield from iter_ndjson(rows, fields, current_app.json.dumps)
+
+    return Response(
+        generate(),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}.{export_format}'}
+    )
+
+
+@api.route('/api/campaigns:export', methods=['GET'])
+@replicas.read_only
+def export_campaigns():
+    """Stream all campaigns as NDJSON or CSV"""
+    try:
+        return export_rows(Campaign, CAMPAIGN_FILTERS, 'campaigns')
+    except Exception as e:
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/ad-groups:export', methods=['GET'])
+@replicas.read_only
+def export_ad_groups():
+    """Stream all ad groups as NDJSON or CSV"""
+    try:
+        return export_rows(AdGroup, ('campaign_id', 'status'), 'ad_groups')
+    except Exception as e:
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================
+# BULK STATUS ENDPOINTS
+# ============================================
+
+# target local status: (statuses it can be applied to, matching Google Ads status)
+CAMPAIGN_STATUS_TRANSITIONS = {
+    'PAUSED': (('PUBLISHED',), 'PAUSED'),
+    'PUBLISHED': (('PAUSED',), 'ENABLED'),
+}
+AD_GROUP_STATUS_TRANSITIONS = {
+    'PAUSED': (('ENABLED',), 'PAUSED'),
+    'ENABLED': (('PAUSED',), 'ENABLED'),
+}
+
+
+def bulk_status_change(model, remote_id_column, transitions, filter_fields, set_remote_statuses, on_moved=None):
+    """
+    Shared body of the :bulk-status endpoints. Body: {"status": ..., "ids": [...]} or
+    {"status": ..., "filter": {field: value or [values]}}.
+
+    Targets are resolved with column-only SELECTs, remote entities are updated with
+    chunked multi-operation Google Ads mutates, and the rows Google Ads accepted (plus
+    those never published) are updated locally with set-based UPDATEs in one transaction.
+    Each UPDATE only matches rows still in the status they were read in, and
+    `on_moved(ids, from_status)` is called with the ids it changed.
+    Returns an outcome per id: updated, unchanged, skipped, failed or not_found.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Body must be a JSON object'}), 400
+    target = data.get('status')
+    if target not in transitions:
+        return jsonify({'error': f"status must be one of: {', '.join(transitions)}"}), 400
+    allowed_from, remote_status = transitions[target]
+
+    query = db.session.query(model.id, model.status, remote_id_column)
+    results = []
+    if 'ids' in data:
+        if not isinstance(data['ids'], list):
+            return jsonify({'error': 'ids must be a list'}), 400
+        if len(data['ids']) > current_app.config['BULK_MAX_ITEMS']:
+            return jsonify({'error': f"Batch exceeds {current_app.config['BULK_MAX_ITEMS']} items"}), 413
+        ids = []
+        for raw_id in data['ids']:
+            try:
+                ids.append(uuid.UUID(str(raw_id)))
+            except ValueError:
+                results.append({'id': raw_id, 'outcome': 'not_found'})
+        rows = []
+        for chunk in chunked(ids):
+            rows.extend(query.filter(model.id.in_(chunk)).all())
+        found = {row.id for row in rows}
+        results.extend({'id': str(i), 'outcome': 'not_found'} for i in ids if i not in found)
+    elif isinstance(data.get('filter'), dict) and data['filter']:
+        unknown = set(data['filter']) - set(filter_fields)
+        if unknown:
+            return jsonify({'error': f"Unknown filter fields: {', '.join(sorted(unknown))}"}), 400
+        for name, value in data['filter'].items():
+            values = value if isinstance(value, list) else [value]
+            if name == 'campaign_id':
+                try:
+                    values = [uuid.UUID(str(v)) for v in values]
+                except ValueError:
+                    return jsonify({'error': 'Invalid campaign_id'}), 400
+            query = query.filter(getattr(model, name).in_(values))
+        rows = query.all()
+    else:
+        return jsonify({'error': 'Provide either ids or a non-empty filter'}), 400
+
+    eligible = []
+    for row in rows:
+        if row.status == target:
+            results.append({'id': str(row.id), 'outcome': 'unchanged'})
+        elif row.status not in allowed_from:
+            results.append({'id': str(row.id), 'outcome': 'skipped', 'error': f'Cannot change status from {row.status} to {target}'})
+        else:
+            eligible.append(row)
+
+    remote_ids = [row[2] for row in eligible if row[2]]
+    remote_errors = set_remote_statuses(remote_ids, remote_status) if remote_ids else {}
+
+    to_update = {}
+    for row in eligible:
+        if row[2] and row[2] in remote_errors:
+            results.append({'id': str(row.id), 'outcome': 'failed', 'error': f"Google Ads API Error: {remote_errors[row[2]]}"})
+        else:
+            to_update.setdefault(row.status, []).append(row.id)
+
+    values = {'status': target}
+    if 'version' in model.__table__.c:
+        values['version'] = model.version + 1
+    updated = []
+    for from_status, ids in to_update.items():
+        for chunk in chunked(ids):
+            moved = db.session.scalars(
+                update(model).where(model.id.in_(chunk), model.status == from_status).values(**values).returning(model.id)
+            ).all()
+            if moved and on_moved:
+                on_moved(moved, from_status)
+            updated.extend(moved)
+    if updated:
+        response_cache.clear()
+    db.session.commit()
+    changed = set(updated)
+    results.extend(
+        {'id': str(i), 'outcome': 'skipped', 'error': 'Status changed concurrently'}
+        for ids in to_update.values() for i in ids if i not in changed
+    )
+    results.extend({'id': str(i), 'outcome': 'updated'} for i in updated)
+
+    return jsonify({
+        'status': target,
+        'counts': Counter(result['outcome'] for result in results),
+        'results': results
+    }), 200
+
+
+@api.route('/api/campaigns:bulk-status', methods=['POST'])
+def bulk_campaign_status():
+    """Pause (status=PAUSED) or re-enable (status=PUBLISHED) many campaigns"""
+    try:
+        return bulk_status_change(
+            Campaign, Campaign.google_campaign_id, CAMPAIGN_STATUS_TRANSITIONS,
+            CAMPAIGN_FILTERS, ads_service.set_campaign_statuses, on_moved=campaign_summary.move_campaigns
+        )
+    except Exception as e:
+        db.session.rollback()
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/ad-groups:bulk-status', methods=['POST'])
+def bulk_ad_group_status():
+    """Pause or enable many ad groups"""
+    try:
+        return bulk_status_change(
+            AdGroup, AdGroup.google_ad_group_id, AD_GROUP_STATUS_TRANSITIONS,
+            ('campaign_id', 'status'), ads_service.set_ad_group_statuses
+        )
+    except Exception as e:
+        db.session.rollback()
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================
+# REMOTE SYNC ENDPOINTS
+# ============================================
+
+# Default window of GET /api/campaigns/<id>/metrics, in days up to today
+METRICS_DEFAULT_DAYS = 30
+
+@api.route('/api/sync', methods=['POST'])
+def trigger_sync():
+    """Start a sync of campaign status and metrics from Google Ads in the background.
+    Body (optional): {"full": true} to re-read the whole REMOTE_SYNC_INITIAL_DAYS window."""
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {}
+    elif not isinstance(data, dict):
+        return jsonify({'error': 'Body must be a JSON object'}), 400
+    remote_sync.run_in_background(full=bool(data.get('full')))
+    return jsonify({'message': 'Sync started'}), 202
+
+@api.route('/api/sync', methods=['GET'])
+def get_sync_states():
+    """High-water mark and last run of the sync, per customer"""
+    try:
+        return jsonify([state.to_dict() for state in SyncState.query.order_by(SyncState.customer_id)]), 200
+    except Exception as e:
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/campaigns/<uuid:id>/metrics', methods=['GET'])
+@replicas.read_only
+def get_campaign_metrics(id):
+    """Synced Google Ads state and daily metrics of a campaign.
+    Query params: from / to (YYYY-MM-DD, default the last METRICS_DEFAULT_DAYS days)."""
+    try:
+        try:
+            end_date = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else datetime.utcnow().date()
+            start_date = (datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from')
+                          else end_date - timedelta(days=METRICS_DEFAULT_DAYS - 1))
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+
+        Campaign.query.with_entities(Campaign.id).filter_by(id=id).first_or_404()
+        remote = db.session.get(CampaignRemoteState, id)
+        daily = [
+            metric.to_dict() for metric in CampaignDailyMetric.query
+            .filter(CampaignDailyMetric.campaign_id == id, CampaignDailyMetric.date.between(start_date, end_date))
+            .order_by(CampaignDailyMetric.date)
+        ]
+        totals = {
+            'impressions': sum(day['impressions'] for day in daily),
+            'clicks': sum(day['clicks'] for day in daily),
+            'cost': round(sum(day['cost'] for day in daily), 6),
+        }
+        return jsonify({
+            'campaign_id': str(id),
+            'from': start_date.isoformat(),
+            'to': end_date.isoformat(),
+            'remote': remote.to_dict() if remote else None,
+            'totals': totals,
+            'daily': daily
+        }), 200
+    except Exception as e:
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+
+# ============================================
+# SCHEDULER ENDPOINTS
+# ============================================
+
+# Runs listed by GET /api/schedule/runs
+SCHEDULE_RUNS_DEFAULT_LIMIT = 20
+SCHEDULE_RUNS_MAX_LIMIT = 200
+
+@api.route('/api/schedule/run', methods=['POST'])
+def trigger_schedule_run():
+    """Start and end the flights due today now, in the background, rather than on the next pass"""
+    scheduler.run_in_background()
+    return jsonify({'message': 'Scheduler run started'}), 202
+
+@api.route('/api/schedule/runs', methods=['GET'])
+def get_schedule_runs():
+    """Recent scheduler passes that moved or failed campaigns, newest first.
+    Query params: limit (default SCHEDULE_RUNS_DEFAULT_LIMIT)."""
+    try:
+        limit = min(max(request.args.get('limit', SCHEDULE_RUNS_DEFAULT_LIMIT, type=int), 1), SCHEDULE_RUNS_MAX_LIMIT)
+        runs = ScheduleRun.query.order_by(ScheduleRun.started_at.desc()).limit(limit)
+        return jsonify([run.to_dict() for run in runs]), 200
+    except Exception as e:
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@api.cli.command('run-scheduler')
+@click.option('--as-of', type=click.DateTime(formats=['%Y-%m-%d']), help='Date to apply (default today, UTC)')
+def run_scheduler(as_of):
+    """Start and end the flights due on a date in one pass."""
+    result = scheduler.run(as_of.date() if as_of else None)
+    print(f"{result['activated']} activated, {result['ended']} ended, {result['failed']} failed")
+    if result['error']:
+        print(result['error'])
+
+
+
+# ============================================
+# FORECAST ENDPOINTS
+# ============================================
+
+# Length of the daily projected spend curve of GET /api/forecast, in days from as_of
+FORECAST_DEFAULT_DAYS = 30
+FORECAST_MAX_DAYS = 366
+
+def parse_as_of():
+    """The as_of query param (YYYY-MM-DD), today by default. Raises ValueError."""
+    if request.args.get('as_of'):
+        return datetime.strptime(request.args['as_of'], '%Y-%m-%d').date()
+    return datetime.utcnow().date()
+
+@api.route('/api/forecast', methods=['GET'])
+@replicas.read_only
+def get_forecast():
+    """Budget pacing and bid simulation across all matching campaigns at once.
+
+    Query params: as_of (YYYY-MM-DD, default today), days (length of the daily projected
+    spend curve) and status / objective / campaign_type filters (comma-separated values).
+    """
+    try:
+        try:
+            as_of = parse_as_of()
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        try:
+            days = min(int(request.args.get('days', FORECAST_DEFAULT_DAYS)), FORECAST_MAX_DAYS)
+        except ValueError:
+            return jsonify({'error': 'days must be an integer'}), 400
+        if days < 1:
+            return jsonify({'error': 'days must be positive'}), 400
+
+        where = [
+            getattr(Campaign, name).in_(request.args[name].split(','))
+            for name in CAMPAIGN_FILTERS if request.args.get(name)
+        ]
+        # Imports NumPy, so loaded by the first forecast rather than at startup
+        import forecast
+
+        columns = forecast.load_campaigns(as_of, where)
+        result = forecast.simulate(columns, as_of)
+        return jsonify(forecast.portfolio(columns, result, as_of, days)), 200
+    except Exception as e:
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/campaigns/<uuid:id>/forecast', methods=['GET'])
+@replicas.read_only
+def get_campaign_forecast(id):
+    """Pacing and projections of one campaign, with what-ifs for each bidding strategy.
+    Query params: as_of (YYYY-MM-DD, default today)."""
+    try:
+        try:
+            as_of = parse_as_of()
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+
+        import forecast
+
+        columns = forecast.load_campaigns(as_of, [Campaign.id == id])
+        if not columns['id']:
+            return jsonify({'error': 'Campaign not found'}), 404
+        result = forecast.simulate(columns, as_of)
+        return jsonify(dict(forecast.campaign_forecast(columns, result, 0), as_of=as_of.isoformat())), 200
+    except Exception as e:
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+
+@api.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request, query, serialization and Google Ads latency histograms in Prometheus text format"""
+    if not instrumentation.is_enabled():
+        return jsonify({'error': 'Instrumentation is disabled. Set INSTRUMENTATION_ENABLED=true'}), 404
+    return Response(instrumentation.render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Hit ratio and size of the campaign / ad group response cache"""
+    return jsonify(response_cache.stats()), 200
+
+
+# ============================================
+# APPLICATION FACTORY
+# ============================================
+
+class MigrateGroup(click.Group):
+    """`flask db ...` from Flask-Migrate, which imports Alembic. Set up when a db command
+    is actually run, so other processes creating the app don't pay for the import."""
+
+    def _commands(self):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as db_commands
+
+        if 'migrate' not in current_app.extensions:
+            Migrate(current_app._get_current_object(), db)
+        return db_commands
+
+    def list_commands(self, ctx):
+        return self._commands().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._commands().get_command(ctx, name)
+
+
+def create_app(config_class=Config):
+    """
+    Build the Flask app. Nothing here touches the database or Google Ads: connections,
+    publish workers and the Google Ads client are opened on first use, and the schema is
+    managed by migrations only (`flask db upgrade`).
+
+    Background work isn't started either: call publish_queue.recover_pending(),
+    remote_sync.start() and scheduler.start() once the process is serving (see
+    gunicorn.conf.py).
+    """
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config.from_object(config_class)
+    # Credentials let cross-origin clients keep the read-your-writes cookie (replicas.PIN_COOKIE)
+    CORS(app, origins=app.config.get('CORS_ORIGINS', []), supports_credentials=True,
+         expose_headers=['X-Next-Cursor', 'ETag', 'Server-Timing', 'X-Query-Count', 'X-Profile-File', replicas.ROUTE_HEADER])
+
+    db.init_app(app)
+    extensions.init_app(app)
+    instrumentation.init_app(app)
+    app.register_blueprint(api)
+    app.cli.add_command(MigrateGroup('db', help='Perform database migrations.'))
+    return app
+
+
 if __name__ == '__main__':
+    app = create_app()
+    publish_queue.recover_pending()
+    remote_sync.start()
+    scheduler.start()
     app.run(debug=True, port=5000)
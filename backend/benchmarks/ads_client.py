@@ -0,0 +1,147 @@
+"""
+Overhead of the Google Ads client: what loading it costs a fresh process, and what every
+RPC pays for its service stub and message types, with and without the per-process cache
+in GoogleAdsService.
+
+Startup phases run in new processes, offline: importing app.py, which must not load
+google-ads any more, then importing and building a GoogleAdsClient (with a made-up, unexpired
+access token, so no OAuth refresh is counted or sent) and creating the first service
+stub, which the first RPC now pays for. Per-call overhead is the get_service / get_type lookups of one publish, straight on
+the client as before against GoogleAdsService._service / _type. Exits with status 1 if
+importing app.py loads google-ads:
+
+    python benchmarks/ads_client.py --runs 5 --calls 200
+"""
+from datetime import datetime, timezone
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from run import configure_environment, git_commit  # noqa: E402
+
+PHASES = ('import_app', 'import_google_ads', 'build_client', 'first_service')
+# Stubs and types looked up by publishing one batch of campaigns
+SERVICES = ('GoogleAdsService', 'CampaignService', 'AdGroupService', 'CampaignBudgetService')
+TYPES = ('MutateOperation', 'CampaignOperation', 'GoogleAdsFailure')
+
+# Run in the child process; prints the phase timings in seconds as JSON
+CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+loaded = 'google.ads.googleads.client' in sys.modules
+from google.ads.googleads.client import GoogleAdsClient
+from google.oauth2.credentials import Credentials
+imported_ads = time.perf_counter()
+client = GoogleAdsClient(credentials=Credentials(token='fake'), developer_token='fake', use_proto_plus=True)
+built = time.perf_counter()
+client.get_service('GoogleAdsService')
+serviced = time.perf_counter()
+print(json.dumps({
+    'import_app': imported - started,
+    'import_google_ads': imported_ads - imported,
+    'build_client': built - imported_ads,
+    'first_service': serviced - built,
+    'google_ads_loaded_by_app': loaded,
+}))
+'''
+
+
+def uncached(client):
+    """The lookups of one publish as they were made before: straight on the client."""
+    for name in SERVICES:
+        client.get_service(name)
+    for name in TYPES:
+        client.get_type(name)
+
+
+def cached(service):
+    """The same lookups through GoogleAdsService's per-process cache."""
+    for name in SERVICES:
+        service._service(name)
+    for name in TYPES:
+        service._type(name)
+
+
+def per_call_us(lookup, target, calls):
+    """Median microseconds of `lookup(target)` over `calls` calls, after one to warm up."""
+    lookup(target)
+    timings = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        lookup(target)
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1e6, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='fresh processes to start')
+    parser.add_argument('--calls', type=int, default=200, help='lookups timed per path')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    # Nothing here queries the database
+    configure_environment('sqlite://')
+    os.environ['GOOGLE_ADS_DEVELOPER_TOKEN'] = ''
+
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, '-c', CHILD], cwd=BACKEND_DIR,
+                                env=os.environ, capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    results, problems = {'startup': {}}, []
+    print(f"{'phase':<20}{'p50 ms':>10}{'max ms':>10}")
+    for phase in PHASES:
+        values = [run[phase] * 1000 for run in runs]
+        results['startup'][phase] = {'p50_ms': round(statistics.median(values), 1), 'max_ms': round(max(values), 1)}
+        print(f"{phase:<20}{results['startup'][phase]['p50_ms']:>10}{results['startup'][phase]['max_ms']:>10}")
+    results['google_ads_loaded_by_app'] = any(run['google_ads_loaded_by_app'] for run in runs)
+    if results['google_ads_loaded_by_app']:
+        problems.append('importing app.py loads google-ads')
+
+    from google.ads.googleads.client import GoogleAdsClient
+    from google.oauth2.credentials import Credentials
+    from google_ads_service import GoogleAdsService
+
+    client = GoogleAdsClient(credentials=Credentials(token='fake'), developer_token='fake', use_proto_plus=True)
+    service = GoogleAdsService()
+    service.client = client
+    results['per_publish'] = {
+        'uncached_us': per_call_us(uncached, client, args.calls),
+        'cached_us': per_call_us(cached, service, args.calls),
+    }
+    print(f"\n{len(SERVICES)} stubs + {len(TYPES)} types per publish: "
+          f"{results['per_publish']['uncached_us']} us uncached, {results['per_publish']['cached_us']} us cached "
+          f"({results['per_publish']['uncached_us'] / results['per_publish']['cached_us']:.0f}x)")
+    print('\n' + ('\n'.join(problems) if problems else 'Verified: importing app.py leaves google-ads unloaded'))
+
+    results['problems'] = problems
+    results['meta'] = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'runs': args.runs,
+        'calls': args.calls,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nSaved {args.save}')
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Rows per second of bulk creation: the :batch endpoints against one POST per row, for
+campaigns and for one campaign's ad groups.
+
+Each path creates `--rows` rows in a copy of a seeded dataset, through the Flask test
+client: one POST /api/campaigns (or .../ad-groups) per row, one :batch request with a
+JSON array, and one with NDJSON. Then checks that every path stored all of its rows:
+
+    python benchmarks/bulk_insert.py --dataset 1k --rows 20000
+"""
+from datetime import datetime, timezone
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import seed as seeding  # noqa: E402
+from run import Context, configure_environment, git_commit, new_ad_group, new_campaign, working_database_url  # noqa: E402
+
+PATHS = ('per_request', 'batch_json', 'batch_ndjson')
+
+
+def create(client, path, items, how):
+    """Create `items` at `path` one of the PATHS ways. Returns the number created."""
+    if how == 'per_request':
+        for item in items:
+            response = client.post(path, json=item)
+            assert response.status_code == 201, response.get_data(as_text=True)[:500]
+        return len(items)
+    if how == 'batch_json':
+        response = client.post(f'{path}:batch', json=items)
+    else:
+        response = client.post(f'{path}:batch', data=''.join(json.dumps(item) + '\n' for item in items),
+                               content_type='application/x-ndjson')
+    assert response.status_code == 201, response.get_data(as_text=True)[:500]
+    return response.get_json()['created']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', choices=seeding.DATASETS, default='1k')
+    parser.add_argument('--database-url', help='use this database in place of a copied SQLite dataset')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--rows', type=int, default=20000, help='rows created by each path')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    database_url = args.database_url or working_database_url(args.dataset, args.seed, suffix='bulk')
+    configure_environment(database_url)
+
+    from app import create_app
+    from models import db, AdGroup, Campaign
+    from sqlalchemy import func, select
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.remove()
+    client = app.test_client()
+    ctx = Context(client, random.Random(args.seed))
+
+    results, problems = {}, []
+    print(f"{args.rows} rows per path\n")
+    print(f"{'table':<12}{'path':<16}{'seconds':>10}{'rows/s':>10}{'speedup':>9}")
+    for kind in ('campaigns', 'ad_groups'):
+        results[kind] = {}
+        for how in PATHS:
+            if kind == 'campaigns':
+                path, items = '/api/campaigns', [dict(new_campaign(ctx, i), name=f'{how} {i}') for i in range(args.rows)]
+            else:
+                # A fresh campaign per path, so each one's ad groups can be counted
+                campaign_id = uuid.UUID(client.post('/api/campaigns', json=new_campaign(ctx)).get_json()['id'])
+                path, items = f'/api/campaigns/{campaign_id}/ad-groups', [new_ad_group(ctx, i) for i in range(args.rows)]
+            started = time.perf_counter()
+            created = create(client, path, items, how)
+            seconds = time.perf_counter() - started
+
+            with app.app_context():
+                if kind == 'campaigns':
+                    stored = db.session.scalar(select(func.count()).where(Campaign.name.like(f'{how} %')))
+                else:
+                    stored = db.session.scalar(select(func.count()).where(AdGroup.campaign_id == campaign_id))
+                db.session.remove()
+            if created != args.rows or stored != args.rows:
+                problems.append(f'{kind} {how}: {created} created, {stored} stored, {args.rows} sent')
+
+            result = results[kind][how] = {'seconds': round(seconds, 3), 'rows_per_second': round(args.rows / seconds)}
+            speedup = result['rows_per_second'] / results[kind]['per_request']['rows_per_second']
+            print(f"{kind:<12}{how:<16}{result['seconds']:>10}{result['rows_per_second']:>10}{speedup:>8.1f}x")
+    print('\n' + ('\n'.join(problems) if problems else 'Verified: every path stored all of its rows'))
+
+    results['problems'] = problems
+    results['meta'] = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'dataset': args.dataset,
+        'database': database_url.split(':', 1)[0],
+        'rows': args.rows,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nSaved {args.save}')
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
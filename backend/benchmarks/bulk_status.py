@@ -0,0 +1,127 @@
+"""
+Bulk pause at scale: POST /api/ad-groups:bulk-status for `--ad-groups` published ad groups
+at once (50,000 by default, the BULK_MAX_ITEMS limit), then re-enabling them, with Google
+Ads replaced by FakeGoogleAdsClient.
+
+Reports each request's time, rows per second, SQL statements and Google Ads mutates, then
+checks that every ad group was updated, both locally and in as few mutates as
+MAX_MUTATE_OPERATIONS allows. Exits with status 1 otherwise:
+
+    python benchmarks/bulk_status.py --dataset 100k --ad-groups 50000
+"""
+from datetime import datetime, timezone
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import uuid
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import seed as seeding  # noqa: E402
+from run import configure_environment, git_commit, working_database_url  # noqa: E402
+
+# Status set by each request in turn
+STEPS = ('PAUSED', 'ENABLED')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', choices=seeding.DATASETS, default='100k')
+    parser.add_argument('--database-url', help='use this database in place of a copied SQLite dataset')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--ad-groups', type=int, default=50000, help='ad groups per request')
+    parser.add_argument('--ads-latency', type=float, default=0.0, help='fake Google Ads seconds per RPC')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    database_url = args.database_url or working_database_url(args.dataset, args.seed, suffix='bulk-status')
+    configure_environment(database_url)
+
+    from app import chunked, create_app
+    from extensions import ads_service
+    from fake_ads import FakeGoogleAdsClient
+    from google_ads_service import MAX_MUTATE_OPERATIONS
+    from models import db, AdGroup
+    from sqlalchemy import event, func, select
+
+    app = create_app()
+    fake_ads = ads_service.client = FakeGoogleAdsClient(latency=args.ads_latency, seed=args.seed)
+    statements = [0]
+
+    def count_statement(*_):
+        statements[0] += 1
+
+    with app.app_context():
+        db.create_all()
+        ad_group_ids = [str(ad_group_id) for ad_group_id in db.session.scalars(
+            select(AdGroup.id).where(AdGroup.status == 'ENABLED', AdGroup.google_ad_group_id.isnot(None))
+            .limit(args.ad_groups))]
+        db.session.remove()
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+
+    problems = []
+    if len(ad_group_ids) < args.ad_groups:
+        problems.append(f'only {len(ad_group_ids)} published ENABLED ad groups in the {args.dataset} dataset')
+    expected_rpcs = math.ceil(len(ad_group_ids) / MAX_MUTATE_OPERATIONS)
+
+    client = app.test_client()
+    results = {}
+    print(f"{len(ad_group_ids)} ad groups per request\n")
+    print(f"{'status':<10}{'seconds':>10}{'rows/s':>10}{'stmts':>8}{'mutates':>9}")
+    for status in STEPS:
+        before_statements, before_rpcs = statements[0], fake_ads.rpc_count
+        started = time.perf_counter()
+        response = client.post('/api/ad-groups:bulk-status', json={'ids': ad_group_ids, 'status': status})
+        seconds = time.perf_counter() - started
+        counts = response.get_json().get('counts') if response.status_code == 200 else response.get_data(as_text=True)[:500]
+
+        result = results[status] = {
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(len(ad_group_ids) / seconds),
+            'statements': statements[0] - before_statements,
+            'mutates': fake_ads.rpc_count - before_rpcs,
+            'counts': counts,
+        }
+        print(f"{status:<10}{result['seconds']:>10}{result['rows_per_second']:>10}{result['statements']:>8}"
+              f"{result['mutates']:>9}")
+
+        with app.app_context():
+            stored = sum(
+                db.session.scalar(select(func.count()).where(AdGroup.status == status, AdGroup.id.in_(chunk)))
+                for chunk in chunked([uuid.UUID(ad_group_id) for ad_group_id in ad_group_ids])
+            )
+            db.session.remove()
+        if counts != {'updated': len(ad_group_ids)}:
+            problems.append(f'{status}: outcomes {counts}')
+        if stored != len(ad_group_ids):
+            problems.append(f'{status}: {stored} of {len(ad_group_ids)} ad groups stored as {status}')
+        if result['mutates'] != expected_rpcs:
+            problems.append(f"{status}: {result['mutates']} Google Ads mutates, expected {expected_rpcs}")
+    print('\n' + ('\n'.join(problems) if problems else
+                  f'Verified: every ad group updated locally and in {expected_rpcs} Google Ads mutates per request'))
+
+    results['problems'] = problems
+    results['meta'] = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'dataset': args.dataset,
+        'database': database_url.split(':', 1)[0],
+        'ad_groups': len(ad_group_ids),
+        'ads_latency': args.ads_latency,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nSaved {args.save}')
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
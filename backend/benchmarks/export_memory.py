@@ -0,0 +1,130 @@
+"""
+Memory of the streaming exports: peak RSS and peak Python allocations (tracemalloc) while
+GET /api/campaigns:export streams 10k, 100k and 1M campaigns as NDJSON and as CSV.
+
+Runs on a copy of the 1m campaigns-only dataset, cut down to each size in turn (campaigns
+are created one second apart, so the first N are kept exactly). Every export runs in a
+fresh process that reads the body chunk by chunk, as a client would, after a warm-up
+request. Exits with status 1 if the largest export's peak allocations are more than
+`--max-ratio` times the smallest's, i.e. if memory grows with the row count:
+
+    python benchmarks/export_memory.py --sizes 10000,100000,1000000
+"""
+from datetime import datetime, timedelta, timezone
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from run import configure_environment, git_commit, working_database_url  # noqa: E402
+
+FORMATS = ('ndjson', 'csv')
+# created_at of the first seeded campaign; campaign i is created i seconds later
+SEED_EPOCH = datetime(2025, 1, 1)
+
+# Run in the child process; prints the export's rows, bytes and memory as JSON
+CHILD = '''
+import json, os, resource, sys, tracemalloc
+from app import create_app
+app = create_app()
+client = app.test_client()
+path = '/api/campaigns:export?format=' + sys.argv[1]
+assert client.get(path + '&created_to=2000-01-01').status_code == 200
+with open('/proc/self/statm') as f:
+    rss_before = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+tracemalloc.start()
+response = client.get(path)
+assert response.status_code == 200, response.status_code
+lines = size = 0
+for chunk in response.iter_encoded():
+    lines += chunk.count(b'\\n')
+    size += len(chunk)
+response.close()
+print(json.dumps({
+    'lines': lines,
+    'bytes': size,
+    'peak_traced': tracemalloc.get_traced_memory()[1],
+    'rss_before': rss_before,
+    'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+}))
+'''
+
+
+def keep_first(path, rows):
+    """Delete every campaign but the first `rows` from the SQLite database at `path`."""
+    with sqlite3.connect(path) as connection:
+        connection.execute('DELETE FROM campaigns WHERE created_at >= ?',
+                           ((SEED_EPOCH + timedelta(seconds=rows)).strftime('%Y-%m-%d %H:%M:%S.%f'),))
+        return connection.execute('SELECT count(*) FROM campaigns').fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='comma-separated campaign counts')
+    parser.add_argument('--max-ratio', type=float, default=2.0, help='allowed largest / smallest peak allocations')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    sizes = sorted((int(size) for size in args.sizes.split(',')), reverse=True)
+    database_url = working_database_url('1m', args.seed, suffix='export-memory', campaigns_only=True)
+    configure_environment(database_url)
+
+    results, problems = {export_format: {} for export_format in FORMATS}, []
+    for size in sizes:
+        stored = keep_first(database_url[len('sqlite:///'):], size)
+        if stored != size:
+            problems.append(f'{stored} campaigns in the database for size {size}')
+        for export_format in FORMATS:
+            output = subprocess.run([sys.executable, '-c', CHILD, export_format], cwd=BACKEND_DIR, env=os.environ,
+                                    capture_output=True, text=True, check=True).stdout
+            run = json.loads(output.strip().splitlines()[-1])
+            results[export_format][size] = {
+                'rows': run['lines'] - (export_format == 'csv'),
+                'megabytes': round(run['bytes'] / 1e6, 1),
+                'peak_traced_mb': round(run['peak_traced'] / 1e6, 2),
+                'rss_growth_mb': round(max(0, run['peak_rss'] - run['rss_before']) / 1e6, 1),
+                'peak_rss_mb': round(run['peak_rss'] / 1e6, 1),
+            }
+
+    print(f"{'format':<8}{'rows':>10}{'MB out':>9}{'traced MB':>11}{'RSS growth MB':>15}{'peak RSS MB':>13}")
+    for export_format in FORMATS:
+        for size in sorted(results[export_format]):
+            result = results[export_format][size]
+            print(f"{export_format:<8}{result['rows']:>10}{result['megabytes']:>9}{result['peak_traced_mb']:>11}"
+                  f"{result['rss_growth_mb']:>15}{result['peak_rss_mb']:>13}")
+            if result['rows'] != size:
+                problems.append(f'{export_format}: {result["rows"]} rows exported of {size}')
+        smallest, largest = results[export_format][min(sizes)], results[export_format][max(sizes)]
+        if largest['peak_traced_mb'] > smallest['peak_traced_mb'] * args.max_ratio:
+            problems.append(f"{export_format}: {largest['peak_traced_mb']} MB allocated for {max(sizes)} rows, over "
+                            f"{args.max_ratio}x the {smallest['peak_traced_mb']} MB for {min(sizes)}")
+    print('\n' + ('\n'.join(problems) if problems else
+                  f'Verified: every row exported, peak allocations within {args.max_ratio}x across sizes'))
+
+    results['problems'] = problems
+    results['meta'] = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'dataset': '1m campaigns only',
+        'database': database_url.split(':', 1)[0],
+        'sizes': sorted(sizes),
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nSaved {args.save}')
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
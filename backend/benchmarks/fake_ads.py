@@ -0,0 +1,257 @@
+"""
+Fake GoogleAdsClient for benchmarks: real message types and enums from the installed
+google-ads library, but services answer locally after a configurable delay and reject
+a configurable share of operations or whole RPCs.
+
+It remembers the campaigns it creates (and any registered with add_campaigns) and serves
+them to the SearchStream queries of the remote sync: campaign status and budget, and
+deterministic daily metrics for every ENABLED campaign.
+
+    ads_service.client = FakeGoogleAdsClient(latency=0.2, error_rate=0.01)
+"""
+from google.ads.googleads.client import GoogleAdsClient
+from google.protobuf import any_pb2
+from datetime import date, timedelta
+import bisect
+import grpc
+import random
+import re
+import threading
+import time
+
+# Response message of each fake RPC
+RESPONSE_TYPES = {
+    ('GoogleAdsService', 'mutate'): 'MutateGoogleAdsResponse',
+    ('CampaignService', 'mutate_campaigns'): 'MutateCampaignsResponse',
+    ('AdGroupService', 'mutate_ad_groups'): 'MutateAdGroupsResponse',
+    ('CampaignBudgetService', 'mutate_campaign_budgets'): 'MutateCampaignBudgetsResponse',
+}
+
+# Rows per SearchGoogleAdsStreamResponse, as sent by the real API
+STREAM_BATCH_SIZE = 10000
+
+# Resource collection named in resource names, per MutateOperation oneof field
+COLLECTIONS = {
+    'campaign_budget_operation': 'campaignBudgets',
+    'campaign_operation': 'campaigns',
+    'ad_group_operation': 'adGroups',
+    'ad_group_ad_operation': 'adGroupAds',
+}
+
+
+class FakeRpcError(grpc.RpcError):
+    """Transient RPC failure; the rate limiter treats UNAVAILABLE as retryable."""
+
+    def __init__(self, code=grpc.StatusCode.UNAVAILABLE):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+    def details(self):
+        return 'Injected by FakeGoogleAdsClient'
+
+
+class FakeGoogleAdsClient:
+    """
+    latency:               seconds per RPC (plus uniform +/- jitter)
+    latency_per_operation: extra seconds per operation in the request
+    error_rate:            share of operations rejected through partial failure
+                           (only for requests sent with partial_failure=True)
+    rpc_error_rate:        share of RPCs failing outright with UNAVAILABLE
+    record_requests:       keep (method name, operations, indexes rejected) of every
+                           mutate in `requests`, for tests
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, latency_per_operation=0.0, error_rate=0.0,
+                 rpc_error_rate=0.0, seed=None, record_requests=False):
+        self._client = GoogleAdsClient(credentials=None, developer_token='fake', use_proto_plus=True)
+        self.enums = self._client.enums
+        self.latency = latency
+        self.jitter = jitter
+        self.latency_per_operation = latency_per_operation
+        self.error_rate = error_rate
+        self.rpc_error_rate = rpc_error_rate
+        self._random = random.Random(seed)
+        self._next_id = 1000000
+        self._lock = threading.Lock()
+        self.rpc_count = 0
+        self.operation_count = 0
+        self.requests = [] if record_requests else None
+        # google campaign id -> [status enum value, budget amount micros]
+        self.campaigns = {}
+        # Sorted int ids of `campaigns`, for the keyset pages of the state query; None when stale
+        self._ordered_ids = None
+
+    def get_type(self, name):
+        return self._client.get_type(name)
+
+    def copy_from(self, destination, origin):
+        return self._client.copy_from(destination, origin)
+
+    def get_service(self, name):
+        return FakeService(self, name)
+
+    def add_campaigns(self, google_campaign_ids, status='ENABLED', budget_amount_micros=10000000):
+        """Register campaigns created elsewhere (e.g. a seeded dataset) so syncs find them."""
+        status = self.enums.CampaignStatusEnum[status].value
+        with self._lock:
+            for google_campaign_id in google_campaign_ids:
+                self.campaigns[str(google_campaign_id)] = [status, budget_amount_micros]
+            self._ordered_ids = None
+
+    def _new_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def _respond(self, service_name, method_name, customer_id, operations, partial_failure=False):
+        with self._lock:
+            self.rpc_count += 1
+            self.operation_count += len(operations)
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter) + self.latency_per_operation * len(operations)
+            fail_rpc = self._random.random() < self.rpc_error_rate
+            failed = {i for i in range(len(operations)) if partial_failure and self._random.random() < self.error_rate}
+            if self.requests is not None and operations:
+                self.requests.append((method_name, list(operations), failed))
+        time.sleep(max(0.0, delay))
+        if fail_rpc:
+            raise FakeRpcError()
+        if (service_name, method_name) not in RESPONSE_TYPES:
+            return None
+
+        response = self.get_type(RESPONSE_TYPES[(service_name, method_name)])
+        failure = self.get_type('GoogleAdsFailure')
+        created = {}  # temporary resource name -> created resource name
+        field_name = 'mutate_operations' if method_name == 'mutate' else 'operations'
+        for index, operation in enumerate(operations):
+            if method_name == 'mutate':
+                result = response._pb.mutate_operation_responses.add()
+                kind = operation._pb.WhichOneof('operation')
+            else:
+                result = response._pb.results.add()
+                kind = None
+            if index in failed:
+                error = failure._pb.errors.add()
+                error.message = 'Injected by FakeGoogleAdsClient'
+                element = error.location.field_path_elements.add()
+                element.field_name = field_name
+                element.index = index
+                continue
+            if kind is None:
+                result.resource_name = operation.update.resource_name or operation.create.resource_name
+                if service_name == 'CampaignService' and operation.update.resource_name:
+                    self._update_campaign(operation.update)
+            else:
+                resource_name = f'customers/{customer_id}/{COLLECTIONS.get(kind, "resources")}/{self._new_id()}'
+                getattr(result, kind.replace('_operation', '_result')).resource_name = resource_name
+                self._record_created(kind, getattr(operation, kind).create, resource_name, created)
+
+        if failure.errors:
+            detail = any_pb2.Any()
+            detail.Pack(type(failure).pb(failure))
+            response._pb.partial_failure_error.code = grpc.StatusCode.INVALID_ARGUMENT.value[0]
+            response._pb.partial_failure_error.message = f'{len(failure.errors)} operation(s) failed'
+            response._pb.partial_failure_error.details.append(detail)
+        return response
+
+    def _record_created(self, kind, resource, resource_name, created):
+        created[resource.resource_name] = resource_name
+        if kind == 'campaign_budget_operation':
+            created[resource_name] = resource.amount_micros
+        elif kind == 'campaign_operation':
+            budget_amount_micros = created.get(created.get(resource.campaign_budget, resource.campaign_budget), 0)
+            with self._lock:
+                self.campaigns[resource_name.split('/')[-1]] = [resource.status, budget_amount_micros]
+                self._ordered_ids = None
+
+    def _update_campaign(self, campaign):
+        with self._lock:
+            known = self.campaigns.get(campaign.resource_name.split('/')[-1])
+            if known is not None and campaign.status:
+                known[0] = campaign.status
+
+    def _search_stream(self, customer_id, query):
+        """Answers the remote sync's campaign state and metrics queries; other queries
+        (such as publish reconciliation lookups) find nothing."""
+        self._respond('GoogleAdsService', 'search_stream', customer_id, [])
+        if not re.search(r'\bFROM campaign\b', query) or 'WHERE campaign.campaign_budget' in query:
+            return iter(())
+        if 'metrics.' in query:
+            start, end = (date.fromisoformat(day) for day in re.findall(r"'(\d{4}-\d{2}-\d{2})'", query)[:2])
+            enabled = self.enums.CampaignStatusEnum.ENABLED.value
+            with self._lock:
+                google_campaign_ids = [c for c, (status, _) in self.campaigns.items() if status == enabled]
+            return self._metrics_batches(google_campaign_ids, start, end)
+        # Keyset pages of the state query: WHERE campaign.id > N ORDER BY campaign.id LIMIT M
+        after = re.search(r'campaign\.id > (\d+)', query)
+        limit = re.search(r'LIMIT (\d+)', query)
+        with self._lock:
+            if self._ordered_ids is None:
+                self._ordered_ids = sorted(int(google_campaign_id) for google_campaign_id in self.campaigns)
+            first = bisect.bisect_right(self._ordered_ids, int(after.group(1))) if after else 0
+            last = first + int(limit.group(1)) if limit else len(self._ordered_ids)
+            campaigns = [(str(i), *self.campaigns[str(i)]) for i in self._ordered_ids[first:last]]
+        return self._state_batches(campaigns)
+
+    def _state_batches(self, campaigns):
+        for start in range(0, len(campaigns), STREAM_BATCH_SIZE):
+            batch = self.get_type('SearchGoogleAdsStreamResponse')
+            for google_campaign_id, status, budget_amount_micros in campaigns[start:start + STREAM_BATCH_SIZE]:
+                row = batch._pb.results.add()
+                row.campaign.id = int(google_campaign_id)
+                row.campaign.status = status
+                row.campaign_budget.amount_micros = budget_amount_micros
+            yield batch
+
+    def _metrics_batches(self, google_campaign_ids, start, end):
+        batch = self.get_type('SearchGoogleAdsStreamResponse')
+        day = start
+        while day <= end:
+            day_text = day.isoformat()
+            for google_campaign_id in google_campaign_ids:
+                # Deterministic per campaign and day, so repeated syncs see the same numbers
+                seed = (int(google_campaign_id) * 7919 + day.toordinal()) % 100003
+                row = batch._pb.results.add()
+                row.campaign.id = int(google_campaign_id)
+                row.segments.date = day_text
+                row.metrics.impressions = 100 + seed % 5000
+                row.metrics.clicks = seed % 97
+                row.metrics.cost_micros = (seed % 97) * 350000
+                if len(batch._pb.results) == STREAM_BATCH_SIZE:
+                    yield batch
+                    batch = self.get_type('SearchGoogleAdsStreamResponse')
+            day += timedelta(days=1)
+        if batch._pb.results:
+            yield batch
+
+
+class FakeService:
+    def __init__(self, client, name):
+        self._client = client
+        self._name = name
+
+    def __getattr__(self, method_name):
+        if (self._name, method_name) == ('GoogleAdsService', 'search_stream'):
+            def search_stream(customer_id, query, **kwargs):
+                return self._client._search_stream(customer_id, query)
+            return search_stream
+        if (self._name, method_name) not in RESPONSE_TYPES:
+            raise AttributeError(f'{self._name} has no fake method {method_name}')
+
+        def call(customer_id, operations=None, mutate_operations=None, partial_failure=False, **kwargs):
+            return self._client._respond(self._name, method_name, customer_id,
+                                         operations or mutate_operations or [], partial_failure)
+        return call
+
+    @staticmethod
+    def campaign_path(customer_id, campaign_id):
+        return f'customers/{customer_id}/campaigns/{campaign_id}'
+
+    @staticmethod
+    def campaign_budget_path(customer_id, campaign_budget_id):
+        return f'customers/{customer_id}/campaignBudgets/{campaign_budget_id}'
+
+    @staticmethod
+    def ad_group_path(customer_id, ad_group_id):
+        return f'customers/{customer_id}/adGroups/{ad_group_id}'
@@ -0,0 +1,186 @@
+"""
+Midnight burst of the flight scheduler: a large share of a dataset's campaigns start or
+end on the same day, and one or more scheduler passes (one per simulated node, running
+side by side) move them all against FakeGoogleAdsClient.
+
+Half of the `--transitions` campaigns are made SCHEDULED to start on as_of, the other
+half PUBLISHED with a flight that ended the day before; every other campaign is given a
+flight that is neither starting nor ending. Reports transitions per second and the Google
+Ads RPCs and operations it took, then checks that nothing is left due, that the
+campaign_summary deltas add up to a rebuild, and that Google Ads ended up with the right
+statuses:
+
+    python benchmarks/flights.py --dataset 100k --transitions 100000 --nodes 2
+"""
+from datetime import datetime, timedelta, timezone
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import seed as seeding  # noqa: E402
+from run import configure_environment, git_commit, working_database_url  # noqa: E402
+
+# Google campaign ids given to burst campaigns that were never published, past the seed's
+GOOGLE_ID_OFFSET = 3 * 10 ** 9
+# Rows per UPDATE executemany while setting up the burst
+SETUP_CHUNK_SIZE = 5000
+
+
+def set_up_burst(db, fake, transitions, as_of):
+    """Rewrite the flights so exactly `transitions` campaigns are due on as_of. Returns
+    (ids to activate, ids to end)."""
+    from models import Campaign
+    from sqlalchemy import select, update
+    import campaign_summary
+
+    db.session.execute(update(Campaign).values(start_date=as_of - timedelta(days=30), end_date=as_of + timedelta(days=30)))
+    rows = db.session.execute(select(Campaign.id, Campaign.google_campaign_id).order_by(Campaign.id).limit(transitions)).all()
+    activate, end = rows[:len(rows) // 2], rows[len(rows) // 2:]
+    updates = []
+    for index, row in enumerate(rows):
+        google_campaign_id = row.google_campaign_id or str(GOOGLE_ID_OFFSET + index)
+        if index < len(activate):
+            updates.append({'id': row.id, 'status': 'SCHEDULED', 'google_campaign_id': google_campaign_id,
+                            'start_date': as_of, 'end_date': as_of + timedelta(days=30)})
+        else:
+            updates.append({'id': row.id, 'status': 'PUBLISHED', 'google_campaign_id': google_campaign_id,
+                            'start_date': as_of - timedelta(days=30), 'end_date': as_of - timedelta(days=1)})
+    for start in range(0, len(updates), SETUP_CHUNK_SIZE):
+        db.session.execute(update(Campaign), updates[start:start + SETUP_CHUNK_SIZE])
+    db.session.commit()
+    campaign_summary.rebuild()
+
+    google_ids = {update_['id']: update_['google_campaign_id'] for update_ in updates}
+    fake.add_campaigns([google_ids[row.id] for row in activate], status='PAUSED')
+    fake.add_campaigns([google_ids[row.id] for row in end], status='ENABLED')
+    return [google_ids[row.id] for row in activate], [google_ids[row.id] for row in end]
+
+
+def verify(db, fake, activate, end, as_of):
+    """Problems left after the burst, as messages."""
+    from models import Campaign
+    from scheduler import TRANSITIONS, is_due
+    from sqlalchemy import func, select
+    import campaign_summary
+
+    problems = []
+    for _, from_status, date_column, to_status, _ in TRANSITIONS:
+        due = db.session.scalar(select(func.count()).select_from(Campaign).where(
+            Campaign.status == from_status, is_due(date_column, as_of)))
+        if due:
+            problems.append(f'{due} campaign(s) still due {from_status} -> {to_status}')
+    incremental = campaign_summary.summarize()
+    campaign_summary.rebuild()
+    if campaign_summary.summarize() != incremental:
+        problems.append('campaign_summary differs from a rebuild')
+    for google_ids, status in ((activate, 'ENABLED'), (end, 'PAUSED')):
+        value = fake.enums.CampaignStatusEnum[status].value
+        wrong = sum(1 for google_id in google_ids if fake.campaigns[google_id][0] != value)
+        if wrong:
+            problems.append(f'{wrong} campaign(s) not {status} in Google Ads')
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', choices=seeding.DATASETS, default='100k')
+    parser.add_argument('--database-url', help='use this database in place of a copied SQLite dataset')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--transitions', type=int, default=100000, help='campaigns starting or ending at once')
+    parser.add_argument('--nodes', type=int, default=1, help='scheduler passes run side by side')
+    parser.add_argument('--batch-size', type=int, default=1000, help='campaigns per batch')
+    parser.add_argument('--concurrency', type=int, default=4, help='batch threads per pass')
+    parser.add_argument('--ads-latency', type=float, default=0.0, help='fake Google Ads seconds per RPC')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    database_url = args.database_url or working_database_url(args.dataset, args.seed, suffix='flights')
+    configure_environment(database_url)
+
+    from app import create_app
+    from extensions import ads_service, response_cache
+    from fake_ads import FakeGoogleAdsClient
+    from models import db
+    from scheduler import Scheduler
+
+    app = create_app()
+    fake = FakeGoogleAdsClient(latency=args.ads_latency, seed=args.seed)
+    ads_service.client = fake
+    as_of = datetime.now(timezone.utc).date()
+
+    with app.app_context():
+        db.create_all()
+        activate, end = set_up_burst(db, fake, args.transitions, as_of)
+        db.session.remove()
+    print(f'{args.dataset} dataset: {len(activate)} starting and {len(end)} ending on {as_of}, '
+          f'{args.nodes} node(s) x {args.concurrency} threads, batch size {args.batch_size}\n')
+
+    schedulers = [Scheduler(ads_service, app, response_cache=response_cache) for _ in range(args.nodes)]
+    for scheduler in schedulers:
+        scheduler.batch_size = args.batch_size
+        scheduler.concurrency = args.concurrency
+    runs = [None] * args.nodes
+
+    def run_node(index):
+        runs[index] = schedulers[index].run(as_of)
+
+    threads = [threading.Thread(target=run_node, args=(index,)) for index in range(args.nodes)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+
+    moved = sum(run['activated'] + run['ended'] for run in runs)
+    results = {
+        'seconds': round(seconds, 3),
+        'activated': sum(run['activated'] for run in runs),
+        'ended': sum(run['ended'] for run in runs),
+        'failed': sum(run['failed'] for run in runs),
+        'transitions_per_second': round(moved / seconds) if seconds else None,
+        'rpcs': fake.rpc_count,
+        'operations': fake.operation_count,
+        'runs': runs,
+    }
+    print(f"{'node':<6}{'activated':>10}{'ended':>10}{'failed':>10}{'status':>11}")
+    for index, run in enumerate(runs):
+        print(f"{index:<6}{run['activated']:>10}{run['ended']:>10}{run['failed']:>10}{run['status']:>11}")
+    print(f"\n{moved} transitions in {results['seconds']} s ({results['transitions_per_second']}/s), "
+          f"{results['rpcs']} Google Ads RPCs, {results['operations']} operations")
+
+    with app.app_context():
+        problems = verify(db, fake, activate, end, as_of)
+        db.session.remove()
+    results['problems'] = problems
+    print('\n' + ('\n'.join(problems) if problems else 'Verified: nothing left due, summary consistent, Google Ads statuses match'))
+
+    results['meta'] = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'dataset': args.dataset,
+        'database': database_url.split(':', 1)[0],
+        'transitions': args.transitions,
+        'nodes': args.nodes,
+        'batch_size': args.batch_size,
+        'concurrency': args.concurrency,
+        'ads_latency': args.ads_latency,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nSaved {args.save}')
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+Query plans and timings of the hot lookups before and after an index migration, on a
+seeded dataset: a campaign's ad groups (newest first, and in export order), deleting a
+campaign's ad groups, a campaign by its Google Ads id, and a filtered page of campaigns.
+
+The copy of the dataset is migrated down to `--before` (default: the revision before
+head), measured, migrated back up to head (timing the migration itself) and measured
+again. Every query runs once per sampled campaign, with the same samples on both sides:
+
+    python benchmarks/indexes.py --dataset 100k --samples 500
+"""
+from datetime import datetime, timezone
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import seed as seeding  # noqa: E402
+from run import configure_environment, git_commit, working_database_url  # noqa: E402
+
+# name -> (SQL, whether it writes and must be rolled back)
+QUERIES = {
+    'ad_groups_newest_first': (
+        'SELECT * FROM ad_groups WHERE campaign_id = :campaign_id ORDER BY created_at DESC', False),
+    'ad_groups_export_order': (
+        'SELECT * FROM ad_groups WHERE campaign_id = :campaign_id ORDER BY created_at, id', False),
+    'delete_ad_groups': (
+        'DELETE FROM ad_groups WHERE campaign_id = :campaign_id', True),
+    'campaign_by_google_id': (
+        'SELECT id FROM campaigns WHERE google_campaign_id = :google_campaign_id', False),
+    'campaigns_by_status_page': (
+        'SELECT id, name, created_at FROM campaigns WHERE status = :status '
+        'ORDER BY created_at DESC, id DESC LIMIT 50', False),
+}
+
+
+def statement(sql, prefix=''):
+    from models import Campaign
+    from sqlalchemy import bindparam, text
+
+    query = text(prefix + sql)
+    if ':campaign_id' in sql:
+        query = query.bindparams(bindparam('campaign_id', type_=Campaign.id.type))
+    return query
+
+
+def explain(db, sql, params):
+    """The query plan, one line per step."""
+    if db.session.get_bind().dialect.name == 'sqlite':
+        return [row[-1] for row in db.session.execute(statement(sql, 'EXPLAIN QUERY PLAN '), params)]
+    return [row[0] for row in db.session.execute(statement(sql, 'EXPLAIN '), params)]
+
+
+def measure(db, samples):
+    """{query name: {'plan': [...], 'p50_ms': ..., 'mean_ms': ...}} over `samples`."""
+    results = {}
+    for name, (sql, writes) in QUERIES.items():
+        query = statement(sql)
+        timings = []
+        for params in samples:
+            started = time.perf_counter()
+            result = db.session.execute(query, params)
+            if result.returns_rows:
+                result.all()
+            timings.append(time.perf_counter() - started)
+            if writes:
+                db.session.rollback()
+        results[name] = {
+            'plan': explain(db, sql, samples[0]),
+            'p50_ms': round(statistics.median(timings) * 1000, 3),
+            'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+        }
+        db.session.rollback()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', choices=seeding.DATASETS, default='100k')
+    parser.add_argument('--database-url', help='use this database (migrated to head) in place of a copied SQLite dataset')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--before', default='-1', help='revision to measure against head (default: the one before it)')
+    parser.add_argument('--samples', type=int, default=500, help='campaigns to run each query for')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    database_url = args.database_url or working_database_url(args.dataset, args.seed, suffix='indexes')
+    configure_environment(database_url)
+
+    from app import create_app
+    from flask_migrate import Migrate, downgrade, stamp, upgrade
+    from models import db, Campaign
+    from sqlalchemy import select
+
+    app = create_app()
+    Migrate(app, db, directory=os.path.join(BACKEND_DIR, 'migrations'))
+
+    with app.app_context():
+        if not args.database_url:
+            # Seeded datasets are built from the models, i.e. at head
+            db.create_all()
+            stamp()
+        rows = db.session.execute(
+            select(Campaign.id, Campaign.google_campaign_id, Campaign.status).where(Campaign.google_campaign_id.isnot(None))
+        ).all()
+        samples = [{'campaign_id': row.id, 'google_campaign_id': row.google_campaign_id, 'status': row.status}
+                   for row in random.Random(args.seed).sample(rows, min(args.samples, len(rows)))]
+        db.session.remove()
+
+        downgrade(revision=args.before)
+        before = measure(db, samples)
+        db.session.remove()
+        started = time.perf_counter()
+        upgrade()
+        migration_seconds = time.perf_counter() - started
+        after = measure(db, samples)
+        db.session.remove()
+
+    print(f'{args.dataset} dataset, {len(samples)} samples per query; migration {args.before} -> head '
+          f'took {migration_seconds:.2f} s\n')
+    print(f"{'query':<28}{'before p50 ms':>15}{'after p50 ms':>14}{'speedup':>9}")
+    for name in QUERIES:
+        speedup = before[name]['p50_ms'] / after[name]['p50_ms'] if after[name]['p50_ms'] else float('inf')
+        print(f"{name:<28}{before[name]['p50_ms']:>15}{after[name]['p50_ms']:>14}{speedup:>8.1f}x")
+    for name in QUERIES:
+        print(f'\n{name}\n  before: ' + '\n          '.join(before[name]['plan']) +
+              '\n  after:  ' + '\n          '.join(after[name]['plan']))
+
+    results = {
+        'before': before,
+        'after': after,
+        'migration_seconds': round(migration_seconds, 3),
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'dataset': args.dataset,
+            'database': database_url.split(':', 1)[0],
+            'before': args.before,
+            'samples': len(samples),
+        },
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nSaved {args.save}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Load test for the main API endpoints against a running server.
+
+Seeds campaigns and ad groups through the :batch endpoints, then drives each scenario
+for a fixed duration from a pool of threads (one keep-alive HTTP session per thread)
+and reports requests/sec and latency percentiles.
+
+    # e.g. against the production server on a local SQLite stand-in
+    DATABASE_URL=sqlite:////tmp/loadtest.db gunicorn -c gunicorn.conf.py wsgi:app
+    python benchmarks/loadtest.py --url http://localhost:5000/api --duration 20 --concurrency 32
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import random
+import time
+
+import requests
+
+
+def seed(url, campaigns, ad_groups_per_campaign):
+    """Create the campaigns and ad groups the scenarios read from. Returns (campaign ids, ad group ids)."""
+    campaign_ids = []
+    for start in range(0, campaigns, 1000):
+        batch = [new_campaign(f'Load test {start + i}') for i in range(min(1000, campaigns - start))]
+        response = requests.post(f'{url}/campaigns:batch', json=batch)
+        response.raise_for_status()
+        campaign_ids.extend(response.json()['ids'])
+
+    ad_group_ids = []
+    for campaign_id in campaign_ids:
+        batch = [
+            {'name': f'Ad group {i}', 'keywords': f'keyword {i}, "phrase {i}"', 'cpc_bid': 1.0}
+            for i in range(ad_groups_per_campaign)
+        ]
+        if batch:
+            response = requests.post(f'{url}/campaigns/{campaign_id}/ad-groups:batch', json=batch)
+            response.raise_for_status()
+            ad_group_ids.extend(response.json()['ids'])
+    return campaign_ids, ad_group_ids
+
+
+def new_campaign(name):
+    return {
+        'name': name,
+        'objective': random.choice(['Sales', 'Leads', 'Website traffic']),
+        'daily_budget': random.randint(10, 1000),
+        'start_date': '2026-01-01',
+        'end_date': '2026-12-31'
+    }
+
+
+# name -> (method, path builder, JSON body builder or None)
+SCENARIOS = {
+    'list_campaigns': ('GET', lambda ids: '/campaigns?limit=50', None),
+    'list_campaigns_filtered': ('GET', lambda ids: '/campaigns?status=DRAFT&objective=Sales&limit=50', None),
+    'get_campaign': ('GET', lambda ids: f"/campaigns/{random.choice(ids['campaigns'])}", None),
+    'list_ad_groups': ('GET', lambda ids: f"/campaigns/{random.choice(ids['campaigns'])}/ad-groups", None),
+    'get_ad_group': ('GET', lambda ids: f"/ad-groups/{random.choice(ids['ad_groups'])}", None),
+    'update_ad_group': ('PUT', lambda ids: f"/ad-groups/{random.choice(ids['ad_groups'])}",
+                        lambda: {'cpc_bid': round(random.uniform(0.1, 5), 2)}),
+    'create_campaign': ('POST', lambda ids: '/campaigns', lambda: new_campaign('Load test')),
+}
+
+
+def run_scenario(url, name, ids, duration, concurrency):
+    method, path, body = SCENARIOS[name]
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        session = requests.Session()
+        latencies, errors = [], 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = session.request(method, url + path(ids), json=body() if body else None)
+                ok = response.status_code < 400
+            except requests.RequestException:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+        session.close()
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: worker(), range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for worker_latencies, _ in results for latency in worker_latencies)
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors for _, errors in results),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': percentile_ms(latencies, 50),
+        'p90_ms': percentile_ms(latencies, 90),
+        'p99_ms': percentile_ms(latencies, 99),
+        'max_ms': percentile_ms(latencies, 100),
+    }
+
+
+def percentile_ms(sorted_values, pct):
+    """Nearest-rank percentile, in milliseconds."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return round(sorted_values[index] * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5000/api', help='API base URL')
+    parser.add_argument('--duration', type=float, default=20, help='seconds per scenario')
+    parser.add_argument('--concurrency', type=int, default=32, help='concurrent client threads')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated scenario names')
+    parser.add_argument('--campaigns', type=int, default=200, help='campaigns to seed')
+    parser.add_argument('--ad-groups', type=int, default=20, help='ad groups to seed per campaign')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args()
+
+    names = args.scenarios.split(',')
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    campaign_ids, ad_group_ids = seed(args.url, args.campaigns, args.ad_groups)
+    ids = {'campaigns': campaign_ids, 'ad_groups': ad_group_ids}
+    print(f'Seeded {len(campaign_ids)} campaigns, {len(ad_group_ids)} ad groups; '
+          f'{args.concurrency} threads, {args.duration:g}s per scenario\n')
+
+    results = {}
+    print(f"{'scenario':<26}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name in names:
+        result = results[name] = run_scenario(args.url, name, ids, args.duration, args.concurrency)
+        print(f"{name:<26}{result['requests']:>10}{result['errors']:>8}{result['rps']:>10}"
+              f"{result['p50_ms']:>10}{result['p90_ms']:>10}{result['p99_ms']:>10}{result['max_ms']:>10}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'url': args.url, 'duration': args.duration, 'concurrency': args.concurrency,
+                       'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Latency of GET /api/campaigns at increasing page depths, to check that keyset pagination
+costs the same on page 10000 as on page 1.
+
+Cursors for the deep pages are taken straight from the database (the row just before the
+page, as the API would have returned in X-Next-Cursor), so no page has to be walked to
+reach them. Every depth is requested `--requests` times, round robin so drift affects all
+depths alike, unfiltered and with a status filter. Exits with status 1 if the p95 of the
+deepest page is more than `--max-ratio` times that of the first:
+
+    python benchmarks/pagination.py --dataset 1m
+"""
+from datetime import datetime, timezone
+import argparse
+import json
+import os
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import seed as seeding  # noqa: E402
+from run import configure_environment, git_commit, percentile_ms, working_database_url  # noqa: E402
+
+# Pages to fetch, as far as the dataset goes; the last page is always added
+PAGES = (1, 10, 100, 1000, 10000)
+# name -> query string of the listing, besides limit and cursor
+LISTINGS = {
+    'all': '',
+    'published': 'status=PUBLISHED',
+}
+
+
+def cursors(db, status, limit, pages):
+    """{page: cursor (None for the first)} for the listing filtered on `status`."""
+    from app import encode_cursor
+    from models import Campaign
+    from sqlalchemy import func, select
+
+    query = select(Campaign.created_at, Campaign.id)
+    if status:
+        query = query.where(Campaign.status == status)
+    total = db.session.scalar(select(func.count()).select_from(query.subquery()))
+    last_page = max(1, -(-total // limit))
+    result = {}
+    for page in sorted({page for page in pages if page <= last_page} | {last_page}):
+        if page == 1:
+            result[page] = None
+            continue
+        row = db.session.execute(
+            query.order_by(Campaign.created_at.desc(), Campaign.id.desc()).offset((page - 1) * limit - 1).limit(1)
+        ).one()
+        result[page] = encode_cursor(row.created_at, row.id)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', choices=seeding.DATASETS, default='1m')
+    parser.add_argument('--database-url', help='use this database in place of a copied SQLite dataset')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--limit', type=int, default=50, help='campaigns per page')
+    parser.add_argument('--requests', type=int, default=200, help='requests per page depth')
+    parser.add_argument('--max-ratio', type=float, default=2.0, help='allowed deepest / first page p95')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    # Only the campaigns table is read, so ad groups and keywords aren't seeded
+    database_url = args.database_url or working_database_url(args.dataset, args.seed, suffix='pagination',
+                                                             campaigns_only=True)
+    configure_environment(database_url)
+
+    from app import create_app
+    from models import db
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        listing_cursors = {name: cursors(db, query.partition('=')[2], args.limit, PAGES) for name, query in LISTINGS.items()}
+        db.session.remove()
+
+    client = app.test_client()
+    paths = {
+        (name, page): f"/api/campaigns?limit={args.limit}&{LISTINGS[name]}" + (f'&cursor={cursor}' if cursor else '')
+        for name, pages in listing_cursors.items() for page, cursor in pages.items()
+    }
+    timings = {key: [] for key in paths}
+    for key, path in paths.items():  # warm up
+        assert client.get(path).status_code == 200, path
+    for _ in range(args.requests):
+        for key, path in paths.items():
+            started = time.perf_counter()
+            response = client.get(path)
+            timings[key].append(time.perf_counter() - started)
+            assert response.status_code == 200 and response.get_json(), path
+
+    results, problems = {}, []
+    print(f"{'listing':<12}{'page':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for name, pages in listing_cursors.items():
+        results[name] = {}
+        for page in pages:
+            values = sorted(timings[name, page])
+            results[name][page] = {'p50_ms': percentile_ms(values, 50), 'p95_ms': percentile_ms(values, 95),
+                                   'max_ms': percentile_ms(values, 100)}
+            print(f"{name:<12}{page:>8}{results[name][page]['p50_ms']:>10}{results[name][page]['p95_ms']:>10}"
+                  f"{results[name][page]['max_ms']:>10}")
+        first, deepest = results[name][min(pages)], results[name][max(pages)]
+        if deepest['p95_ms'] > first['p95_ms'] * args.max_ratio:
+            problems.append(f"{name}: page {max(pages)} p95 {deepest['p95_ms']} ms is over {args.max_ratio}x "
+                            f"page 1's {first['p95_ms']} ms")
+    print('\n' + ('\n'.join(problems) if problems else f'p95 stays within {args.max_ratio}x of page 1 at every depth'))
+
+    results['problems'] = problems
+    results['meta'] = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'dataset': args.dataset,
+        'database': database_url.split(':', 1)[0],
+        'limit': args.limit,
+        'requests': args.requests,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nSaved {args.save}')
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+Stress test of the publish queue in mock mode (no Google Ads credentials): `--campaigns`
+draft campaigns are published at once by `--concurrency` client threads, as the request
+threads of a Gunicorn worker would (GUNICORN_THREADS, default 8) while its PUBLISH_WORKERS
+threads drain the queue.
+
+Reports the POST /publish latency (requests only enqueue) and the time until the queue
+has drained, then checks that every request got 202, every job SUCCEEDED, every campaign
+ended up PUBLISHED or SCHEDULED with its own Google id, and campaign_summary matches a
+rebuild. Exits with status 1 otherwise:
+
+    python benchmarks/publish_stress.py --campaigns 10000 --concurrency 8
+"""
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import seed as seeding  # noqa: E402
+from run import Context, configure_environment, git_commit, new_campaign, percentile_ms, working_database_url  # noqa: E402
+
+
+def verify(db, campaign_ids, statuses):
+    """Problems left after the queue drained, as messages."""
+    from models import Campaign, PublishJob
+    from sqlalchemy import func, select
+    import campaign_summary
+
+    problems = []
+    unexpected = {status: count for status, count in statuses.items() if status != 202}
+    if unexpected:
+        problems.append(f'responses other than 202: {unexpected}')
+    ids = [uuid.UUID(campaign_id) for campaign_id in campaign_ids]
+    jobs, campaigns, google_ids = Counter(), Counter(), 0
+    for start in range(0, len(ids), 5000):
+        chunk = ids[start:start + 5000]
+        jobs.update(dict(db.session.execute(
+            select(PublishJob.status, func.count()).where(PublishJob.campaign_id.in_(chunk)).group_by(PublishJob.status)).all()))
+        campaigns.update(dict(db.session.execute(
+            select(Campaign.status, func.count()).where(Campaign.id.in_(chunk)).group_by(Campaign.status)).all()))
+        google_ids += db.session.scalar(select(func.count(func.distinct(Campaign.google_campaign_id))).where(Campaign.id.in_(chunk)))
+    if jobs != {'SUCCEEDED': len(ids)}:
+        problems.append(f'jobs: {dict(jobs)}')
+    if set(campaigns) - {'PUBLISHED', 'SCHEDULED'}:
+        problems.append(f'campaigns: {dict(campaigns)}')
+    if google_ids != len(ids):
+        problems.append(f'{google_ids} distinct Google campaign ids for {len(ids)} campaigns')
+    incremental = campaign_summary.summarize()
+    campaign_summary.rebuild()
+    if campaign_summary.summarize() != incremental:
+        problems.append('campaign_summary differs from a rebuild')
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', choices=seeding.DATASETS, default='1k')
+    parser.add_argument('--database-url', help='use this database in place of a copied SQLite dataset')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--campaigns', type=int, default=10000, help='draft campaigns published at once')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads sending the requests')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    database_url = args.database_url or working_database_url(args.dataset, args.seed, suffix='publish')
+    configure_environment(database_url)
+    # Mock mode: GoogleAdsService only calls Google Ads with every credential set
+    os.environ['GOOGLE_ADS_DEVELOPER_TOKEN'] = ''
+
+    from app import create_app
+    from extensions import ads_service, publish_queue
+    from models import db
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.remove()
+    assert ads_service.client is None, 'not in mock mode'
+    ctx = Context(app.test_client(), random.Random(args.seed))
+    campaign_ids = ctx.client.post('/api/campaigns:batch', json=[new_campaign(ctx, i) for i in range(args.campaigns)]).get_json()['ids']
+
+    clients = threading.local()
+    statuses, errors = Counter(), Counter()
+
+    def publish(campaign_id):
+        if not hasattr(clients, 'client'):
+            clients.client = app.test_client()
+        started = time.perf_counter()
+        response = clients.client.post(f'/api/campaigns/{campaign_id}/publish')
+        return time.perf_counter() - started, response.status_code, response.get_json().get('error')
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as executor:
+        outcomes = list(executor.map(publish, campaign_ids))
+    requests_seconds = time.perf_counter() - started
+    publish_queue.join()
+    drained_seconds = time.perf_counter() - started
+
+    latencies = sorted(outcome[0] for outcome in outcomes)
+    for _, status, error in outcomes:
+        statuses[status] += 1
+        if error:
+            errors[error] += 1
+    results = {
+        'requests_seconds': round(requests_seconds, 3),
+        'requests_per_second': round(len(outcomes) / requests_seconds),
+        'p50_ms': percentile_ms(latencies, 50),
+        'p99_ms': percentile_ms(latencies, 99),
+        'drained_seconds': round(drained_seconds, 3),
+        'publishes_per_second': round(len(outcomes) / drained_seconds),
+        'statuses': dict(statuses),
+        'errors': dict(errors.most_common(10)),
+    }
+    print(f"{len(outcomes)} publishes from {args.concurrency} threads: requests took {results['requests_seconds']} s "
+          f"({results['requests_per_second']}/s, p50 {results['p50_ms']} ms, p99 {results['p99_ms']} ms); "
+          f"queue drained after {results['drained_seconds']} s ({results['publishes_per_second']} publishes/s)")
+    for error, count in errors.most_common(10):
+        print(f'  {count} x {error}')
+
+    with app.app_context():
+        problems = verify(db, campaign_ids, statuses)
+        db.session.remove()
+    results['problems'] = problems
+    print('\n' + ('\n'.join(problems) if problems else 'Verified: every job SUCCEEDED, every campaign published with its own '
+                                                        'Google id, summary consistent'))
+
+    results['meta'] = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'dataset': args.dataset,
+        'database': database_url.split(':', 1)[0],
+        'campaigns': args.campaigns,
+        'concurrency': args.concurrency,
+        'publish_workers': publish_queue.num_workers,
+        'publish_batch_size': publish_queue.batch_size,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nSaved {args.save}')
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
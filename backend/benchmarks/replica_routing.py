@@ -0,0 +1,101 @@
+"""
+Read-replica routing against local stand-ins: two copies of a seeded SQLite dataset (the
+primary and a replica) plus a replica URL that can't be opened. Nothing replicates
+between the copies, so every response shows which database served it.
+
+Checks, through the Flask test client, that:
+- read-only endpoints are served by the working replica, the broken one being skipped;
+- a client that wrote reads from the primary (and sees its write) for REPLICA_PIN_SECONDS,
+  while other clients keep reading the replica;
+- the writing client goes back to the replica once the pin expires;
+- other endpoints and all writes use the primary.
+
+    python benchmarks/replica_routing.py --dataset 1k
+"""
+import argparse
+import os
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import seed as seeding  # noqa: E402
+from run import configure_environment, working_database_url  # noqa: E402
+
+# Opening it fails, as connecting to a replica that is down would
+BROKEN_REPLICA_URL = 'sqlite:////nonexistent/replica.db'
+# Appended to ad group names in the replica copy
+REPLICA_MARK = ' (replica)'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', choices=seeding.DATASETS, default='1k')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--pin-seconds', type=int, default=1, help='REPLICA_PIN_SECONDS')
+    parser.add_argument('--requests', type=int, default=20, help='reads per endpoint')
+    args = parser.parse_args()
+
+    primary_url = working_database_url(args.dataset, args.seed, suffix='primary')
+    replica_url = working_database_url(args.dataset, args.seed, suffix='replica')
+    configure_environment(primary_url)
+    os.environ['DATABASE_REPLICA_URLS'] = f'{BROKEN_REPLICA_URL},{replica_url}'
+    os.environ['REPLICA_PIN_SECONDS'] = str(args.pin_seconds)
+
+    from app import create_app
+    from extensions import replica_router
+    from models import db, AdGroup, Campaign
+    from replicas import ROUTE_HEADER
+    from sqlalchemy import select, update
+
+    app = create_app()
+    with app.app_context():
+        db.create_all(bind_key=None)
+        with db.engines['replica_1'].begin() as connection:
+            connection.execute(update(AdGroup).values(name=AdGroup.name + REPLICA_MARK))
+        ad_group_id, campaign_id = db.session.execute(select(AdGroup.id, AdGroup.campaign_id).limit(1)).one()
+        published_id = db.session.scalar(select(Campaign.id).where(Campaign.status == 'PUBLISHED').limit(1))
+        db.session.remove()
+
+    failures = []
+
+    def check(description, ok):
+        print(f"{'ok  ' if ok else 'FAIL'} {description}")
+        if not ok:
+            failures.append(description)
+
+    writer, reader = app.test_client(), app.test_client()
+    reads = ('/api/campaigns?limit=20', f'/api/campaigns/{campaign_id}', f'/api/campaigns/{campaign_id}/ad-groups',
+             f'/api/ad-groups/{ad_group_id}', '/api/campaigns/summary', f'/api/campaigns/{published_id}/forecast')
+    for path in reads:
+        routes = {reader.get(path).headers.get(ROUTE_HEADER) for _ in range(args.requests)}
+        check(f'{args.requests} x GET {path.split("?")[0]} served by replica_1 (got {sorted(map(str, routes))})',
+              routes == {'replica_1'})
+    check(f'broken replica_0 is skipped (health {replica_router.health()})', replica_router.health()['replica_0'] > 0)
+    response = reader.get('/api/schedule/runs')
+    check('GET /api/schedule/runs is not routed', response.status_code == 200 and ROUTE_HEADER not in response.headers)
+
+    def ad_group_name(client):
+        response = client.get(f'/api/ad-groups/{ad_group_id}')
+        return response.json['name'], response.headers.get(ROUTE_HEADER)
+
+    name, _ = ad_group_name(reader)
+    check('replica data is served before the write', name.endswith(REPLICA_MARK))
+    response = writer.put(f'/api/ad-groups/{ad_group_id}', json={'name': 'Renamed on the primary'})
+    check('PUT /api/ad-groups/<id> succeeds', response.status_code == 200)
+    name, route = ad_group_name(reader)
+    check('another client keeps reading the replica', route == 'replica_1' and name.endswith(REPLICA_MARK))
+    # The reader's response was cached after the write; the pinned writer must not be served it
+    check('the writer reads its write from the primary', ad_group_name(writer) == ('Renamed on the primary', 'primary'))
+    time.sleep(args.pin_seconds + 1)
+    check('the writer reads the replica again once the pin expires', ad_group_name(writer)[1] == 'replica_1')
+
+    print(f'\n{len(failures)} failure(s)' if failures else '\nAll checks passed')
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
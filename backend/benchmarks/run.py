@@ -0,0 +1,381 @@
+"""
+Benchmark every API endpoint in-process through the Flask test client, on a seeded
+synthetic dataset, with Google Ads replaced by FakeGoogleAdsClient.
+
+For each scenario, reports throughput, p50/p90/p99 latency, SQL statements per request
+and the peak Python memory allocated while serving it. Results can be saved as a JSON
+baseline and later runs compared against it:
+
+    python benchmarks/run.py --dataset 1k --save benchmarks/baselines/1k.json
+    python benchmarks/run.py --dataset 1k --compare benchmarks/baselines/1k.json
+
+With --http-url, the loadtest.py scenarios are also run against a live server (an HTTP
+load generator with concurrent clients) and included in the results.
+
+SQLite datasets are seeded once per schema into benchmarks/data/<dataset>-<schema>.db and
+copied for each run, so every run starts from identical data. With --database-url (e.g. PostgreSQL),
+the database is used in place and seeded only when it holds no campaigns.
+"""
+from datetime import datetime, timezone
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import seed as seeding  # noqa: E402
+
+BATCH_SIZE = 1000
+# Iterations for scenarios that move a lot of rows per request, relative to --iterations
+HEAVY_ITERATIONS = 5
+
+
+class Context:
+    """Ids sampled from the dataset, plus pools consumed by scenarios that change state."""
+
+    def __init__(self, client, rng):
+        self.client = client
+        self.rng = rng
+
+    def pick(self, name):
+        return self.rng.choice(getattr(self, name))
+
+
+def sample_ids(db, pool_size):
+    from models import Campaign, AdGroup, Keyword
+    from sqlalchemy import select
+
+    def ids(query):
+        return [str(value) for value in db.session.execute(query.limit(pool_size)).scalars()]
+
+    return {
+        'campaigns': ids(select(Campaign.id).order_by(Campaign.created_at.desc())),
+        'draft_campaigns': ids(select(Campaign.id).where(Campaign.status == 'DRAFT')),
+        'published_campaigns': ids(select(Campaign.id).where(Campaign.status == 'PUBLISHED')),
+        'ad_groups': ids(select(AdGroup.id)),
+        'enabled_ad_groups': ids(select(AdGroup.id).where(AdGroup.status == 'ENABLED', AdGroup.google_ad_group_id.isnot(None))),
+        'keywords': list(db.session.execute(select(Keyword.normalized_text).limit(pool_size)).scalars()),
+    }
+
+
+def new_campaign(ctx, index=0):
+    return {
+        'name': f'Benchmark campaign {index}',
+        'objective': ctx.rng.choice(seeding.OBJECTIVES),
+        'daily_budget': ctx.rng.randrange(10, 5000),
+        'start_date': '2026-03-01',
+        'end_date': '2026-06-30'
+    }
+
+
+def new_ad_group(ctx, index=0):
+    return {
+        'name': f'Benchmark ad group {index}',
+        'keywords': ', '.join(ctx.rng.sample(seeding.KEYWORD_VOCABULARY, 3)),
+        'cpc_bid': 1.5,
+        'ad_headline': 'Benchmark headline',
+        'final_url': 'https://example.com'
+    }
+
+
+def flip_status(ctx, path, ids_name, states):
+    """Alternate a fixed set of ids between two statuses, so every iteration updates rows."""
+    ctx.flips = getattr(ctx, 'flips', {})
+    index = ctx.flips[path] = ctx.flips.get(path, -1) + 1
+    return ctx.client.post(path, json={'ids': getattr(ctx, ids_name)[:BATCH_SIZE], 'status': states[index % 2]})
+
+
+def publish(ctx):
+    from extensions import publish_queue
+    response = ctx.client.post(f"/api/campaigns/{ctx.draft_campaigns.pop()}/publish")
+    # End to end: includes the background job and its Google Ads mutates
+    publish_queue.join()
+    return response
+
+
+# name -> (request function, accepted status codes, iterations or None for --iterations)
+SCENARIOS = {
+    # Campaign reads (streamed exports are buffered so the whole body is timed)
+    'list_campaigns': (lambda ctx: ctx.client.get('/api/campaigns?limit=50'), {200}, None),
+    'list_campaigns_filtered': (lambda ctx: ctx.client.get('/api/campaigns?status=PUBLISHED&objective=Sales&limit=50'), {200}, None),
+    'list_campaigns_fields': (lambda ctx: ctx.client.get('/api/campaigns?fields=id,name,status&limit=500'), {200}, None),
+    'list_campaigns_next_page': (lambda ctx: ctx.client.get(f'/api/campaigns?limit=50&cursor={ctx.cursor}'), {200}, None),
+    'get_campaign': (lambda ctx: ctx.client.get(f"/api/campaigns/{ctx.pick('campaigns')}"), {200}, None),
+    'campaign_summary': (lambda ctx: ctx.client.get('/api/campaigns/summary'), {200}, None),
+    'forecast': (lambda ctx: ctx.client.get('/api/forecast?as_of=2026-07-01'), {200}, None),
+    'get_campaign_not_modified': (lambda ctx: ctx.client.get(f'/api/campaigns/{ctx.etag_campaign}',
+                                                             headers={'If-None-Match': ctx.etag}), {304}, None),
+    'get_publish_job': (lambda ctx: ctx.client.get(f'/api/publish-jobs/{ctx.publish_job}'), {200}, None),
+    'export_campaigns_ndjson': (lambda ctx: ctx.client.get('/api/campaigns:export?created_to=2025-01-01', buffered=True), {200}, HEAVY_ITERATIONS),
+    'export_campaigns_csv': (lambda ctx: ctx.client.get('/api/campaigns:export?format=csv&created_to=2025-01-01', buffered=True), {200}, HEAVY_ITERATIONS),
+    # Ad group and keyword reads
+    'list_ad_groups': (lambda ctx: ctx.client.get(f"/api/campaigns/{ctx.pick('campaigns')}/ad-groups"), {200}, None),
+    'get_ad_group': (lambda ctx: ctx.client.get(f"/api/ad-groups/{ctx.pick('ad_groups')}"), {200}, None),
+    'get_ad_group_keywords': (lambda ctx: ctx.client.get(f"/api/ad-groups/{ctx.pick('ad_groups')}/keywords"), {200}, None),
+    'search_keywords': (lambda ctx: ctx.client.get('/api/keywords/search', query_string={'q': ctx.pick('keywords')}), {200}, None),
+    'search_keywords_prefix': (lambda ctx: ctx.client.get('/api/keywords/search?q=run&prefix=true'), {200}, None),
+    'keyword_duplicates': (lambda ctx: ctx.client.get(f"/api/campaigns/{ctx.pick('campaigns')}/keywords/duplicates"), {200}, None),
+    'export_ad_groups_ndjson': (lambda ctx: ctx.client.get('/api/ad-groups:export?created_to=2025-01-01', buffered=True), {200}, HEAVY_ITERATIONS),
+    # Operational
+    'cache_stats': (lambda ctx: ctx.client.get('/api/cache/stats'), {200}, None),
+    'metrics': (lambda ctx: ctx.client.get('/metrics'), {200, 404}, None),
+    # Writes
+    'create_campaign': (lambda ctx: ctx.client.post('/api/campaigns', json=new_campaign(ctx)), {201}, None),
+    'create_campaigns_batch': (lambda ctx: ctx.client.post('/api/campaigns:batch', json=[new_campaign(ctx, i) for i in range(BATCH_SIZE)]),
+                               {201}, HEAVY_ITERATIONS),
+    'create_ad_group': (lambda ctx: ctx.client.post(f"/api/campaigns/{ctx.pick('campaigns')}/ad-groups", json=new_ad_group(ctx)), {201}, None),
+    'create_ad_groups_batch': (lambda ctx: ctx.client.post(f"/api/campaigns/{ctx.pick('campaigns')}/ad-groups:batch",
+                                                           json=[new_ad_group(ctx, i) for i in range(BATCH_SIZE)]), {201}, HEAVY_ITERATIONS),
+    'update_ad_group': (lambda ctx: ctx.client.put(f"/api/ad-groups/{ctx.pick('ad_groups')}", json={'cpc_bid': 2.0, 'name': 'Updated'}), {200}, None),
+    'update_ad_group_conflict': (lambda ctx: ctx.client.put(f"/api/ad-groups/{ctx.pick('ad_groups')}", json={'cpc_bid': 2.0, 'version': -1}), {409}, None),
+    'bulk_update_ad_groups': (lambda ctx: ctx.client.patch('/api/ad-groups', json={'ids': ctx.ad_groups[:BATCH_SIZE], 'changes': {'cpc_bid': 1.25}}),
+                              {200}, HEAVY_ITERATIONS),
+    'pause_ad_group': (lambda ctx: ctx.client.post(f"/api/ad-groups/{ctx.pick('ad_groups')}/pause"), {200}, None),
+    'enable_ad_group': (lambda ctx: ctx.client.post(f"/api/ad-groups/{ctx.pick('ad_groups')}/enable"), {200}, None),
+    'delete_ad_group': (lambda ctx: ctx.client.delete(f'/api/ad-groups/{ctx.disposable_ad_groups.pop()}'), {200}, None),
+    # Google Ads round trips (through FakeGoogleAdsClient)
+    'publish_campaign': (publish, {202}, None),
+    'pause_campaign': (lambda ctx: ctx.client.post(f'/api/campaigns/{ctx.published_campaigns.pop()}/pause'), {200}, None),
+    'bulk_status_campaigns': (lambda ctx: flip_status(ctx, '/api/campaigns:bulk-status', 'bulk_campaigns', ('PAUSED', 'PUBLISHED')),
+                              {200}, HEAVY_ITERATIONS),
+    'bulk_status_ad_groups': (lambda ctx: flip_status(ctx, '/api/ad-groups:bulk-status', 'enabled_ad_groups', ('PAUSED', 'ENABLED')),
+                              {200}, HEAVY_ITERATIONS),
+}
+
+
+def prepare(ctx, db, iterations, pool_size):
+    """Sample ids and set up the state the scenarios need."""
+    for name, ids in sample_ids(db, max(pool_size, iterations * 2)).items():
+        setattr(ctx, name, ids)
+    # Published campaigns are split between single pauses and the bulk status scenario
+    ctx.bulk_campaigns = ctx.published_campaigns[iterations + 1:]
+    ctx.published_campaigns = ctx.published_campaigns[:iterations + 1]
+
+    response = ctx.client.get('/api/campaigns?limit=50')
+    ctx.cursor = response.headers['X-Next-Cursor']
+    ctx.publish_job = publish(ctx).get_json()['id']
+    ctx.disposable_ad_groups = ctx.client.post(
+        f'/api/campaigns/{ctx.campaigns[0]}/ad-groups:batch', json=[new_ad_group(ctx, i) for i in range(iterations + 1)]
+    ).get_json()['ids']
+
+    # Read last, after the setup writes above, so the ETag is still current
+    ctx.etag_campaign = ctx.campaigns[-1]
+    ctx.etag = ctx.client.get(f'/api/campaigns/{ctx.etag_campaign}').headers['ETag']
+
+
+def run_scenario(ctx, name, iterations, statements):
+    request, accepted, fixed_iterations = SCENARIOS[name]
+    iterations = min(iterations, fixed_iterations or iterations)
+
+    # Warm-up request, traced for peak memory; not included in the timings
+    tracemalloc.start()
+    response = request(ctx)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    check(name, response, accepted)
+
+    latencies, statement_counts = [], []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        before = statements[0]
+        request_started = time.perf_counter()
+        response = request(ctx)
+        latencies.append(time.perf_counter() - request_started)
+        statement_counts.append(statements[0] - before)
+        check(name, response, accepted)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'rps': round(iterations / elapsed, 1),
+        'p50_ms': percentile_ms(latencies, 50),
+        'p90_ms': percentile_ms(latencies, 90),
+        'p99_ms': percentile_ms(latencies, 99),
+        'max_ms': percentile_ms(latencies, 100),
+        'statements_mean': round(sum(statement_counts) / len(statement_counts), 2),
+        'statements_max': max(statement_counts),
+        'peak_memory_kb': peak_memory // 1024,
+    }
+
+
+def check(name, response, accepted):
+    if response.status_code not in accepted:
+        raise RuntimeError(f'{name}: unexpected {response.status_code}: {response.get_data(as_text=True)[:500]}')
+
+
+def percentile_ms(sorted_values, pct):
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return round(sorted_values[index] * 1000, 3)
+
+
+def compare(results, baseline, tolerance):
+    """Print changes against a baseline. Returns the names of regressed scenarios: p99 more than
+    `tolerance` slower (and by over 1 ms), or more SQL statements per request."""
+    regressions = []
+    print(f"\n{'scenario':<28}{'p99 ms':>10}{'baseline':>10}{'change':>9}{'stmts':>8}{'baseline':>10}")
+    for name, result in results['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if before is None:
+            print(f'{name:<28}{result["p99_ms"]:>10}{"new":>10}')
+            continue
+        change = (result['p99_ms'] - before['p99_ms']) / before['p99_ms'] if before['p99_ms'] else 0.0
+        slower = change > tolerance and result['p99_ms'] - before['p99_ms'] > 1
+        more_statements = result['statements_mean'] > before['statements_mean']
+        flag = '  REGRESSION' if slower or more_statements else ''
+        if flag:
+            regressions.append(name)
+        print(f"{name:<28}{result['p99_ms']:>10}{before['p99_ms']:>10}{change:>+9.0%}"
+              f"{result['statements_mean']:>8}{before['statements_mean']:>10}{flag}")
+    return regressions
+
+
+def working_database_url(dataset, seed_value, suffix='run', campaigns_only=False):
+    """A fresh copy of the dataset's SQLite template, seeding the template first if needed.
+    With `campaigns_only`, of the dataset's campaigns without ad groups or keywords."""
+    template = seeding.default_database_url(dataset, campaigns_only)[len('sqlite:///'):]
+    if not os.path.exists(template):
+        print(f'Seeding the {dataset} dataset into {template} (once)...')
+        subprocess.run([sys.executable, os.path.join(BENCHMARKS_DIR, 'seed.py'), '--dataset', dataset,
+                        '--seed', str(seed_value)] + (['--campaigns-only'] if campaigns_only else []), check=True)
+    working_copy = f'%s-{suffix}%s' % os.path.splitext(template)
+    shutil.copyfile(template, working_copy)
+    return f'sqlite:///{working_copy}'
+
+
+def configure_environment(database_url):
+    """Environment for the app under benchmark; must run before the app (and its Config) is imported."""
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('GOOGLE_ADS_CUSTOMER_ID', '1234567890')
+    # Measure the backend, not our own client-side quota
+    os.environ.setdefault('GOOGLE_ADS_RATE_LIMIT_QPS', '100000')
+    os.environ.setdefault('GOOGLE_ADS_RATE_LIMIT_BURST', '100000')
+    os.environ.setdefault('GOOGLE_ADS_BACKOFF_BASE', '0.01')
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=BENCHMARKS_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', choices=seeding.DATASETS, default='1k')
+    parser.add_argument('--database-url', help='use this database in place of a copied SQLite dataset')
+    parser.add_argument('--iterations', type=int, default=200, help='timed requests per scenario')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated scenario names')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--ads-latency', type=float, default=0.0, help='fake Google Ads seconds per RPC')
+    parser.add_argument('--ads-jitter', type=float, default=0.0, help='+/- seconds of random latency per RPC')
+    parser.add_argument('--ads-error-rate', type=float, default=0.0, help='share of operations rejected')
+    parser.add_argument('--ads-rpc-error-rate', type=float, default=0.0, help='share of RPCs failing with UNAVAILABLE')
+    parser.add_argument('--http-url', help='also run the loadtest.py scenarios against this API base URL')
+    parser.add_argument('--http-duration', type=float, default=10)
+    parser.add_argument('--http-concurrency', type=int, default=16)
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='compare against this baseline JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p99 slowdown before flagging')
+    args = parser.parse_args()
+
+    names = args.scenarios.split(',')
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    campaigns = seeding.DATASETS[args.dataset]
+    database_url = args.database_url or working_database_url(args.dataset, args.seed)
+
+    configure_environment(database_url)
+
+    from app import create_app
+    from extensions import ads_service
+    from fake_ads import FakeGoogleAdsClient
+    from models import db, Campaign
+    from sqlalchemy import event, func, select
+
+    app = create_app()
+    ads_service.client = FakeGoogleAdsClient(
+        latency=args.ads_latency, jitter=args.ads_jitter, error_rate=args.ads_error_rate,
+        rpc_error_rate=args.ads_rpc_error_rate, seed=args.seed
+    )
+
+    statements = [0]
+
+    def count_statement(*_):
+        statements[0] += 1
+
+    results = {'scenarios': {}}
+    with app.app_context():
+        db.create_all()
+        if not db.session.execute(select(func.count(Campaign.id))).scalar():
+            print(f'Seeding {campaigns} campaigns into {database_url}...')
+            seeding.seed(db, campaigns, args.seed)
+        db.session.remove()
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+
+    ctx = Context(app.test_client(), random.Random(args.seed))
+    with app.app_context():
+        prepare(ctx, db, args.iterations, pool_size=BATCH_SIZE * 2)
+
+    print(f'{args.dataset} dataset, {args.iterations} iterations per scenario\n')
+    print(f"{'scenario':<28}{'req/s':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'stmts':>8}{'peak KB':>10}")
+    for name in names:
+        result = results['scenarios'][name] = run_scenario(ctx, name, args.iterations, statements)
+        print(f"{name:<28}{result['rps']:>9}{result['p50_ms']:>10}{result['p90_ms']:>10}{result['p99_ms']:>10}"
+              f"{result['statements_mean']:>8}{result['peak_memory_kb']:>10}")
+
+    if args.http_url:
+        import loadtest
+        campaign_ids, ad_group_ids = loadtest.seed(args.http_url, 100, 10)
+        ids = {'campaigns': campaign_ids, 'ad_groups': ad_group_ids}
+        results['http'] = {
+            name: loadtest.run_scenario(args.http_url, name, ids, args.http_duration, args.http_concurrency)
+            for name in loadtest.SCENARIOS
+        }
+        print(f'\nHTTP ({args.http_url}, {args.http_concurrency} clients):')
+        for name, result in results['http'].items():
+            print(f"{name:<28}{result['rps']:>9}{result['p50_ms']:>10}{result['p90_ms']:>10}{result['p99_ms']:>10}")
+
+    results['meta'] = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'dataset': args.dataset,
+        'campaigns': campaigns,
+        'database': database_url.split(':', 1)[0],
+        'iterations': args.iterations,
+        'fake_ads': {'latency': args.ads_latency, 'jitter': args.ads_jitter, 'error_rate': args.ads_error_rate,
+                     'rpc_error_rate': args.ads_rpc_error_rate},
+        'python': platform.python_version(),
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nSaved {args.save}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
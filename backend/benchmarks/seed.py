@@ -0,0 +1,185 @@
+"""
+Deterministic synthetic datasets for the benchmarks: campaigns with ad groups and
+keywords, inserted with Core executemany INSERTs straight into the database. With
+--campaigns-only, just the campaigns, for benchmarks that only read that table at sizes
+(1m) the full dataset takes too long to seed.
+
+    python benchmarks/seed.py --dataset 100k --database-url sqlite:////tmp/bench-100k.db
+    python benchmarks/seed.py --dataset 1m --campaigns-only
+"""
+from datetime import date, datetime, timedelta
+import argparse
+import hashlib
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DATASETS = {
+    '1k': 1000,
+    '100k': 100000,
+    '1m': 1000000,
+}
+AD_GROUPS_PER_CAMPAIGN = 3
+KEYWORDS_PER_AD_GROUP = 5
+INSERT_CHUNK_SIZE = 5000
+
+OBJECTIVES = ('Sales', 'Leads', 'Website traffic', 'Brand awareness')
+CAMPAIGN_TYPES = ('Demand Gen', 'Search', 'Display')
+# status -> share of campaigns
+CAMPAIGN_STATUSES = (('DRAFT', 0.5), ('PUBLISHED', 0.35), ('PAUSED', 0.15))
+KEYWORD_VOCABULARY = (
+    'running', 'shoes', 'trail', 'boots', 'waterproof', 'jacket', 'hiking', 'socks', 'sale',
+    'discount', 'best', 'cheap', 'women', 'men', 'kids', 'leather', 'sport', 'outdoor', 'gear', 'bag'
+)
+MATCH_TYPES = ('BROAD', 'PHRASE', 'EXACT')
+
+
+def new_uuid(rng):
+    """Deterministic uuid4. On SQLite the UUID columns get NUMERIC affinity, which turns hex
+    like '1234e5678...' into a float (colliding with others), so such values are skipped."""
+    while True:
+        value = uuid.UUID(int=rng.getrandbits(128), version=4)
+        try:
+            float(value.hex)
+        except ValueError:
+            return value
+
+
+def campaign_rows(rng, count, epoch):
+    statuses, weights = zip(*CAMPAIGN_STATUSES)
+    for index in range(count):
+        status = rng.choices(statuses, weights)[0]
+        start = date(2026, 1, 1) + timedelta(days=rng.randrange(365))
+        yield {
+            'id': new_uuid(rng),
+            'name': f'Campaign {index}',
+            'objective': rng.choice(OBJECTIVES),
+            'campaign_type': rng.choice(CAMPAIGN_TYPES),
+            'daily_budget': rng.randrange(10, 5000),
+            'start_date': start,
+            'end_date': start + timedelta(days=rng.randrange(7, 180)),
+            'status': status,
+            'google_campaign_id': str(10 ** 9 + index) if status != 'DRAFT' else None,
+            'bidding_strategy': 'MAXIMIZE_CONVERSIONS',
+            'created_at': epoch + timedelta(seconds=index),
+        }
+
+
+def ad_group_rows(rng, campaign, index):
+    for position in range(AD_GROUPS_PER_CAMPAIGN):
+        ad_group_id = new_uuid(rng)
+        words = [' '.join(rng.sample(KEYWORD_VOCABULARY, rng.randint(1, 3))) for _ in range(KEYWORDS_PER_AD_GROUP)]
+        keywords = []
+        for text in dict.fromkeys(words):
+            keywords.append({
+                'id': new_uuid(rng),
+                'ad_group_id': ad_group_id,
+                'campaign_id': campaign['id'],
+                'text': text,
+                'normalized_text': text,
+                'match_type': rng.choice(MATCH_TYPES),
+                'cpc_bid': None,
+                'created_at': campaign['created_at'],
+            })
+        ad_group = {
+            'id': ad_group_id,
+            'campaign_id': campaign['id'],
+            'name': f'Ad group {index}-{position}',
+            'status': rng.choice(('ENABLED', 'ENABLED', 'PAUSED')),
+            'keywords': ', '.join(k['text'] for k in keywords),
+            'cpc_bid': round(rng.uniform(0.2, 5.0), 2),
+            'ad_headline': f'Headline {index}',
+            'ad_description': f'Description {index}',
+            'final_url': f'https://example.com/{index}',
+            'google_ad_group_id': str(2 * 10 ** 9 + index * AD_GROUPS_PER_CAMPAIGN + position)
+            if campaign['status'] != 'DRAFT' else None,
+            'created_at': campaign['created_at'],
+            'updated_at': campaign['created_at'],
+        }
+        yield ad_group, keywords
+
+
+def seed(db, campaigns, seed_value=42, campaigns_only=False):
+    """Create the schema and insert `campaigns` campaigns with their ad groups and keywords
+    (unless `campaigns_only`). Returns the number of rows inserted per table."""
+    from models import Campaign, AdGroup, Keyword
+    from sqlalchemy import insert
+    import campaign_summary
+
+    db.create_all()
+    rng = random.Random(seed_value)
+    epoch = datetime(2025, 1, 1)
+    counts = {'campaigns': 0, 'ad_groups': 0, 'keywords': 0}
+    batch = {'campaigns': [], 'ad_groups': [], 'keywords': []}
+
+    def flush():
+        for table, model in (('campaigns', Campaign), ('ad_groups', AdGroup), ('keywords', Keyword)):
+            if batch[table]:
+                db.session.execute(insert(model), batch[table])
+                counts[table] += len(batch[table])
+                batch[table] = []
+        db.session.commit()
+
+    for index, campaign in enumerate(campaign_rows(rng, campaigns, epoch)):
+        batch['campaigns'].append(campaign)
+        for ad_group, keywords in () if campaigns_only else ad_group_rows(rng, campaign, index):
+            batch['ad_groups'].append(ad_group)
+            batch['keywords'].extend(keywords)
+        if len(batch['campaigns']) >= INSERT_CHUNK_SIZE:
+            flush()
+    flush()
+    # Raw INSERTs bypass the app's write paths, which keep the summary current
+    campaign_summary.rebuild()
+    return counts
+
+
+def schema_version():
+    """Short hash of the models' tables, columns and indexes, so a dataset seeded before a
+    schema change is never reused after it."""
+    from models import db
+
+    schema = sorted(
+        (table.name, tuple(column.name for column in table.columns), tuple(sorted(index.name for index in table.indexes)))
+        for table in db.metadata.tables.values()
+    )
+    return hashlib.sha1(repr(schema).encode()).hexdigest()[:8]
+
+
+def default_database_url(dataset, campaigns_only=False):
+    name = f"{dataset}{'-campaigns' if campaigns_only else ''}-{schema_version()}.db"
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', name)
+    return f'sqlite:///{path}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', choices=DATASETS, default='1k')
+    parser.add_argument('--database-url', help='defaults to a SQLite file under benchmarks/data/, named after the dataset and schema')
+    parser.add_argument('--seed', type=int, default=42, help='random seed, for reproducible data')
+    parser.add_argument('--campaigns-only', action='store_true', help='no ad groups or keywords')
+    args = parser.parse_args()
+
+    database_url = args.database_url or default_database_url(args.dataset, args.campaigns_only)
+    if database_url.startswith('sqlite:///'):
+        os.makedirs(os.path.dirname(database_url[len('sqlite:///'):]), exist_ok=True)
+    os.environ['DATABASE_URL'] = database_url
+
+    from flask import Flask
+    from config import Config
+    from models import db
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    db.init_app(app)
+    with app.app_context():
+        started = time.perf_counter()
+        counts = seed(db, DATASETS[args.dataset], args.seed, args.campaigns_only)
+        print(f"Seeded {counts} into {database_url} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Serializing a large campaign listing: the old path (ORM instances, Campaign.to_dict() and
+the stdlib json encoder behind Flask's DefaultJSONProvider) against the current one (row
+tuples from select_fields(), rows_to_dicts() and FastJSONProvider's orjson response).
+
+Both paths build the jsonify() response for the first `--campaigns` campaigns (100,000 by
+default) `--runs` times. Reports the median of each phase (query, dicts, encode) and the
+speedup, then checks that both bodies decode to the same document. Exits with status 1
+otherwise:
+
+    python benchmarks/serialization.py --dataset 100k --campaigns 100000
+"""
+from datetime import datetime, timezone
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import seed as seeding  # noqa: E402
+from run import configure_environment, git_commit, working_database_url  # noqa: E402
+
+PATHS = ('orm_to_dict_stdlib', 'rows_orjson')
+PHASES = ('query', 'dicts', 'encode', 'total')
+
+
+def build(app, how, limit):
+    """The jsonify() response of the listing built the `how` way, and its phase timings in seconds."""
+    from flask.json.provider import DefaultJSONProvider
+    from models import db, Campaign
+    from serializers import rows_to_dicts, select_fields
+
+    order = (Campaign.created_at.desc(), Campaign.id.desc())
+    started = time.perf_counter()
+    if how == 'orm_to_dict_stdlib':
+        campaigns = Campaign.query.order_by(*order).limit(limit).all()
+        queried = time.perf_counter()
+        data = [campaign.to_dict() for campaign in campaigns]
+        provider = DefaultJSONProvider(app)
+    else:
+        rows = db.session.execute(select_fields(Campaign).order_by(*order).limit(limit)).all()
+        queried = time.perf_counter()
+        data = rows_to_dicts(rows, Campaign.SERIALIZABLE_FIELDS)
+        provider = app.json
+    converted = time.perf_counter()
+    response = provider.response(data)
+    encoded = time.perf_counter()
+    db.session.remove()
+    return response, {'query': queried - started, 'dicts': converted - queried, 'encode': encoded - converted,
+                      'total': encoded - started}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', choices=seeding.DATASETS, default='100k')
+    parser.add_argument('--database-url', help='use this database in place of a copied SQLite dataset')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--campaigns', type=int, default=100000, help='campaigns in the listing')
+    parser.add_argument('--runs', type=int, default=5, help='builds per path')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    database_url = args.database_url or working_database_url(args.dataset, args.seed, suffix='serialization')
+    configure_environment(database_url)
+
+    from app import create_app
+    from models import db
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.remove()
+
+    results, bodies = {}, {}
+    print(f"{'path':<22}" + ''.join(f'{phase + " ms":>12}' for phase in PHASES) + f"{'MB':>8}{'speedup':>9}")
+    for how in PATHS:
+        timings = []
+        with app.test_request_context():
+            for _ in range(args.runs):
+                response, timing = build(app, how, args.campaigns)
+                timings.append(timing)
+        bodies[how] = response.get_data()
+        result = results[how] = {f'{phase}_ms': round(statistics.median(t[phase] for t in timings) * 1000, 1)
+                                 for phase in PHASES}
+        result['megabytes'] = round(len(bodies[how]) / 1e6, 2)
+        speedup = results[PATHS[0]]['total_ms'] / result['total_ms']
+        print(f"{how:<22}" + ''.join(f"{result[f'{phase}_ms']:>12}" for phase in PHASES)
+              + f"{result['megabytes']:>8}{speedup:>8.1f}x")
+
+    documents = [json.loads(body) for body in bodies.values()]
+    problems = [] if documents[0] == documents[1] else ['the two paths serialize different documents']
+    if len(documents[0]) != args.campaigns:
+        problems.append(f'{len(documents[0])} campaigns listed, {args.campaigns} asked for')
+    print('\n' + ('\n'.join(problems) if problems else 'Verified: both paths serialize the same document'))
+
+    results['problems'] = problems
+    results['meta'] = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'dataset': args.dataset,
+        'database': database_url.split(':', 1)[0],
+        'campaigns': args.campaigns,
+        'runs': args.runs,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nSaved {args.save}')
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Speed of the budget pacing and bid simulation in forecast.py.
+
+Times simulate() plus the portfolio aggregation over synthetic columns covering
+--campaign-days days of campaign flights, and, with --dataset, the whole forecast
+(including the columnar query) over a seeded dataset:
+
+    python benchmarks/simulation.py --campaign-days 1000000
+    python benchmarks/simulation.py --campaign-days 10000000 --dataset 100k
+"""
+from datetime import date, datetime, timezone
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import numpy as np  # noqa: E402
+
+import forecast  # noqa: E402
+import seed as seeding  # noqa: E402
+from run import configure_environment, git_commit, working_database_url  # noqa: E402
+
+# Same date and flight ranges as the seeded datasets
+AS_OF = date(2026, 7, 1)
+FLIGHT_DAYS = (7, 180)
+CAMPAIGN_STATUSES = ('DRAFT', 'PUBLISHED', 'PAUSED')
+
+
+def synthetic_columns(campaign_days, seed_value):
+    """load_campaigns()-shaped columns whose flights add up to about `campaign_days` days."""
+    rng = np.random.default_rng(seed_value)
+    count = max(1, round(campaign_days / (sum(FLIGHT_DAYS) / 2 + 1)))
+    start = np.datetime64(date(2026, 1, 1), 'D') + rng.integers(0, 365, count)
+    cpc_bid = rng.uniform(0.2, 5.0, count)
+    cpm_bid = rng.uniform(1.0, 20.0, count)
+    has_cpc = rng.random(count) < 0.8
+    spend = rng.uniform(0, 2000, count) * (rng.random(count) < 0.6)
+    return {
+        'id': list(range(count)),
+        'status': rng.choice(np.array(CAMPAIGN_STATUSES, dtype=object), count),
+        'bidding_strategy': rng.choice(np.array(forecast.STRATEGIES + (None,), dtype=object), count),
+        'daily_budget': rng.integers(10, 5000, count).astype(float),
+        'target_cpa': np.where(rng.random(count) < 0.3, rng.uniform(5, 100, count), np.nan),
+        'start_date': start,
+        'end_date': start + rng.integers(*FLIGHT_DAYS, count),
+        'cpc_bid': np.where(has_cpc, cpc_bid, np.nan),
+        'cpm_bid': np.where(has_cpc, np.nan, cpm_bid),
+        'spend': spend,
+        'clicks': np.floor(spend / cpc_bid),
+    }
+
+
+def timed(function, repeat):
+    """Median and max seconds of `repeat` calls, and the last result."""
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        seconds.append(time.perf_counter() - started)
+    return statistics.median(seconds), max(seconds), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--campaign-days', type=int, default=1000000, help='flight days covered by the synthetic campaigns')
+    parser.add_argument('--days', type=int, default=30, help='length of the daily spend curve')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--dataset', choices=seeding.DATASETS, help='also time the whole forecast over this dataset')
+    parser.add_argument('--database-url', help='use this database in place of a copied SQLite dataset')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    results = {}
+    columns = synthetic_columns(args.campaign_days, args.seed)
+    campaign_days = int(((columns['end_date'] - columns['start_date']).astype(np.int64) + 1).sum())
+
+    def compute():
+        result = forecast.simulate(columns, AS_OF)
+        return forecast.portfolio(columns, result, AS_OF, args.days)
+
+    median, worst, _ = timed(compute, args.repeat)
+    results['synthetic'] = {'campaigns': len(columns['id']), 'campaign_days': campaign_days,
+                            'seconds_median': round(median, 4), 'seconds_max': round(worst, 4)}
+    print(f"{'forecast':<12}{'campaigns':>12}{'campaign-days':>15}{'query s':>10}{'compute s':>11}{'max s':>9}")
+    print(f"{'synthetic':<12}{len(columns['id']):>12}{campaign_days:>15}{'-':>10}{median:>11.4f}{worst:>9.4f}")
+
+    if args.dataset or args.database_url:
+        database_url = args.database_url or working_database_url(args.dataset or '1k', args.seed, suffix='forecast')
+        configure_environment(database_url)
+        from app import create_app
+
+        app = create_app()
+        with app.app_context():
+            query_median, _, columns = timed(lambda: forecast.load_campaigns(AS_OF), args.repeat)
+            campaign_days = int(((columns['end_date'] - columns['start_date']).astype(np.int64) + 1).sum())
+            median, worst, _ = timed(compute, args.repeat)
+        results['dataset'] = {'campaigns': len(columns['id']), 'campaign_days': campaign_days,
+                              'query_seconds_median': round(query_median, 4),
+                              'seconds_median': round(median, 4), 'seconds_max': round(worst, 4)}
+        print(f"{args.dataset or 'database':<12}{len(columns['id']):>12}{campaign_days:>15}{query_median:>10.4f}"
+              f"{median:>11.4f}{worst:>9.4f}")
+
+    results['meta'] = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'numpy': np.__version__,
+        'repeat': args.repeat,
+        'days': args.days,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nSaved {args.save}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Cold start of the backend: time from a fresh interpreter importing the app to its first
+answered request, as a new Gunicorn worker or CLI invocation would see it.
+
+Each run is a new process, timing the import of app.py, create_app() and the first and
+second requests against a seeded dataset, and reports the median of every phase:
+
+    python benchmarks/startup.py --dataset 1k --runs 10
+"""
+from datetime import datetime, timezone
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import seed as seeding  # noqa: E402
+from run import configure_environment, git_commit, working_database_url  # noqa: E402
+
+PHASES = ('import', 'create_app', 'first_request', 'second_request', 'total')
+
+# Run in the child process; prints the phase timings in seconds as JSON
+CHILD = '''
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+client = app.test_client()
+response = client.get(sys.argv[1])
+assert response.status_code == 200, response.status_code
+first = time.perf_counter()
+client.get(sys.argv[1])
+second = time.perf_counter()
+print(json.dumps({
+    'import': imported - started,
+    'create_app': created - imported,
+    'first_request': first - created,
+    'second_request': second - first,
+    'total': first - started,
+}))
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', choices=seeding.DATASETS, default='1k')
+    parser.add_argument('--database-url', help='use this database in place of a copied SQLite dataset')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--runs', type=int, default=10, help='fresh processes to start')
+    parser.add_argument('--path', default='/api/campaigns?limit=50', help='first request')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    database_url = args.database_url or working_database_url(args.dataset, args.seed, suffix='startup')
+    configure_environment(database_url)
+
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, '-c', CHILD, args.path], cwd=BACKEND_DIR, env=os.environ,
+                                capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    results = {}
+    print(f"{'phase':<16}{'p50 ms':>10}{'max ms':>10}")
+    for phase in PHASES:
+        values = [run[phase] * 1000 for run in runs]
+        results[phase] = {'p50_ms': round(statistics.median(values), 1), 'max_ms': round(max(values), 1)}
+        print(f"{phase:<16}{results[phase]['p50_ms']:>10}{results[phase]['max_ms']:>10}")
+
+    results['meta'] = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'dataset': args.dataset,
+        'database': database_url.split(':', 1)[0],
+        'runs': args.runs,
+        'path': args.path,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nSaved {args.save}')
+
+
+if __name__ == '__main__':
+    main()
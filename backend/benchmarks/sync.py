@@ -0,0 +1,88 @@
+"""
+Throughput of the remote status and metrics sync against FakeGoogleAdsClient, whose
+SearchStream answers are generated from the dataset's published campaigns.
+
+Runs a full sync (REMOTE_SYNC_INITIAL_DAYS of metrics), then an incremental one
+(REMOTE_SYNC_LOOKBACK_DAYS plus today), and reports rows written per second:
+
+    python benchmarks/sync.py --dataset 100k --days 30
+"""
+from datetime import datetime, timezone
+import argparse
+import json
+import os
+import sys
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import seed as seeding  # noqa: E402
+from run import configure_environment, git_commit, working_database_url  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataset', choices=seeding.DATASETS, default='1k')
+    parser.add_argument('--database-url', help='use this database in place of a copied SQLite dataset')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--days', type=int, default=30, help='days of metrics read by the full sync')
+    parser.add_argument('--lookback-days', type=int, default=3, help='days re-read by the incremental sync')
+    parser.add_argument('--batch-size', type=int, default=1000, help='rows per upsert')
+    parser.add_argument('--ads-latency', type=float, default=0.0, help='fake Google Ads seconds per RPC')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    database_url = args.database_url or working_database_url(args.dataset, args.seed, suffix='sync')
+    configure_environment(database_url)
+
+    from app import create_app
+    from extensions import ads_service, remote_sync
+    from fake_ads import FakeGoogleAdsClient
+    from models import db, Campaign
+    from sqlalchemy import select
+
+    app = create_app()
+    fake = FakeGoogleAdsClient(latency=args.ads_latency, seed=args.seed)
+    ads_service.client = fake
+    remote_sync.batch_size = args.batch_size
+    remote_sync.initial_days = args.days
+    remote_sync.lookback_days = args.lookback_days
+
+    with app.app_context():
+        db.create_all()
+        for status, remote_status in (('PUBLISHED', 'ENABLED'), ('PAUSED', 'PAUSED')):
+            fake.add_campaigns(db.session.execute(
+                select(Campaign.google_campaign_id).where(Campaign.status == status, Campaign.google_campaign_id.isnot(None))
+            ).scalars(), status=remote_status)
+        db.session.remove()
+    print(f'{args.dataset} dataset: {len(fake.campaigns)} published campaigns, batch size {args.batch_size}\n')
+
+    results = {}
+    print(f"{'sync':<14}{'days':>6}{'states':>10}{'metrics':>10}{'seconds':>10}{'rows/s':>10}")
+    for name, full in (('full', True), ('incremental', False)):
+        result = remote_sync.run(full=full)[0]
+        rows = result['states'] + result['metrics']
+        result['rows_per_second'] = round(rows / result['seconds']) if result['seconds'] else None
+        days = (datetime.fromisoformat(result['end_date']) - datetime.fromisoformat(result['start_date'])).days + 1
+        results[name] = result
+        print(f"{name:<14}{days:>6}{result['states']:>10}{result['metrics']:>10}{result['seconds']:>10}"
+              f"{result['rows_per_second']:>10}")
+
+    results['meta'] = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'dataset': args.dataset,
+        'database': database_url.split(':', 1)[0],
+        'batch_size': args.batch_size,
+        'ads_latency': args.ads_latency,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nSaved {args.save}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+The campaign_summary table: campaign count, daily budget and ad group count per
+(status, objective, bidding strategy), so the dashboard summary reads a few dozen rows
+however many campaigns there are.
+
+Every write that creates campaigns, moves them between statuses, or adds or removes ad
+groups applies its delta here, in its own transaction. Deltas are read back from the
+rows just written rather than from request payloads, so they match what the database
+stored. Ad group writes lock their campaign row first, and status moves update the
+campaign rows before counting their ad groups, so the two never miss each other.
+"""
+from models import db, upsert, Campaign, AdGroup, CampaignSummary
+from sqlalchemy import delete, func, insert, literal, select, text, true, union_all
+
+KEY_COLUMNS = ('status', 'objective', 'bidding_strategy')
+COUNT_COLUMNS = ('campaigns', 'daily_budget', 'ad_groups')
+# Stands in for a NULL bidding strategy, since it is part of the primary key
+UNSPECIFIED_BIDDING_STRATEGY = 'UNSPECIFIED'
+# Stands in for a NULL status (the column's default), as in the backfill migration
+UNSPECIFIED_STATUS = 'DRAFT'
+# Campaign ids per aggregate query
+ID_CHUNK_SIZE = 5000
+
+
+def add_campaigns(campaign_ids):
+    """Count campaigns just inserted in this transaction (they have no ad groups yet)."""
+    for chunk in _chunks(campaign_ids):
+        _apply(_buckets(chunk, count_ad_groups=False))
+
+
+def move_campaigns(campaign_ids, from_status):
+    """Move campaigns whose status was just changed from `from_status` (by an UPDATE already
+    sent in this transaction, which holds their row locks) to the bucket of their new status."""
+    # Pending ORM changes aren't autoflushed for Core statements
+    db.session.flush()
+    for chunk in _chunks(campaign_ids):
+        moved = _buckets(chunk).subquery()
+        _apply(union_all(
+            select(moved),
+            select(
+                literal(from_status).label('status'), moved.c.objective, moved.c.bidding_strategy,
+                *[(-moved.c[column]).label(column) for column in COUNT_COLUMNS]
+            ).where(true())  # see _buckets
+        ))
+
+
+def add_ad_groups(campaign, count):
+    """Count `count` ad groups added to (or, when negative, removed from) `campaign`, which
+    must have been loaded with FOR UPDATE in this transaction so its status can't move."""
+    bidding_strategy = campaign.bidding_strategy or UNSPECIFIED_BIDDING_STRATEGY
+    _apply([{'status': campaign.status or UNSPECIFIED_STATUS, 'objective': campaign.objective, 'bidding_strategy': bidding_strategy,
+             'campaigns': 0, 'daily_budget': 0, 'ad_groups': count}])
+
+
+def summarize():
+    """Totals plus breakdowns by status, objective and bidding strategy."""
+    totals = dict.fromkeys(COUNT_COLUMNS, 0)
+    breakdowns = {'by_status': {}, 'by_objective': {}, 'by_bidding_strategy': {}}
+    rows = db.session.execute(
+        select(CampaignSummary).where((CampaignSummary.campaigns != 0) | (CampaignSummary.ad_groups != 0))
+    ).scalars()
+    for row in rows:
+        counts = {column: getattr(row, column) for column in COUNT_COLUMNS}
+        for name, key in (('by_status', row.status), ('by_objective', row.objective),
+                          ('by_bidding_strategy', row.bidding_strategy)):
+            bucket = breakdowns[name].setdefault(key, dict.fromkeys(COUNT_COLUMNS, 0))
+            for column, value in counts.items():
+                bucket[column] += value
+        for column, value in counts.items():
+            totals[column] += value
+    totals['ad_groups_per_campaign'] = round(totals['ad_groups'] / totals['campaigns'], 2) if totals['campaigns'] else 0.0
+    return dict(totals, **breakdowns)
+
+
+def rebuild():
+    """Recompute the table from campaigns and ad groups, e.g. after rows were written
+    without going through the functions above. Commits."""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        # Writers wait for the rebuild, and the rebuild waits for writers already under way
+        db.session.execute(text('LOCK TABLE campaign_summary IN EXCLUSIVE MODE'))
+    db.session.execute(delete(CampaignSummary))
+    buckets = _buckets()
+    db.session.execute(insert(CampaignSummary).from_select(list(buckets.selected_columns.keys()), buckets))
+    db.session.commit()
+
+
+def _buckets(campaign_ids=None, count_ad_groups=True):
+    """SELECT of the summary rows (labelled like campaign_summary's columns) for the
+    given campaigns, or for all of them."""
+    status = func.coalesce(Campaign.status, UNSPECIFIED_STATUS)
+    bidding_strategy = func.coalesce(Campaign.bidding_strategy, UNSPECIFIED_BIDDING_STRATEGY)
+    if count_ad_groups:
+        ad_groups = select(AdGroup.campaign_id, func.count().label('ad_groups')).group_by(AdGroup.campaign_id)
+        if campaign_ids is not None:
+            ad_groups = ad_groups.where(AdGroup.campaign_id.in_(campaign_ids))
+        ad_groups = ad_groups.subquery()
+        ad_group_count = func.coalesce(func.sum(ad_groups.c.ad_groups), 0)
+    else:
+        ad_group_count = literal(0)
+    query = select(
+        status.label('status'),
+        Campaign.objective.label('objective'),
+        bidding_strategy.label('bidding_strategy'),
+        func.count().label('campaigns'),
+        func.coalesce(func.sum(Campaign.daily_budget), 0).label('daily_budget'),
+        ad_group_count.label('ad_groups'),
+    )
+    if count_ad_groups:
+        query = query.outerjoin(ad_groups, ad_groups.c.campaign_id == Campaign.id)
+    # A WHERE clause even when matching everything: SQLite can't parse INSERT ... SELECT ... ON
+    # CONFLICT without one
+    query = query.where(Campaign.id.in_(campaign_ids) if campaign_ids is not None else true())
+    return query.group_by(status, Campaign.objective, bidding_strategy)
+
+
+def _apply(rows):
+    """Add rows (dicts or a SELECT) of deltas to the stored counts."""
+    upsert(CampaignSummary, rows, list(KEY_COLUMNS), increment=True)
+
+
+def _chunks(items):
+    items = list(items)
+    for start in range(0, len(items), ID_CHUNK_SIZE):
+        yield items[start:start + ID_CHUNK_SIZE]
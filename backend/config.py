@@ -3,12 +3,129 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+# Google Ads credentials, all needed to call the API (otherwise GoogleAdsService mocks it)
+GOOGLE_ADS_CREDENTIALS = (
+    'GOOGLE_ADS_DEVELOPER_TOKEN', 'GOOGLE_ADS_CLIENT_ID', 'GOOGLE_ADS_CLIENT_SECRET',
+    'GOOGLE_ADS_REFRESH_TOKEN', 'GOOGLE_ADS_LOGIN_CUSTOMER_ID', 'GOOGLE_ADS_CUSTOMER_ID'
+)
+
+
+def has_google_ads_config(config):
+    """Whether `config` (an app.config) has every Google Ads credential."""
+    return all(config.get(key) for key in GOOGLE_ADS_CREDENTIALS)
+
+
+def google_ads_config_dict(config):
+    """GoogleAdsClient.load_from_dict() settings from `config` (an app.config)."""
+    return {
+        "developer_token": config['GOOGLE_ADS_DEVELOPER_TOKEN'],
+        "client_id": config['GOOGLE_ADS_CLIENT_ID'],
+        "client_secret": config['GOOGLE_ADS_CLIENT_SECRET'],
+        "refresh_token": config['GOOGLE_ADS_REFRESH_TOKEN'],
+        "login_customer_id": config['GOOGLE_ADS_LOGIN_CUSTOMER_ID'],
+        "use_proto_plus": True
+    }
+
+
+def engine_options(database_uri):
+    """SQLAlchemy create_engine() options for the connection pool, from environment variables."""
+    if database_uri.startswith('sqlite'):
+        # SQLite connections are local files: no network pool to size or ping. A write locks
+        # the whole database, so under concurrent writes (request threads plus publish
+        # workers) wait this many seconds for the lock rather than pysqlite's default 5
+        return {'connect_args': {'timeout': float(os.getenv('SQLITE_BUSY_TIMEOUT', 30))}}
+
+    options = {
+        # Persistent connections per process, plus how many more may be opened under bursts
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        # Seconds a request waits for a free connection before failing
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        # Replace connections older than this, before server / proxy idle timeouts drop them
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        # Test each connection on checkout so a dropped one is replaced instead of failing a request
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+    }
+    statement_timeout = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000))
+    if statement_timeout and database_uri.startswith('postgresql'):
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
+
+
+def replica_binds(database_uris):
+    """SQLALCHEMY_BINDS for read replicas: `replica_<n>` per URI, each with its own pool."""
+    return {f'replica_{index}': dict(engine_options(uri), url=uri) for index, uri in enumerate(database_uris)}
+
+
 class Config:
     # Database
     # Defaulting to a common local setup, user can override via .env
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'postgresql://localhost/campaign_manager')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+
+    # Read replicas serving the read-only GET endpoints: comma-separated database URLs
+    # (none by default, so every query goes to the primary above). See replicas.py.
+    DATABASE_REPLICA_URLS = [uri.strip() for uri in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if uri.strip()]
+    SQLALCHEMY_BINDS = replica_binds(DATABASE_REPLICA_URLS)
+    # After a write, the client's reads go to the primary for this many seconds; keep it
+    # above the replicas' usual lag
+    REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+    # Seconds an unreachable replica is skipped before it is tried again
+    REPLICA_RETRY_SECONDS = int(os.getenv('REPLICA_RETRY_SECONDS', 30))
+    # PostgreSQL replicas further behind than this are skipped (0 disables the check);
+    # each replica's lag is checked at most every REPLICA_CHECK_INTERVAL seconds
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', 5))
+    REPLICA_CHECK_INTERVAL = float(os.getenv('REPLICA_CHECK_INTERVAL', 5))
+
+    # Browser origins allowed to call the API with credentials (the read-your-writes cookie):
+    # comma-separated, defaulting to the Vite dev server and the docker-compose frontend
+    CORS_ORIGINS = [origin.strip() for origin in os.getenv('CORS_ORIGINS', 'http://localhost:5173,http://localhost:3000').split(',')
+                    if origin.strip()]
+
+    # Bulk (:batch) endpoints
+    BULK_INSERT_CHUNK_SIZE = int(os.getenv('BULK_INSERT_CHUNK_SIZE', 1000))
+    BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 50000))
+
+    # Rows fetched per server-side cursor round trip by the :export endpoints
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+
+    # Cached campaign / ad group GET responses. Bodies are kept per process; their versions
+    # are shared through the cache_versions table, so writes invalidate them in every process
+    RESPONSE_CACHE_MAXSIZE = int(os.getenv('RESPONSE_CACHE_MAXSIZE', 1024))
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 60))
+
+    # Background publish workers (threads per process)
+    PUBLISH_WORKERS = int(os.getenv('PUBLISH_WORKERS', 4))
+    # Max queued jobs a worker publishes in one batched Google Ads Mutate
+    PUBLISH_BATCH_SIZE = int(os.getenv('PUBLISH_BATCH_SIZE', 50))
+    # Seconds without progress after which a RUNNING job is taken to be orphaned by a
+    # crashed process; recover_pending() at startup then resumes it
+    PUBLISH_JOB_STALE_AFTER = int(os.getenv('PUBLISH_JOB_STALE_AFTER', 900))
     
+    # Background sync of campaign status, budget and daily metrics from Google Ads.
+    # Every REMOTE_SYNC_INTERVAL seconds (0 disables it); metrics are re-read from
+    # LOOKBACK_DAYS before the last synced day, or INITIAL_DAYS back on a full sync.
+    REMOTE_SYNC_INTERVAL = int(os.getenv('REMOTE_SYNC_INTERVAL', 3600))
+    REMOTE_SYNC_BATCH_SIZE = int(os.getenv('REMOTE_SYNC_BATCH_SIZE', 1000))
+    REMOTE_SYNC_LOOKBACK_DAYS = int(os.getenv('REMOTE_SYNC_LOOKBACK_DAYS', 3))
+    REMOTE_SYNC_INITIAL_DAYS = int(os.getenv('REMOTE_SYNC_INITIAL_DAYS', 90))
+
+    # Flight scheduler: every SCHEDULER_INTERVAL seconds (0 disables it), enable SCHEDULED
+    # campaigns whose start_date has come and end those whose end_date has passed, in
+    # batches of SCHEDULER_BATCH_SIZE applied by SCHEDULER_CONCURRENCY threads.
+    SCHEDULER_INTERVAL = int(os.getenv('SCHEDULER_INTERVAL', 60))
+    SCHEDULER_BATCH_SIZE = int(os.getenv('SCHEDULER_BATCH_SIZE', 1000))
+    SCHEDULER_CONCURRENCY = int(os.getenv('SCHEDULER_CONCURRENCY', 4))
+
+    # Request instrumentation: per-request Server-Timing / X-Query-Count headers and
+    # latency histograms at /metrics (per process). Off by default.
+    INSTRUMENTATION_ENABLED = os.getenv('INSTRUMENTATION_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    # Let requests sending `X-Profile: 1` be run under cProfile (needs INSTRUMENTATION_ENABLED)
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+
     # Google Ads
     GOOGLE_ADS_DEVELOPER_TOKEN = os.getenv('GOOGLE_ADS_DEVELOPER_TOKEN')
     GOOGLE_ADS_CLIENT_ID = os.getenv('GOOGLE_ADS_CLIENT_ID')
@@ -16,25 +133,15 @@ class Config:
     GOOGLE_ADS_REFRESH_TOKEN = os.getenv('GOOGLE_ADS_REFRESH_TOKEN')
     GOOGLE_ADS_LOGIN_CUSTOMER_ID = os.getenv('GOOGLE_ADS_LOGIN_CUSTOMER_ID')
     GOOGLE_ADS_CUSTOMER_ID = os.getenv('GOOGLE_ADS_CUSTOMER_ID')
-    
-    # Helper to check if ads config is present
-    @property
-    def has_google_ads_config(self):
-        return all([
-            self.GOOGLE_ADS_DEVELOPER_TOKEN,
-            self.GOOGLE_ADS_CLIENT_ID,
-            self.GOOGLE_ADS_CLIENT_SECRET,
-            self.GOOGLE_ADS_REFRESH_TOKEN,
-            self.GOOGLE_ADS_LOGIN_CUSTOMER_ID,
-            self.GOOGLE_ADS_CUSTOMER_ID
-        ])
-    
-    def get_google_ads_config_dict(self):
-        return {
-            "developer_token": self.GOOGLE_ADS_DEVELOPER_TOKEN,
-            "client_id": self.GOOGLE_ADS_CLIENT_ID,
-            "client_secret": self.GOOGLE_ADS_CLIENT_SECRET,
-            "refresh_token": self.GOOGLE_ADS_REFRESH_TOKEN,
-            "login_customer_id": self.GOOGLE_ADS_LOGIN_CUSTOMER_ID,
-            "use_proto_plus": True
-        }
+
+    # Client-side throttling of Google Ads RPCs (per customer id and service). Limits for the
+    # whole server: under Gunicorn each worker process gets a 1/GUNICORN_WORKERS share (at
+    # least one request of burst and concurrency), so keep the worker count below the burst
+    # and concurrency limits
+    GOOGLE_ADS_RATE_LIMIT_QPS = float(os.getenv('GOOGLE_ADS_RATE_LIMIT_QPS', 10))
+    GOOGLE_ADS_RATE_LIMIT_BURST = int(os.getenv('GOOGLE_ADS_RATE_LIMIT_BURST', 20))
+    GOOGLE_ADS_MAX_CONCURRENT_REQUESTS = int(os.getenv('GOOGLE_ADS_MAX_CONCURRENT_REQUESTS', 8))
+    # Retries on quota / transient errors: full-jitter exponential backoff, in seconds
+    GOOGLE_ADS_MAX_RETRIES = int(os.getenv('GOOGLE_ADS_MAX_RETRIES', 5))
+    GOOGLE_ADS_BACKOFF_BASE = float(os.getenv('GOOGLE_ADS_BACKOFF_BASE', 1.0))
+    GOOGLE_ADS_BACKOFF_MAX = float(os.getenv('GOOGLE_ADS_BACKOFF_MAX', 60.0))
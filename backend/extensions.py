@@ -0,0 +1,29 @@
+"""
+Services shared by the request handlers and the background workers.
+
+Like `db` (models.py), they are created unbound, without reading configuration or
+opening anything, and bound to an app by create_app() (app.py) through init_app().
+Connections, worker threads and the Google Ads client are only opened on first use.
+"""
+from google_ads_service import GoogleAdsService
+from publish_queue import PublishQueue
+from remote_sync import RemoteSync
+from replicas import ReplicaRouter
+from response_cache import ResponseCache
+from scheduler import Scheduler
+
+ads_service = GoogleAdsService()
+response_cache = ResponseCache()
+publish_queue = PublishQueue(ads_service, response_cache=response_cache)
+remote_sync = RemoteSync(ads_service)
+scheduler = Scheduler(ads_service, response_cache=response_cache)
+replica_router = ReplicaRouter()
+
+
+def init_app(app):
+    ads_service.init_app(app)
+    response_cache.init_app(app)
+    publish_queue.init_app(app)
+    remote_sync.init_app(app)
+    scheduler.init_app(app)
+    replica_router.init_app(app)
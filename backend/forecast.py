@@ -0,0 +1,289 @@
+"""
+Budget pacing and bid simulation for many campaigns at once.
+
+load_campaigns() reads every input in one query (campaign columns, average ad group bids,
+synced spend and clicks) into NumPy arrays, and simulate() computes pacing and flight
+projections on whole arrays, so the cost per campaign is a few array operations rather
+than a Python loop.
+
+The bidding model is deliberately simple, and its knobs are the constants below. The
+cost per click is the observed one when synced metrics have clicks, and otherwise comes
+from the ad group bids. Each strategy scales that cost and the conversion rate:
+- Maximize Clicks wins cheaper clicks that convert at the base rate.
+- Maximize Conversions and Target CPA pay the full CPC for clicks that convert better.
+- Target CPA also holds back spend when its target is below the CPA it can reach, in
+  proportion.
+"""
+from models import db, Campaign, AdGroup, CampaignDailyMetric
+from sqlalchemy import func, select
+from datetime import timedelta
+import numpy as np
+
+STRATEGIES = ('MAXIMIZE_CONVERSIONS', 'TARGET_CPA', 'MAXIMIZE_CLICKS')
+# strategy -> (multiplier of the cost per click, multiplier of the conversion rate)
+STRATEGY_MODELS = {
+    'MAXIMIZE_CONVERSIONS': (1.0, 1.25),
+    'TARGET_CPA': (1.0, 1.25),
+    'MAXIMIZE_CLICKS': (0.85, 1.0),
+}
+# Campaigns with an unknown or missing strategy are simulated with this one
+DEFAULT_STRATEGY = 'MAXIMIZE_CONVERSIONS'
+# Same default as the ad groups GoogleAdsService creates
+DEFAULT_CPC = 1.0
+# Click-through rate that turns a CPM bid into a cost per click
+DEFAULT_CTR = 0.01
+# Conversions are not synced, so the base rate is an assumption
+DEFAULT_CONVERSION_RATE = 0.03
+# Pacing within this share of the expected spend counts as on track
+PACING_TOLERANCE = 0.1
+PACING_STATES = ('NOT_STARTED', 'UNDER', 'ON_TRACK', 'OVER', 'ENDED')
+# Campaigns that serve in Google Ads for the rest of their flight: published ones, and
+# scheduled ones from their start date on. Nothing is projected for any other status
+# (drafts, publishes in progress, paused or ended campaigns).
+SPENDING_STATUSES = ('PUBLISHED', 'SCHEDULED')
+
+
+def load_campaigns(as_of, where=()):
+    """
+    Inputs of simulate() for the campaigns matching the `where` clauses, as a dict of
+    equal-length arrays (plus 'id', a list of UUIDs). Spend and clicks are the synced
+    metrics up to `as_of`.
+    """
+    bids = (
+        select(
+            AdGroup.campaign_id,
+            func.avg(AdGroup.cpc_bid).label('cpc_bid'),
+            func.avg(AdGroup.cpm_bid).label('cpm_bid'),
+        )
+        .where(AdGroup.status != 'REMOVED')
+        .group_by(AdGroup.campaign_id)
+        .subquery()
+    )
+    metrics = (
+        select(
+            CampaignDailyMetric.campaign_id,
+            func.sum(CampaignDailyMetric.cost_micros).label('cost_micros'),
+            func.sum(CampaignDailyMetric.clicks).label('clicks'),
+        )
+        .where(CampaignDailyMetric.date <= as_of)
+        .group_by(CampaignDailyMetric.campaign_id)
+        .subquery()
+    )
+    query = (
+        select(
+            Campaign.id, Campaign.status, Campaign.bidding_strategy, Campaign.daily_budget, Campaign.target_cpa,
+            Campaign.start_date, Campaign.end_date, bids.c.cpc_bid, bids.c.cpm_bid,
+            func.coalesce(metrics.c.cost_micros, 0), func.coalesce(metrics.c.clicks, 0),
+        )
+        .outerjoin(bids, bids.c.campaign_id == Campaign.id)
+        .outerjoin(metrics, metrics.c.campaign_id == Campaign.id)
+        .where(*where)
+    )
+    rows = db.session.execute(query).all()
+    (ids, statuses, strategies, budgets, target_cpas, starts, ends,
+     cpc_bids, cpm_bids, cost_micros, clicks) = zip(*rows) if rows else ((),) * 11
+    return {
+        'id': list(ids),
+        'status': np.array(statuses, dtype=object),
+        'bidding_strategy': np.array(strategies, dtype=object),
+        'daily_budget': np.array(budgets, dtype=float),
+        # None -> NaN for the nullable numeric columns
+        'target_cpa': np.array(target_cpas, dtype=float),
+        'start_date': np.array(starts, dtype='datetime64[D]'),
+        'end_date': np.array(ends, dtype='datetime64[D]'),
+        'cpc_bid': np.array(cpc_bids, dtype=float),
+        'cpm_bid': np.array(cpm_bids, dtype=float),
+        'spend': np.array(cost_micros, dtype=float) / 1000000,
+        'clicks': np.array(clicks, dtype=float),
+    }
+
+
+def simulate(columns, as_of):
+    """
+    Pacing and projections for every campaign in `columns` (see load_campaigns), as of
+    `as_of`. Only campaigns in SPENDING_STATUSES have remaining days to project spend over.
+    Returns a dict of arrays, one value per campaign:
+
+    flight_days, elapsed_days, remaining_days, planned_spend (budget x flight days),
+    spend_to_date, expected_spend_to_date, pacing (actual / expected, NaN before start),
+    pacing_state (index into PACING_STATES), strategy (the campaign's own, as an index
+    into STRATEGIES), cpc, daily_spend, daily_clicks and daily_conversions under that
+    strategy, projected_spend (to date plus the rest of the flight), projected_conversions
+    and projected_cpa.
+
+    Also 'strategies': the same daily figures for every campaign under each of STRATEGIES,
+    as (len(STRATEGIES), campaigns) arrays, for what-if comparisons.
+    """
+    today = np.datetime64(as_of, 'D')
+    budget = columns['daily_budget']
+    flight_days = (columns['end_date'] - columns['start_date']).astype(np.int64) + 1
+    elapsed_days = np.clip((today - columns['start_date']).astype(np.int64) + 1, 0, flight_days)
+    spending = _one_of(columns['status'], SPENDING_STATUSES)
+    remaining_days = np.where(spending, flight_days - elapsed_days, 0)
+
+    spend_to_date = columns['spend']
+    expected_spend_to_date = budget * elapsed_days
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pacing = np.where(expected_spend_to_date > 0, spend_to_date / expected_spend_to_date, np.nan)
+    pacing_state = np.select(
+        [elapsed_days == 0, elapsed_days >= flight_days, pacing < 1 - PACING_TOLERANCE, pacing > 1 + PACING_TOLERANCE],
+        [PACING_STATES.index('NOT_STARTED'), PACING_STATES.index('ENDED'), PACING_STATES.index('UNDER'),
+         PACING_STATES.index('OVER')],
+        PACING_STATES.index('ON_TRACK'),
+    )
+
+    # Observed CPC where there are clicks, else the CPC bid, else the CPM bid at DEFAULT_CTR
+    with np.errstate(divide='ignore', invalid='ignore'):
+        observed_cpc = np.where(columns['clicks'] > 0, spend_to_date / columns['clicks'], np.nan)
+    bid_cpc = np.where(np.isnan(columns['cpc_bid']), columns['cpm_bid'] / 1000 / DEFAULT_CTR, columns['cpc_bid'])
+    cpc = np.where(np.isnan(observed_cpc), bid_cpc, observed_cpc)
+    cpc = np.where(np.isnan(cpc) | (cpc <= 0), DEFAULT_CPC, cpc)
+
+    # (strategies, campaigns) what-if matrices
+    cpc_factor = np.array([STRATEGY_MODELS[s][0] for s in STRATEGIES])[:, None]
+    conversion_factor = np.array([STRATEGY_MODELS[s][1] for s in STRATEGIES])[:, None]
+    strategy_cpc = cpc * cpc_factor
+    conversion_rate = DEFAULT_CONVERSION_RATE * conversion_factor
+    reachable_cpa = strategy_cpc / conversion_rate
+    spend_share = np.ones((len(STRATEGIES), len(budget)))
+    target = columns['target_cpa']
+    throttled = ~np.isnan(target) & (target > 0)
+    target_row = STRATEGIES.index('TARGET_CPA')
+    spend_share[target_row] = np.where(
+        throttled, np.minimum(1.0, np.where(throttled, target, 0) / reachable_cpa[target_row]), 1.0
+    )
+    strategy_spend = budget * spend_share
+    strategy_clicks = strategy_spend / strategy_cpc
+    strategy_conversions = strategy_clicks * conversion_rate
+
+    # Each campaign's own strategy picks its row of the matrices
+    own = np.full(len(budget), STRATEGIES.index(DEFAULT_STRATEGY))
+    for index, strategy in enumerate(STRATEGIES):
+        own[columns['bidding_strategy'] == strategy] = index
+    campaigns = np.arange(len(budget))
+    daily_spend = strategy_spend[own, campaigns]
+    daily_conversions = strategy_conversions[own, campaigns]
+
+    projected_spend = spend_to_date + daily_spend * remaining_days
+    projected_conversions = (
+        spend_to_date / reachable_cpa[own, campaigns] + daily_conversions * remaining_days
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        projected_cpa = np.where(projected_conversions > 0, projected_spend / projected_conversions, np.nan)
+
+    return {
+        'flight_days': flight_days,
+        'elapsed_days': elapsed_days,
+        'remaining_days': remaining_days,
+        'planned_spend': budget * flight_days,
+        'spend_to_date': spend_to_date,
+        'expected_spend_to_date': expected_spend_to_date,
+        'pacing': pacing,
+        'pacing_state': pacing_state,
+        'strategy': own,
+        'cpc': cpc,
+        'daily_spend': daily_spend,
+        'daily_clicks': strategy_clicks[own, campaigns],
+        'daily_conversions': daily_conversions,
+        'projected_spend': projected_spend,
+        'projected_conversions': projected_conversions,
+        'projected_cpa': projected_cpa,
+        'strategies': {
+            'daily_spend': strategy_spend,
+            'daily_clicks': strategy_clicks,
+            'daily_conversions': strategy_conversions,
+        },
+    }
+
+
+def daily_spend_curve(columns, result, as_of, days):
+    """Projected spend of all campaigns together on each of the `days` days from `as_of`,
+    built from per-campaign start and stop offsets rather than per-day rows."""
+    today = np.datetime64(as_of, 'D')
+    first = np.maximum((columns['start_date'] - today).astype(np.int64), 0)
+    last = np.minimum((columns['end_date'] - today).astype(np.int64), days - 1)
+    running = (result['remaining_days'] > 0) & (first <= last)
+    rate = result['daily_spend'][running]
+    changes = (np.bincount(first[running], rate, minlength=days + 1)
+               - np.bincount(last[running] + 1, rate, minlength=days + 1))
+    return np.cumsum(changes[:days])
+
+
+def portfolio(columns, result, as_of, days):
+    """JSON-ready totals, pacing counts, per-strategy what-ifs and the daily spend curve."""
+    spend_to_date = result['spend_to_date'].sum()
+    expected = result['expected_spend_to_date'].sum()
+    campaigns_per_strategy = np.bincount(result['strategy'], minlength=len(STRATEGIES))
+    remaining = result['remaining_days']
+    strategies = {}
+    for index, strategy in enumerate(STRATEGIES):
+        spend = float((result['strategies']['daily_spend'][index] * remaining).sum())
+        conversions = float((result['strategies']['daily_conversions'][index] * remaining).sum())
+        strategies[strategy] = {
+            'campaigns': int(campaigns_per_strategy[index]),
+            # Rest of every flight, as if every campaign used this strategy
+            'remaining_spend': round(spend, 2),
+            'remaining_clicks': round(float((result['strategies']['daily_clicks'][index] * remaining).sum()), 1),
+            'remaining_conversions': round(conversions, 1),
+            'cpa': round(spend / conversions, 2) if conversions else None,
+        }
+    curve = daily_spend_curve(columns, result, as_of, days)
+    return {
+        'as_of': as_of.isoformat(),
+        'campaigns': len(columns['id']),
+        'totals': {
+            'planned_spend': round(float(result['planned_spend'].sum()), 2),
+            'spend_to_date': round(float(spend_to_date), 2),
+            'expected_spend_to_date': round(float(expected), 2),
+            'pacing': round(float(spend_to_date / expected), 4) if expected else None,
+            'projected_spend': round(float(result['projected_spend'].sum()), 2),
+            'projected_conversions': round(float(result['projected_conversions'].sum()), 1),
+        },
+        'pacing': dict(zip(PACING_STATES, np.bincount(result['pacing_state'], minlength=len(PACING_STATES)).tolist())),
+        'strategies': strategies,
+        'daily': [
+            {'date': (as_of + timedelta(days=offset)).isoformat(), 'projected_spend': round(float(spend), 2)}
+            for offset, spend in enumerate(curve)
+        ],
+    }
+
+
+def campaign_forecast(columns, result, index):
+    """JSON-ready forecast of the campaign at `index`, with its per-strategy what-ifs."""
+    def number(value, digits=2):
+        return None if np.isnan(value) else round(float(value), digits)
+
+    remaining = int(result['remaining_days'][index])
+    return {
+        'campaign_id': str(columns['id'][index]),
+        'bidding_strategy': columns['bidding_strategy'][index],
+        'flight_days': int(result['flight_days'][index]),
+        'elapsed_days': int(result['elapsed_days'][index]),
+        'remaining_days': remaining,
+        'planned_spend': number(result['planned_spend'][index]),
+        'spend_to_date': number(result['spend_to_date'][index]),
+        'expected_spend_to_date': number(result['expected_spend_to_date'][index]),
+        'pacing': number(result['pacing'][index], 4),
+        'pacing_state': PACING_STATES[result['pacing_state'][index]],
+        'cpc': number(result['cpc'][index]),
+        'daily_spend': number(result['daily_spend'][index]),
+        'daily_clicks': number(result['daily_clicks'][index], 1),
+        'daily_conversions': number(result['daily_conversions'][index], 2),
+        'projected_spend': number(result['projected_spend'][index]),
+        'projected_conversions': number(result['projected_conversions'][index], 1),
+        'projected_cpa': number(result['projected_cpa'][index]),
+        'strategies': {
+            strategy: {
+                'daily_spend': number(result['strategies']['daily_spend'][row, index]),
+                'daily_conversions': number(result['strategies']['daily_conversions'][row, index], 2),
+                'remaining_spend': number(result['strategies']['daily_spend'][row, index] * remaining),
+                'remaining_conversions': number(result['strategies']['daily_conversions'][row, index] * remaining, 1),
+            }
+            for row, strategy in enumerate(STRATEGIES)
+        },
+    }
+
+
+def _one_of(values, options):
+    """Elementwise `value in options` for an object array (which may hold None)."""
+    return np.logical_or.reduce([values == option for option in options] + [np.zeros(len(values), dtype=bool)])
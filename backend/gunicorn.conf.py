@@ -0,0 +1,73 @@
+"""
+Gunicorn settings for serving wsgi:app in production. Every value can be overridden
+from the environment (or on the command line, which takes precedence).
+
+Size DB_POOL_SIZE + DB_MAX_OVERFLOW (see config.py) for at least `threads` request
+threads plus PUBLISH_WORKERS publish threads per worker process.
+
+The GOOGLE_ADS_* rate limits (see config.py) are for the whole server: each worker
+throttles its own Google Ads calls to a 1/`workers` share of them. The response cache
+keeps its bodies per worker but its versions in the database, so a write in any
+worker invalidates every worker's copy (see response_cache.py).
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# Threaded workers: requests mostly wait on the database or Google Ads, not the CPU
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers periodically (with jitter so they don't all restart together)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+# Import the app once in the master; workers fork with it already loaded
+preload_app = True
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+
+
+def on_starting(server):
+    from wsgi import app
+
+    shared = min(app.config['GOOGLE_ADS_RATE_LIMIT_BURST'], app.config['GOOGLE_ADS_MAX_CONCURRENT_REQUESTS'])
+    if server.cfg.workers > shared:
+        server.log.warning(
+            f"{server.cfg.workers} workers but Google Ads burst / concurrency limits of {shared}: "
+            f"each worker keeps at least 1, so together they can exceed them"
+        )
+
+
+def post_fork(server, worker):
+    from wsgi import app
+    from models import db
+    from extensions import ads_service
+    from rate_limiter import RateLimiter
+
+    # Pooled connections the master may have opened must not be shared with
+    # the children; drop them without closing the parent's sockets.
+    with app.app_context():
+        for engine in db.engines.values():  # the primary and any read replicas
+            engine.dispose(close=False)
+    # Likewise the Google Ads client and its gRPC channels: each worker builds its own
+    ads_service.client = None
+    # Limiters are per process, so split the server-wide limits between the workers
+    ads_service.rate_limiter = RateLimiter.from_config(app.config, processes=server.cfg.workers)
+
+
+def post_worker_init(worker):
+    from extensions import ads_service, publish_queue, remote_sync, scheduler
+
+    # Build the Google Ads client now rather than on the first publish request
+    ads_service.client
+    # Safe to run in every worker: jobs are claimed with a conditional UPDATE
+    publish_queue.recover_pending()
+    # Likewise: each customer's sync is claimed, so only one worker syncs it at a time
+    remote_sync.start()
+    # Likewise: batches of due flights are locked with SKIP LOCKED, so workers split them
+    scheduler.start()
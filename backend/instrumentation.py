@@ -0,0 +1,262 @@
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from collections import defaultdict
+import bisect
+import cProfile
+import functools
+import os
+import threading
+import time
+import uuid
+
+# Off unless init_app() is called with INSTRUMENTATION_ENABLED: spans then cost one flag check
+_enabled = False
+_profiling = False
+_profile_dir = None
+_profile_lock = threading.Lock()
+_local = threading.local()
+
+PROFILE_HEADER = 'X-Profile'
+# Values of PROFILE_HEADER that ask for a profile (case-insensitive); any other is ignored
+PROFILE_HEADER_VALUES = ('1', 'true')
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+
+
+# ============================================
+# METRICS
+# ============================================
+
+class Histogram:
+    """Thread-safe Prometheus-style histogram with a fixed set of label names."""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [per-bucket counts..., +Inf count, sum]
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        for labels, values in series:
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values):
+                cumulative += count
+                bucket_labels = ','.join(pairs + [f'le="{bound}"'])
+                lines.append(f'{self.name}_bucket{{{bucket_labels}}} {cumulative}')
+            suffix = '{' + ','.join(pairs) + '}' if pairs else ''
+            lines.append(f'{self.name}_sum{suffix} {values[-1]}')
+            lines.append(f'{self.name}_count{suffix} {cumulative}')
+        return '\n'.join(lines)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency, excluding streamed bodies.',
+    ('method', 'endpoint', 'status')
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'Database queries issued per request.', ('endpoint',), buckets=COUNT_BUCKETS
+)
+QUERY_LATENCY = Histogram('db_query_duration_seconds', 'Database query latency.', ('operation',))
+SPAN_LATENCY = {
+    'serialize': Histogram('serialization_duration_seconds', 'Time spent in to_dict, row and JSON serialization.'),
+    'google_ads': Histogram(
+        'google_ads_rpc_duration_seconds', 'Google Ads RPC latency, including client-side throttling and retries.',
+        ('service', 'method')
+    ),
+}
+HISTOGRAMS = (REQUEST_LATENCY, REQUEST_QUERIES, QUERY_LATENCY, *SPAN_LATENCY.values())
+
+
+def render_metrics():
+    """All histograms of this process in the Prometheus text exposition format."""
+    return '\n'.join(histogram.render() for histogram in HISTOGRAMS) + '\n'
+
+
+def is_enabled():
+    return _enabled
+
+
+# ============================================
+# SPANS
+# ============================================
+
+class _RequestStats:
+    __slots__ = ('started', 'queries', 'durations', 'depth', 'profiler')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.durations = defaultdict(float)
+        self.depth = defaultdict(int)
+        self.profiler = None
+
+
+class _Span:
+    __slots__ = ('kind', 'labels', 'stats', 'started')
+
+    def __init__(self, kind, labels):
+        self.kind = kind
+        self.labels = labels
+
+    def __enter__(self):
+        self.stats = getattr(_local, 'stats', None)
+        if self.stats is not None:
+            self.stats.depth[self.kind] += 1
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self.started
+        stats = self.stats
+        if stats is not None:
+            stats.depth[self.kind] -= 1
+            if stats.depth[self.kind]:
+                # Nested in a span of the same kind, which already covers this time
+                return False
+            stats.durations[self.kind] += duration
+        SPAN_LATENCY[self.kind].observe(duration, *self.labels)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(kind, *labels):
+    """Context manager timing a block as `kind` (a key of SPAN_LATENCY) for the current request."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(kind, labels)
+
+
+def timed(kind):
+    """Decorator form of span()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(kind, ()):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ============================================
+# HOOKS
+# ============================================
+
+def init_app(app):
+    """
+    Register the request and SQLAlchemy hooks when INSTRUMENTATION_ENABLED is set. When it
+    isn't, nothing is registered and span() / timed() reduce to a flag check.
+
+    Every response then carries `X-Query-Count` and a `Server-Timing` header (db,
+    serialize, google_ads and total milliseconds). With PROFILING_ENABLED, requests that
+    send `X-Profile: 1` (or `true`) are run under cProfile and the stats file is written to
+    PROFILE_DIR; its path comes back in `X-Profile-File`.
+    """
+    global _enabled, _profiling, _profile_dir
+    if not app.config.get('INSTRUMENTATION_ENABLED'):
+        return
+    _enabled = True
+    _profiling = app.config.get('PROFILING_ENABLED', False)
+    _profile_dir = app.config.get('PROFILE_DIR', 'profiles')
+
+    # On the Engine class so every engine, including ones created later, is covered
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - context._query_started
+    QUERY_LATENCY.observe(duration, statement.lstrip().split(None, 1)[0].upper())
+    stats = getattr(_local, 'stats', None)
+    if stats is not None:
+        stats.queries += 1
+        stats.durations['db'] += duration
+
+
+def _before_request():
+    stats = _local.stats = _RequestStats()
+    if (_profiling and request.headers.get(PROFILE_HEADER, '').strip().lower() in PROFILE_HEADER_VALUES
+            and _profile_lock.acquire(blocking=False)):
+        # One profile at a time: the profiler hooks are interpreter-wide on newer Pythons
+        stats.profiler = cProfile.Profile()
+        stats.profiler.enable()
+
+
+def _after_request(response):
+    stats = getattr(_local, 'stats', None)
+    if stats is None:
+        return response
+    total = time.perf_counter() - stats.started
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    REQUEST_LATENCY.observe(total, request.method, endpoint, response.status_code)
+    REQUEST_QUERIES.observe(stats.queries, endpoint)
+
+    timings = [f'{kind};dur={stats.durations[kind] * 1000:.2f}' for kind in ('db', 'serialize', 'google_ads')
+               if kind in stats.durations]
+    response.headers['Server-Timing'] = ', '.join(timings + [f'total;dur={total * 1000:.2f}'])
+    response.headers['X-Query-Count'] = str(stats.queries)
+
+    if stats.profiler is not None:
+        stats.profiler.disable()
+        try:
+            os.makedirs(_profile_dir, exist_ok=True)
+            name = (request.endpoint or 'unmatched').replace('.', '_')
+            path = os.path.join(_profile_dir, f'{int(time.time())}_{name}_{uuid.uuid4().hex[:8]}.prof')
+            stats.profiler.dump_stats(path)
+            response.headers['X-Profile-File'] = path
+        finally:
+            stats.profiler = None
+            _profile_lock.release()
+    return response
+
+
+def _teardown_request(exc):
+    stats = getattr(_local, 'stats', None)
+    if stats is not None and stats.profiler is not None:
+        # after_request didn't run (unhandled error); don't leave the profiler on
+        stats.profiler.disable()
+        _profile_lock.release()
+    _local.stats = None
@@ -0,0 +1,82 @@
+MATCH_TYPES = ('BROAD', 'PHRASE', 'EXACT')
+
+# Google Ads limits: 80 characters and 10 words per keyword
+MAX_KEYWORD_LENGTH = 80
+MAX_KEYWORD_WORDS = 10
+
+
+def normalize_keyword(text):
+    """Lookup form of a keyword: lowercased with whitespace collapsed."""
+    return ' '.join(text.lower().split())
+
+
+def parse_keywords(value):
+    """
+    Parse the `keywords` field of an ad group payload into a list of
+    {text, normalized_text, match_type, cpc_bid} dicts.
+
+    Accepts comma-separated text in Google Ads Editor notation (`broad match`,
+    `"phrase match"`, `[exact match]`), or a list whose items are such strings or
+    {text, match_type, cpc_bid} objects. Repeats of the same keyword and match type
+    are dropped. Raises ValueError with a client-facing message on invalid input.
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list):
+        raise ValueError('keywords must be a string or a list')
+
+    keywords, seen = [], set()
+    for item in value:
+        if isinstance(item, str):
+            text, match_type = _split_notation(item.strip())
+            cpc_bid = None
+            if not text:
+                continue
+        elif isinstance(item, dict):
+            text = item.get('text')
+            match_type = str(item.get('match_type', 'BROAD')).upper()
+            cpc_bid = item.get('cpc_bid')
+            if not isinstance(text, str) or not text.strip():
+                raise ValueError('Each keyword needs a non-empty text')
+        else:
+            raise ValueError('Each keyword must be a string or an object')
+
+        text = ' '.join(text.split())
+        if match_type not in MATCH_TYPES:
+            raise ValueError(f"Invalid match_type for keyword '{text}'. Use one of: {', '.join(MATCH_TYPES)}")
+        if len(text) > MAX_KEYWORD_LENGTH or len(text.split()) > MAX_KEYWORD_WORDS:
+            raise ValueError(f"Keyword '{text}' exceeds {MAX_KEYWORD_LENGTH} characters or {MAX_KEYWORD_WORDS} words")
+        if cpc_bid is not None and (isinstance(cpc_bid, bool) or not isinstance(cpc_bid, (int, float)) or cpc_bid <= 0):
+            raise ValueError(f"cpc_bid for keyword '{text}' must be a positive number")
+
+        normalized = normalize_keyword(text)
+        if (normalized, match_type) in seen:
+            continue
+        seen.add((normalized, match_type))
+        keywords.append({'text': text, 'normalized_text': normalized, 'match_type': match_type, 'cpc_bid': cpc_bid})
+    return keywords
+
+
+def format_keywords(keywords):
+    """Render parsed keywords back to the comma-separated notation of AdGroup.keywords."""
+    if not keywords:
+        return None
+    return ', '.join(_with_notation(k['text'], k['match_type']) for k in keywords)
+
+
+def _split_notation(item):
+    if len(item) >= 2 and item[0] == '[' and item[-1] == ']':
+        return item[1:-1].strip(), 'EXACT'
+    if len(item) >= 2 and item[0] == '"' and item[-1] == '"':
+        return item[1:-1].strip(), 'PHRASE'
+    return item, 'BROAD'
+
+
+def _with_notation(text, match_type):
+    if match_type == 'EXACT':
+        return f'[{text}]'
+    if match_type == 'PHRASE':
+        return f'"{text}"'
+    return text
@@ -0,0 +1,69 @@
+"""Create the campaigns and ad_groups tables
+
+Until now they were created by db.create_all() when the app started, and the migration
+history began with changes to them, so `flask db upgrade` couldn't build an empty
+database. Databases already upgraded past this revision don't run it.
+
+Revision ID: 1f0b6d2e8c45
+Revises: 
+Create Date: 2026-10-17 22:41:08.317265
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1f0b6d2e8c45'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('campaigns',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('objective', sa.String(length=100), nullable=False),
+    sa.Column('campaign_type', sa.String(length=100), nullable=True),
+    sa.Column('daily_budget', sa.Integer(), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('google_campaign_id', sa.String(length=255), nullable=True),
+    sa.Column('ad_group_name', sa.String(length=255), nullable=True),
+    sa.Column('ad_headline', sa.String(length=255), nullable=True),
+    sa.Column('ad_description', sa.Text(), nullable=True),
+    sa.Column('asset_url', sa.String(length=500), nullable=True),
+    sa.Column('target_cpa', sa.Float(), nullable=True),
+    sa.Column('bidding_strategy', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('ad_groups',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('campaign_id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('target_audience', sa.String(length=255), nullable=True),
+    sa.Column('keywords', sa.Text(), nullable=True),
+    sa.Column('cpc_bid', sa.Float(), nullable=True),
+    sa.Column('cpm_bid', sa.Float(), nullable=True),
+    sa.Column('ad_headline', sa.String(length=255), nullable=True),
+    sa.Column('ad_headline_2', sa.String(length=255), nullable=True),
+    sa.Column('ad_headline_3', sa.String(length=255), nullable=True),
+    sa.Column('ad_description', sa.Text(), nullable=True),
+    sa.Column('ad_description_2', sa.Text(), nullable=True),
+    sa.Column('final_url', sa.String(length=500), nullable=True),
+    sa.Column('display_url', sa.String(length=255), nullable=True),
+    sa.Column('google_ad_group_id', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('ad_groups')
+    op.drop_table('campaigns')
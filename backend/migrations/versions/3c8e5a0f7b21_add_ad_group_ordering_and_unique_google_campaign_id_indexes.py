@@ -0,0 +1,47 @@
+"""Index ad groups by (campaign_id, created_at, id) and make campaigns.google_campaign_id unique
+
+Revision ID: 3c8e5a0f7b21
+Revises: 7a2d9e4f1c36
+Create Date: 2026-10-18 09:41:07.562318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8e5a0f7b21'
+down_revision = '7a2d9e4f1c36'
+branch_labels = None
+depends_on = None
+
+# Built outside the migration transaction with CONCURRENTLY on PostgreSQL, so the tables
+# keep taking writes while the indexes build. A concurrent build that fails leaves an
+# INVALID index behind: drop it (DROP INDEX CONCURRENTLY) before running this again.
+
+
+def upgrade():
+    if not op.get_context().as_sql:
+        duplicates = op.get_bind().execute(sa.text(
+            "SELECT google_campaign_id FROM campaigns WHERE google_campaign_id IS NOT NULL "
+            "GROUP BY google_campaign_id HAVING COUNT(*) > 1 LIMIT 10"
+        )).scalars().all()
+        if duplicates:
+            raise RuntimeError(f"Campaigns share Google Ads campaign ids {', '.join(duplicates)}; "
+                               "resolve them before making google_campaign_id unique")
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_ad_groups_campaign_id_created_at_id', 'ad_groups', ['campaign_id', 'created_at', 'id'],
+                        unique=False, postgresql_concurrently=True)
+        # The new index starts with campaign_id, so it covers every lookup this one served
+        op.drop_index('ix_ad_groups_campaign_id', table_name='ad_groups', postgresql_concurrently=True)
+        op.create_index('ix_campaigns_google_campaign_id', 'campaigns', ['google_campaign_id'],
+                        unique=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_campaigns_google_campaign_id', table_name='campaigns', postgresql_concurrently=True)
+        op.create_index('ix_ad_groups_campaign_id', 'ad_groups', ['campaign_id'],
+                        unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_ad_groups_campaign_id_created_at_id', table_name='ad_groups', postgresql_concurrently=True)
@@ -0,0 +1,31 @@
+"""Add composite indexes for keyset-paginated campaign listing
+
+Revision ID: 4b7e2c91a0d5
+Revises: dee83432ab63
+Create Date: 2026-10-17 09:12:44.318205
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7e2c91a0d5'
+down_revision = 'dee83432ab63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('campaigns', schema=None) as batch_op:
+        batch_op.create_index('ix_campaigns_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_campaigns_status_created_at_id', ['status', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_campaigns_objective_created_at_id', ['objective', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_campaigns_campaign_type_created_at_id', ['campaign_type', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('campaigns', schema=None) as batch_op:
+        batch_op.drop_index('ix_campaigns_campaign_type_created_at_id')
+        batch_op.drop_index('ix_campaigns_objective_created_at_id')
+        batch_op.drop_index('ix_campaigns_status_created_at_id')
+        batch_op.drop_index('ix_campaigns_created_at_id')
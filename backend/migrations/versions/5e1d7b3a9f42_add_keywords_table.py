@@ -0,0 +1,94 @@
+"""Add keywords table and backfill it from ad_groups.keywords
+
+Revision ID: 5e1d7b3a9f42
+Revises: 9c3f5a17e2b8
+Create Date: 2026-10-17 14:21:09.318204
+
+"""
+from datetime import datetime
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e1d7b3a9f42'
+down_revision = '9c3f5a17e2b8'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade():
+    keywords = op.create_table('keywords',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('ad_group_id', sa.UUID(), nullable=False),
+    sa.Column('campaign_id', sa.UUID(), nullable=False),
+    sa.Column('text', sa.String(length=80), nullable=False),
+    sa.Column('normalized_text', sa.String(length=80), nullable=False),
+    sa.Column('match_type', sa.String(length=10), nullable=False),
+    sa.Column('cpc_bid', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['ad_group_id'], ['ad_groups.id'], ),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    _backfill(keywords)
+
+    # Built after the backfill, which is cheaper than maintaining them row by row
+    with op.batch_alter_table('keywords', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_keywords_ad_group_id'), ['ad_group_id'], unique=False)
+        batch_op.create_index('ix_keywords_normalized_text', ['normalized_text'], unique=False)
+        batch_op.create_index('ix_keywords_campaign_id_normalized_text', ['campaign_id', 'normalized_text', 'match_type'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('keywords', schema=None) as batch_op:
+        batch_op.drop_index('ix_keywords_campaign_id_normalized_text')
+        batch_op.drop_index('ix_keywords_normalized_text')
+        batch_op.drop_index(batch_op.f('ix_keywords_ad_group_id'))
+
+    op.drop_table('keywords')
+
+
+def _backfill(keywords):
+    """Split every ad group's comma-separated keywords into rows, streaming the ad groups.
+    Parsing is inlined rather than imported from the app so this revision stays fixed."""
+    ad_groups = sa.table('ad_groups',
+        sa.column('id', sa.UUID()),
+        sa.column('campaign_id', sa.UUID()),
+        sa.column('keywords', sa.Text())
+    )
+    bind = op.get_bind()
+    result = bind.execution_options(yield_per=BACKFILL_BATCH_SIZE).execute(
+        sa.select(ad_groups.c.id, ad_groups.c.campaign_id, ad_groups.c.keywords)
+        .where(ad_groups.c.keywords.isnot(None))
+    )
+
+    now = datetime.utcnow()
+    for partition in result.partitions():
+        rows = []
+        for ad_group_id, campaign_id, text in partition:
+            seen = set()
+            for item in text.split(','):
+                item = item.strip()
+                match_type = 'BROAD'
+                if len(item) >= 2 and item[0] == '[' and item[-1] == ']':
+                    item, match_type = item[1:-1], 'EXACT'
+                elif len(item) >= 2 and item[0] == '"' and item[-1] == '"':
+                    item, match_type = item[1:-1], 'PHRASE'
+                item = ' '.join(item.split())[:80]
+                normalized = item.lower()
+                if not item or (normalized, match_type) in seen:
+                    continue
+                seen.add((normalized, match_type))
+                rows.append({
+                    'id': uuid.uuid4(), 'ad_group_id': ad_group_id, 'campaign_id': campaign_id,
+                    'text': item, 'normalized_text': normalized, 'match_type': match_type,
+                    'cpc_bid': None, 'created_at': now
+                })
+        if rows:
+            op.bulk_insert(keywords, rows)
@@ -0,0 +1,48 @@
+"""Add the schedule_runs table and the flight scheduler's (status, date) indexes on campaigns
+
+Revision ID: 7a2d9e4f1c36
+Revises: e5b19c07d3a4
+Create Date: 2026-10-17 23:12:48.215604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2d9e4f1c36'
+down_revision = 'e5b19c07d3a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('schedule_runs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('as_of', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('activated', sa.Integer(), nullable=False),
+    sa.Column('ended', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('schedule_runs', schema=None) as batch_op:
+        batch_op.create_index('ix_schedule_runs_started_at', ['started_at'], unique=False)
+
+    with op.batch_alter_table('campaigns', schema=None) as batch_op:
+        batch_op.create_index('ix_campaigns_status_start_date', ['status', 'start_date'], unique=False)
+        batch_op.create_index('ix_campaigns_status_end_date', ['status', 'end_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('campaigns', schema=None) as batch_op:
+        batch_op.drop_index('ix_campaigns_status_end_date')
+        batch_op.drop_index('ix_campaigns_status_start_date')
+
+    with op.batch_alter_table('schedule_runs', schema=None) as batch_op:
+        batch_op.drop_index('ix_schedule_runs_started_at')
+
+    op.drop_table('schedule_runs')
@@ -0,0 +1,26 @@
+"""Add campaigns.schedule_claimed_at, the scheduler's claim on a campaign
+
+Revision ID: 8d2f6b4e1a97
+Revises: 3c8e5a0f7b21
+Create Date: 2026-10-18 11:02:44.918305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2f6b4e1a97'
+down_revision = '3c8e5a0f7b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('campaigns', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('schedule_claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('campaigns', schema=None) as batch_op:
+        batch_op.drop_column('schedule_claimed_at')
@@ -0,0 +1,42 @@
+"""Add publish_jobs table for asynchronous campaign publishing
+
+Revision ID: 9c3f5a17e2b8
+Revises: 4b7e2c91a0d5
+Create Date: 2026-10-17 10:03:27.551902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c3f5a17e2b8'
+down_revision = '4b7e2c91a0d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('publish_jobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('campaign_id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('google_campaign_id', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('publish_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_publish_jobs_campaign_id'), ['campaign_id'], unique=False)
+        batch_op.create_index('ix_publish_jobs_status_created_at', ['status', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('publish_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_publish_jobs_status_created_at')
+        batch_op.drop_index(batch_op.f('ix_publish_jobs_campaign_id'))
+
+    op.drop_table('publish_jobs')
@@ -0,0 +1,29 @@
+"""Add the cache_versions table, response_cache's scope versions shared across processes
+
+Revision ID: a6e4c2d8f913
+Revises: 8d2f6b4e1a97
+Create Date: 2026-10-18 15:24:09.371840
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6e4c2d8f913'
+down_revision = '8d2f6b4e1a97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cache_versions',
+    sa.Column('scope', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('invalidated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('scope')
+    )
+
+
+def downgrade():
+    op.drop_table('cache_versions')
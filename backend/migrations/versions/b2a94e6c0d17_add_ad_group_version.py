@@ -0,0 +1,26 @@
+"""Add version column to ad_groups for optimistic locking
+
+Revision ID: b2a94e6c0d17
+Revises: 5e1d7b3a9f42
+Create Date: 2026-10-17 15:02:44.817530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2a94e6c0d17'
+down_revision = '5e1d7b3a9f42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('ad_groups', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('ad_groups', schema=None) as batch_op:
+        batch_op.drop_column('version')
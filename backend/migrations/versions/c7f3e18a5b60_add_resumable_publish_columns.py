@@ -0,0 +1,42 @@
+"""Record published resource ids on campaigns; idempotency key, attempts and heartbeat on publish jobs
+
+Revision ID: c7f3e18a5b60
+Revises: b2a94e6c0d17
+Create Date: 2026-10-17 18:21:09.403118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7f3e18a5b60'
+down_revision = 'b2a94e6c0d17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('campaigns', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('google_budget_id', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('google_ad_group_id', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('google_ad_id', sa.String(length=255), nullable=True))
+
+    with op.batch_alter_table('publish_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('idempotency_key', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_publish_jobs_idempotency_key', ['idempotency_key'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('publish_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_publish_jobs_idempotency_key')
+        batch_op.drop_column('heartbeat_at')
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('idempotency_key')
+
+    with op.batch_alter_table('campaigns', schema=None) as batch_op:
+        batch_op.drop_column('google_ad_id')
+        batch_op.drop_column('google_ad_group_id')
+        batch_op.drop_column('google_budget_id')
@@ -0,0 +1,54 @@
+"""Add campaign_remote_states, campaign_daily_metrics and sync_states tables for the Google Ads sync
+
+Revision ID: d4a81f2c6e93
+Revises: c7f3e18a5b60
+Create Date: 2026-10-17 19:40:12.218804
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a81f2c6e93'
+down_revision = 'c7f3e18a5b60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('campaign_remote_states',
+    sa.Column('campaign_id', sa.UUID(), nullable=False),
+    sa.Column('customer_id', sa.String(length=20), nullable=False),
+    sa.Column('google_campaign_id', sa.String(length=255), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('budget_amount_micros', sa.BigInteger(), nullable=True),
+    sa.Column('synced_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ),
+    sa.PrimaryKeyConstraint('campaign_id')
+    )
+    op.create_table('campaign_daily_metrics',
+    sa.Column('campaign_id', sa.UUID(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('impressions', sa.BigInteger(), nullable=False),
+    sa.Column('clicks', sa.BigInteger(), nullable=False),
+    sa.Column('cost_micros', sa.BigInteger(), nullable=False),
+    sa.Column('synced_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ),
+    sa.PrimaryKeyConstraint('campaign_id', 'date')
+    )
+    op.create_table('sync_states',
+    sa.Column('customer_id', sa.String(length=20), nullable=False),
+    sa.Column('high_water_mark', sa.Date(), nullable=True),
+    sa.Column('running_since', sa.DateTime(), nullable=True),
+    sa.Column('last_synced_at', sa.DateTime(), nullable=True),
+    sa.Column('last_full_sync_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('customer_id')
+    )
+
+
+def downgrade():
+    op.drop_table('sync_states')
+    op.drop_table('campaign_daily_metrics')
+    op.drop_table('campaign_remote_states')
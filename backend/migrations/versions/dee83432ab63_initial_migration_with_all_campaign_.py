@@ -1,7 +1,7 @@
 """Initial migration with all campaign fields
 
 Revision ID: dee83432ab63
-Revises: 
+Revises: 1f0b6d2e8c45
 Create Date: 2025-12-12 22:51:10.926980
 
 """
@@ -11,7 +11,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = 'dee83432ab63'
-down_revision = None
+down_revision = '1f0b6d2e8c45'
 branch_labels = None
 depends_on = None
 
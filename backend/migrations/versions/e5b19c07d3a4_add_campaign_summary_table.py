@@ -0,0 +1,48 @@
+"""Add the pre-aggregated campaign_summary table and an index on ad_groups.campaign_id
+
+Revision ID: e5b19c07d3a4
+Revises: d4a81f2c6e93
+Create Date: 2026-10-17 21:05:37.640193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b19c07d3a4'
+down_revision = 'd4a81f2c6e93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('campaign_summary',
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('objective', sa.String(length=100), nullable=False),
+    sa.Column('bidding_strategy', sa.String(length=50), nullable=False),
+    sa.Column('campaigns', sa.BigInteger(), nullable=False),
+    sa.Column('daily_budget', sa.BigInteger(), nullable=False),
+    sa.Column('ad_groups', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('status', 'objective', 'bidding_strategy')
+    )
+    with op.batch_alter_table('ad_groups', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ad_groups_campaign_id'), ['campaign_id'], unique=False)
+
+    # Backfill from the existing rows; the app keeps it current from here on
+    op.execute("""
+        INSERT INTO campaign_summary (status, objective, bidding_strategy, campaigns, daily_budget, ad_groups)
+        SELECT COALESCE(c.status, 'DRAFT'), c.objective, COALESCE(c.bidding_strategy, 'UNSPECIFIED'),
+               COUNT(*), COALESCE(SUM(c.daily_budget), 0), COALESCE(SUM(a.ad_groups), 0)
+        FROM campaigns c
+        LEFT JOIN (SELECT campaign_id, COUNT(*) AS ad_groups FROM ad_groups GROUP BY campaign_id) a
+            ON a.campaign_id = c.id
+        GROUP BY COALESCE(c.status, 'DRAFT'), c.objective, COALESCE(c.bidding_strategy, 'UNSPECIFIED')
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('ad_groups', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ad_groups_campaign_id'))
+
+    op.drop_table('campaign_summary')
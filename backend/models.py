@@ -1,9 +1,73 @@
+from flask import g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from datetime import datetime
 import uuid
+from sqlalchemy import func, select
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql.dml import UpdateBase
+from instrumentation import timed
+
+
+class RoutingSession(Session):
+    """Sends the statements of a request routed to a read replica (see replicas.py) to that
+    replica. Writes always go to the primary, even from a read-only request."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not isinstance(clause, UpdateBase) and has_app_context():
+            engine = g.get('db_read_engine')
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+
+def upsert(model, rows, key_columns, update_columns=None, increment=False):
+    """
+    INSERT ... ON CONFLICT (key_columns) DO UPDATE of `update_columns` (default: every other
+    key of the rows; an empty tuple means DO NOTHING), sent as one Core executemany on the
+    model's table (skipping the ORM bulk path). `rows` can also be a SELECT whose labels
+    are column names, sent as INSERT ... SELECT. With increment=True the incoming values are
+    added to the stored ones instead of replacing them (only for the named columns when
+    `increment` is a tuple of column names). Supports PostgreSQL and SQLite.
+    """
+    if isinstance(rows, list) and not rows:
+        return
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f'upsert is not supported on {dialect}')
+
+    table = model.__table__
+    if isinstance(rows, list):
+        columns = list(rows[0])
+        statement = insert(table)
+    else:
+        columns = list(rows.selected_columns.keys())
+        statement = insert(table).from_select(columns, rows)
+    if update_columns is None:
+        update_columns = [column for column in columns if column not in key_columns]
+    if update_columns:
+        incremented = update_columns if increment is True else (increment or ())
+        statement = statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={
+                column: table.c[column] + statement.excluded[column] if column in incremented else statement.excluded[column]
+                for column in update_columns
+            }
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=key_columns)
+    if isinstance(rows, list):
+        db.session.execute(statement, rows)
+    else:
+        db.session.execute(statement)
 
-db = SQLAlchemy()
 
 class Campaign(db.Model):
     __tablename__ = 'campaigns'
@@ -15,10 +79,15 @@ class Campaign(db.Model):
     daily_budget = db.Column(db.Integer, nullable=False) # In micros potentially, but let's stick to standard units and convert
     start_date = db.Column(db.Date, nullable=False)
     end_date = db.Column(db.Date, nullable=False)
-    status = db.Column(db.String(50), default="DRAFT") # DRAFT, PUBLISHED
+    status = db.Column(db.String(50), default="DRAFT") # DRAFT, PUBLISHING, SCHEDULED, PUBLISHED, PAUSED, ENDED
     
     # Google Ads Specific
     google_campaign_id = db.Column(db.String(255), nullable=True)
+    # Other resources created by publishing, recorded step by step so a retried
+    # publish resumes instead of creating them twice (the ad group is the default one)
+    google_budget_id = db.Column(db.String(255), nullable=True)
+    google_ad_group_id = db.Column(db.String(255), nullable=True)
+    google_ad_id = db.Column(db.String(255), nullable=True)
     ad_group_name = db.Column(db.String(255), nullable=True)
     ad_headline = db.Column(db.String(255), nullable=True)
     ad_description = db.Column(db.Text, nullable=True)
@@ -29,30 +98,51 @@ class Campaign(db.Model):
     bidding_strategy = db.Column(db.String(50), default="MAXIMIZE_CONVERSIONS")
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Set while a scheduler pass holds the campaign between claiming it and writing back
+    # its flight transition (see scheduler.py); NULL otherwise
+    schedule_claimed_at = db.Column(db.DateTime, nullable=True)
     
     # Relationship to ad groups
     ad_groups = db.relationship('AdGroup', backref='campaign', lazy=True, cascade='all, delete-orphan')
 
-    def to_dict(self):
-        return {
-            'id': str(self.id),
-            'name': self.name,
-            'objective': self.objective,
-            'campaign_type': self.campaign_type,
-            'daily_budget': self.daily_budget,
-            'target_cpa': self.target_cpa,
-            'bidding_strategy': self.bidding_strategy,
-            'start_date': self.start_date.isoformat() if self.start_date else None,
-            'end_date': self.end_date.isoformat() if self.end_date else None,
-            'status': self.status,
-            'google_campaign_id': self.google_campaign_id,
-            'ad_group_name': self.ad_group_name,
-            'ad_headline': self.ad_headline,
-            'ad_description': self.ad_description,
-            'asset_url': self.asset_url,
-            'created_at': self.created_at.isoformat(),
-            'ad_groups_count': len(self.ad_groups)
-        }
+    # Keyset pagination walks (created_at, id); the filtered variants let the
+    # status/objective/type filters use the same ordering without a sort step.
+    __table_args__ = (
+        db.Index('ix_campaigns_created_at_id', 'created_at', 'id'),
+        db.Index('ix_campaigns_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_campaigns_objective_created_at_id', 'objective', 'created_at', 'id'),
+        db.Index('ix_campaigns_campaign_type_created_at_id', 'campaign_type', 'created_at', 'id'),
+        # Flights starting or ending by a date, for the scheduler
+        db.Index('ix_campaigns_status_start_date', 'status', 'start_date'),
+        db.Index('ix_campaigns_status_end_date', 'status', 'end_date'),
+        # A Google Ads campaign belongs to one local campaign; NULLs (unpublished) repeat
+        db.Index('ix_campaigns_google_campaign_id', 'google_campaign_id', unique=True),
+    )
+
+    # Keys returned by to_dict, in output order. Also the whitelist for the
+    # `fields=` parameter on the campaign list endpoint.
+    SERIALIZABLE_FIELDS = (
+        'id', 'name', 'objective', 'campaign_type', 'daily_budget', 'target_cpa',
+        'bidding_strategy', 'start_date', 'end_date', 'status', 'google_campaign_id',
+        'ad_group_name', 'ad_headline', 'ad_description', 'asset_url', 'created_at',
+        'ad_groups_count'
+    )
+
+    @timed('serialize')
+    def to_dict(self, fields=None):
+        """Serialize the campaign. `fields` restricts output to the given keys,
+        so only those attributes are touched (safe with load_only/deferred columns)."""
+        result = {}
+        for field in fields or self.SERIALIZABLE_FIELDS:
+            value = getattr(self, field)
+            if field == 'id':
+                value = str(value)
+            elif field == 'ad_groups_count':
+                value = value or 0
+            elif value is not None and field in ('start_date', 'end_date', 'created_at'):
+                value = value.isoformat()
+            result[field] = value
+        return result
 
 
 class AdGroup(db.Model):
@@ -85,25 +175,243 @@ class AdGroup(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Bumped on every write; clients send it back with updates for optimistic locking
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+    # One row per keyword. `keywords` above keeps the same list rendered as text, written
+    # alongside it, so reading an ad group never has to join the keywords table.
+    keyword_items = db.relationship('Keyword', backref='ad_group', lazy=True, cascade='all, delete-orphan')
+
+    # A campaign's ad groups in creation order (read backwards for newest first), without
+    # a sort step. Also serves the Campaign.ad_groups load and cascade deletes.
+    __table_args__ = (
+        db.Index('ix_ad_groups_campaign_id_created_at_id', 'campaign_id', 'created_at', 'id'),
+    )
+
+    # Keys returned by to_dict, in output order
+    SERIALIZABLE_FIELDS = (
+        'id', 'campaign_id', 'name', 'status', 'target_audience', 'keywords', 'cpc_bid',
+        'cpm_bid', 'ad_headline', 'ad_headline_2', 'ad_headline_3', 'ad_description',
+        'ad_description_2', 'final_url', 'display_url', 'google_ad_group_id', 'created_at',
+        'updated_at', 'version'
+    )
+
+    @timed('serialize')
+    def to_dict(self, fields=None):
+        """Serialize the ad group. `fields` restricts output to the given keys."""
+        result = {}
+        for field in fields or self.SERIALIZABLE_FIELDS:
+            value = getattr(self, field)
+            if value is not None and field in ('id', 'campaign_id'):
+                value = str(value)
+            elif value is not None and field in ('created_at', 'updated_at'):
+                value = value.isoformat()
+            result[field] = value
+        return result
+
+
+class Keyword(db.Model):
+    """A single keyword of an ad group, indexed on its normalized text for lookups."""
+    __tablename__ = 'keywords'
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    ad_group_id = db.Column(UUID(as_uuid=True), db.ForeignKey('ad_groups.id'), nullable=False, index=True)
+    # Copied from the ad group so campaign-wide duplicate checks stay on one index
+    campaign_id = db.Column(UUID(as_uuid=True), db.ForeignKey('campaigns.id'), nullable=False)
+    text = db.Column(db.String(80), nullable=False)
+    normalized_text = db.Column(db.String(80), nullable=False)
+    match_type = db.Column(db.String(10), nullable=False, default="BROAD")  # BROAD, PHRASE, EXACT
+    cpc_bid = db.Column(db.Float, nullable=True)  # Overrides the ad group cpc_bid when set
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_keywords_normalized_text', 'normalized_text'),
+        db.Index('ix_keywords_campaign_id_normalized_text', 'campaign_id', 'normalized_text', 'match_type'),
+    )
+
+    SERIALIZABLE_FIELDS = ('id', 'ad_group_id', 'campaign_id', 'text', 'normalized_text', 'match_type', 'cpc_bid')
+
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'ad_group_id': str(self.ad_group_id),
+            'campaign_id': str(self.campaign_id),
+            'text': self.text,
+            'normalized_text': self.normalized_text,
+            'match_type': self.match_type,
+            'cpc_bid': self.cpc_bid
+        }
+
+
+class PublishJob(db.Model):
+    """A queued request to publish a campaign to Google Ads, drained by publish_queue workers."""
+    __tablename__ = 'publish_jobs'
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    campaign_id = db.Column(UUID(as_uuid=True), db.ForeignKey('campaigns.id'), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default="PENDING")  # PENDING, RUNNING, SUCCEEDED, FAILED
+    error = db.Column(db.Text, nullable=True)
+    google_campaign_id = db.Column(db.String(255), nullable=True)
+    # Client-supplied Idempotency-Key header; a repeated request with the same key gets this job back
+    idempotency_key = db.Column(db.String(255), nullable=True)
+    # Times the job was claimed by a worker; above 1 when it is resumed after a crash
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    # Touched by the worker as it makes progress; a RUNNING job that stops being touched was orphaned
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_publish_jobs_status_created_at', 'status', 'created_at'),
+        db.Index('ix_publish_jobs_idempotency_key', 'idempotency_key', unique=True),
+    )
 
     def to_dict(self):
         return {
             'id': str(self.id),
             'campaign_id': str(self.campaign_id),
-            'name': self.name,
             'status': self.status,
-            'target_audience': self.target_audience,
-            'keywords': self.keywords,
-            'cpc_bid': self.cpc_bid,
-            'cpm_bid': self.cpm_bid,
-            'ad_headline': self.ad_headline,
-            'ad_headline_2': self.ad_headline_2,
-            'ad_headline_3': self.ad_headline_3,
-            'ad_description': self.ad_description,
-            'ad_description_2': self.ad_description_2,
-            'final_url': self.final_url,
-            'display_url': self.display_url,
-            'google_ad_group_id': self.google_ad_group_id,
+            'error': self.error,
+            'google_campaign_id': self.google_campaign_id,
+            'attempts': self.attempts,
             'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class ScheduleRun(db.Model):
+    """One pass of the scheduler over the flights due on `as_of`, by one process. Passes
+    that found nothing to do aren't kept."""
+    __tablename__ = 'schedule_runs'
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    as_of = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="RUNNING")  # RUNNING, SUCCEEDED, FAILED
+    # Campaigns moved by this pass; failed ones stay due and are retried by the next pass
+    activated = db.Column(db.Integer, nullable=False, default=0)
+    ended = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_schedule_runs_started_at', 'started_at'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': str(self.id) if self.id else None,
+            'as_of': self.as_of.isoformat(),
+            'status': self.status,
+            'activated': self.activated,
+            'ended': self.ended,
+            'failed': self.failed,
+            'error': self.error,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class CampaignRemoteState(db.Model):
+    """A campaign's status and budget as last read from Google Ads by remote_sync."""
+    __tablename__ = 'campaign_remote_states'
+
+    campaign_id = db.Column(UUID(as_uuid=True), db.ForeignKey('campaigns.id'), primary_key=True)
+    customer_id = db.Column(db.String(20), nullable=False)
+    google_campaign_id = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.String(20), nullable=False)  # ENABLED, PAUSED, REMOVED
+    budget_amount_micros = db.Column(db.BigInteger, nullable=True)
+    synced_at = db.Column(db.DateTime, nullable=False)
+
+    def to_dict(self):
+        return {
+            'campaign_id': str(self.campaign_id),
+            'customer_id': self.customer_id,
+            'google_campaign_id': self.google_campaign_id,
+            'status': self.status,
+            'daily_budget': self.budget_amount_micros / 1000000 if self.budget_amount_micros is not None else None,
+            'synced_at': self.synced_at.isoformat()
         }
+
+
+class CampaignDailyMetric(db.Model):
+    """One day of a campaign's Google Ads metrics, upserted by remote_sync."""
+    __tablename__ = 'campaign_daily_metrics'
+
+    campaign_id = db.Column(UUID(as_uuid=True), db.ForeignKey('campaigns.id'), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    impressions = db.Column(db.BigInteger, nullable=False, default=0)
+    clicks = db.Column(db.BigInteger, nullable=False, default=0)
+    cost_micros = db.Column(db.BigInteger, nullable=False, default=0)
+    synced_at = db.Column(db.DateTime, nullable=False)
+
+    def to_dict(self):
+        return {
+            'date': self.date.isoformat(),
+            'impressions': self.impressions,
+            'clicks': self.clicks,
+            'cost': self.cost_micros / 1000000
+        }
+
+
+class SyncState(db.Model):
+    """Progress of remote_sync for one Google Ads customer."""
+    __tablename__ = 'sync_states'
+
+    customer_id = db.Column(db.String(20), primary_key=True)
+    # Last day whose metrics have been synced; incremental runs start a few days before it
+    high_water_mark = db.Column(db.Date, nullable=True)
+    # Set while a process is syncing this customer, so only one does at a time
+    running_since = db.Column(db.DateTime, nullable=True)
+    last_synced_at = db.Column(db.DateTime, nullable=True)
+    last_full_sync_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+
+    def to_dict(self):
+        return {
+            'customer_id': self.customer_id,
+            'high_water_mark': self.high_water_mark.isoformat() if self.high_water_mark else None,
+            'running': self.running_since is not None,
+            'last_synced_at': self.last_synced_at.isoformat() if self.last_synced_at else None,
+            'last_full_sync_at': self.last_full_sync_at.isoformat() if self.last_full_sync_at else None,
+            'last_error': self.last_error
+        }
+
+
+# Ad group count as a correlated COUNT subquery, loaded in the same SELECT as the
+# campaign itself so listing campaigns never touches the ad_groups relationship.
+Campaign.ad_groups_count = db.column_property(
+    select(func.count(AdGroup.id))
+    .where(AdGroup.campaign_id == Campaign.id)
+    .correlate_except(AdGroup)
+    .scalar_subquery()
+)
+
+
+class CampaignSummary(db.Model):
+    """Campaign count, daily budget and ad group count per (status, objective, bidding strategy).
+    Maintained by campaign_summary in the same transaction as every write that changes them."""
+    __tablename__ = 'campaign_summary'
+
+    status = db.Column(db.String(50), primary_key=True)
+    objective = db.Column(db.String(100), primary_key=True)
+    # 'UNSPECIFIED' for campaigns without a bidding strategy
+    bidding_strategy = db.Column(db.String(50), primary_key=True)
+    campaigns = db.Column(db.BigInteger, nullable=False, default=0)
+    daily_budget = db.Column(db.BigInteger, nullable=False, default=0)
+    ad_groups = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class CacheVersion(db.Model):
+    """Version of one response_cache scope, shared by every process serving the app.
+    Scope '*' is bumped by ResponseCache.clear() and so covers every scope."""
+    __tablename__ = 'cache_versions'
+
+    scope = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    invalidated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
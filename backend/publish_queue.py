@@ -0,0 +1,349 @@
+from flask import current_app
+from models import db, Campaign, AdGroup, PublishJob
+from google_ads_service import MAX_MUTATE_OPERATIONS, PUBLISH_RESOURCE_KEYS
+import campaign_summary
+from sqlalchemy import func, select, update
+from datetime import datetime, timedelta
+from collections import Counter
+import queue
+import threading
+import uuid
+
+# Ad groups published per page: one Mutate request's worth (an ad group and its ad each).
+# Their Google ids are committed after every page.
+AD_GROUP_PAGE_SIZE = MAX_MUTATE_OPERATIONS // 2
+
+
+class PublishQueue:
+    """
+    In-process job queue that publishes campaigns to Google Ads off the request thread.
+
+    Job state lives in the publish_jobs table; the in-memory queue only carries job ids.
+    Workers claim a job with a conditional UPDATE (PENDING -> RUNNING), so a job is run
+    at most once even when several processes re-enqueue the same pending jobs. Each
+    worker picks up to `batch_size` queued jobs at a time and publishes them with a
+    single GoogleAdsService.publish_campaigns call.
+
+    Publishing is resumable. The Google id of every resource is written to the campaign
+    (and its ad groups) as soon as the RPC creating it returns, and later attempts skip
+    the steps already done. A job orphaned by a crashed process is resumed by
+    recover_pending(); since the crash may have come between an RPC and the commit
+    recording its result, campaigns that are retried first look up what Google Ads
+    already has for them. A job whose worker hits an unexpected error (e.g. from the
+    database) is failed straight away instead, see _fail().
+    """
+
+    def __init__(self, ads_service, app=None, num_workers=4, batch_size=50, response_cache=None, stale_after=900):
+        self.app = None
+        self.ads_service = ads_service
+        self.response_cache = response_cache
+        self.num_workers = num_workers
+        self.batch_size = batch_size
+        self.stale_after = stale_after
+        self._queue = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Run jobs in `app`'s context, with its PUBLISH_* settings. Workers start with the
+        first job."""
+        self.app = app
+        self.num_workers = app.config.get('PUBLISH_WORKERS', self.num_workers)
+        self.batch_size = app.config.get('PUBLISH_BATCH_SIZE', self.batch_size)
+        self.stale_after = app.config.get('PUBLISH_JOB_STALE_AFTER', self.stale_after)
+
+    def submit(self, job_id):
+        self._ensure_started()
+        self._queue.put(job_id)
+
+    def recover_pending(self):
+        """Re-enqueue jobs left PENDING by a previous process (e.g. after a restart), along
+        with RUNNING jobs that have made no progress for `stale_after` seconds."""
+        with self.app.app_context():
+            cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+            PublishJob.query.filter(
+                PublishJob.status == 'RUNNING',
+                func.coalesce(PublishJob.heartbeat_at, PublishJob.started_at) < cutoff
+            ).update({'status': 'PENDING'}, synchronize_session=False)
+            db.session.commit()
+            job_ids = [row.id for row in db.session.query(PublishJob.id).filter_by(status='PENDING')]
+        for job_id in job_ids:
+            self.submit(job_id)
+        return len(job_ids)
+
+    def join(self):
+        """Block until every submitted job has been processed."""
+        self._queue.join()
+
+    def _ensure_started(self):
+        # Threads are started lazily so that forking servers start them in each
+        # worker process rather than losing them across fork().
+        if self._workers:
+            return
+        with self._lock:
+            if self._workers:
+                return
+            for i in range(self.num_workers):
+                worker = threading.Thread(target=self._work, name=f'publish-worker-{i}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            # Drain whatever else is already waiting so it goes out in one batched publish
+            job_ids = [self._queue.get()]
+            while len(job_ids) < self.batch_size:
+                try:
+                    job_ids.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self.app.app_context():
+                    self._run(job_ids)
+            except Exception:
+                # Only when claiming or _fail() itself failed: claimed jobs stay RUNNING until recover_pending()
+                self.app.logger.exception('Publish worker failed on jobs %s', job_ids)
+            finally:
+                for _ in job_ids:
+                    self._queue.task_done()
+
+    def _run(self, job_ids):
+        now = datetime.utcnow()
+        claimed_ids = []
+        for job_id in job_ids:
+            claimed = PublishJob.query.filter_by(id=job_id, status='PENDING').update(
+                {'status': 'RUNNING', 'started_at': now, 'heartbeat_at': now, 'attempts': PublishJob.attempts + 1},
+                synchronize_session=False
+            )
+            if claimed:
+                claimed_ids.append(job_id)
+        db.session.commit()
+        if not claimed_ids:
+            return
+
+        try:
+            self._publish(claimed_ids)
+        except Exception as e:
+            current_app.logger.exception('Publishing jobs %s failed', claimed_ids)
+            db.session.rollback()
+            self._fail(claimed_ids, e)
+
+    def _publish(self, job_ids):
+        """Publish the campaigns of jobs claimed (RUNNING) by this worker."""
+        jobs = PublishJob.query.filter(PublishJob.id.in_(job_ids)).all()
+        campaign_ids = [j.campaign_id for j in jobs]
+        campaigns = {c.id: c for c in Campaign.query.filter(Campaign.id.in_(campaign_ids))}
+        # Read now: the commits below expire the campaigns
+        loaded_statuses = {campaign_id: campaign.status for campaign_id, campaign in campaigns.items()}
+        enabled_counts = dict(
+            db.session.query(AdGroup.campaign_id, func.count(AdGroup.id))
+            .filter(AdGroup.campaign_id.in_(campaign_ids), AdGroup.status == 'ENABLED')
+            .group_by(AdGroup.campaign_id)
+        )
+        # An earlier attempt may have created resources without recording them if it was
+        # interrupted (this job resumed after a crash) or its RPC failed (a FAILED job)
+        retried = {job.campaign_id for job in jobs if job.attempts > 1}
+        retried.update(db.session.scalars(
+            select(PublishJob.campaign_id).distinct()
+            .where(PublishJob.campaign_id.in_(campaign_ids), PublishJob.status == 'FAILED')
+        ))
+
+        campaigns_data = []
+        for job in jobs:
+            campaign = campaigns[job.campaign_id]
+            campaign_data = campaign.to_dict()
+            campaign_data['enabled_ad_groups_count'] = enabled_counts.get(job.campaign_id, 0)
+            for key in PUBLISH_RESOURCE_KEYS:
+                campaign_data[key] = getattr(campaign, key)
+            campaigns_data.append(campaign_data)
+
+        try:
+            self._adopt_remote_campaigns([d for d in campaigns_data if uuid.UUID(d['id']) in retried], campaigns)
+            results = self.ads_service.publish_campaigns(campaigns_data)
+        except Exception as e:
+            db.session.rollback()
+            results = [{'error': str(e)} for _ in jobs]
+
+        # Campaigns are created paused; enable the ones whose flight has started
+        today = datetime.utcnow().date()
+        not_enabled = self._enable_campaigns([
+            result['google_campaign_id'] for job, result in zip(jobs, results)
+            if not result['error'] and campaigns[job.campaign_id].start_date <= today
+        ])
+
+        moved = {}  # status before the publish -> ids of campaigns whose status changes
+        for job, result in zip(jobs, results):
+            campaign = campaigns[job.campaign_id]
+            # Flights that haven't started, or that Google Ads didn't enable, stay paused
+            # there as SCHEDULED; the scheduler enables them from their start date
+            if result['error']:
+                new_status = 'DRAFT'
+            elif campaign.start_date > today or result['google_campaign_id'] in not_enabled:
+                new_status = 'SCHEDULED'
+            else:
+                new_status = 'PUBLISHED'
+            if loaded_statuses[job.campaign_id] != new_status:
+                moved.setdefault(loaded_statuses[job.campaign_id], []).append(job.campaign_id)
+            # Kept even when the campaign failed, so the retry builds on what exists
+            for key in PUBLISH_RESOURCE_KEYS:
+                if result.get(key):
+                    setattr(campaign, key, result[key])
+            if result['error']:
+                job.status = 'FAILED'
+                job.error = f"Google Ads API Error: {result['error']}"
+                job.finished_at = datetime.utcnow()
+                campaign.status = new_status
+                continue
+            campaign.status = new_status
+            job.google_campaign_id = result['google_campaign_id']
+            if not enabled_counts.get(job.campaign_id):
+                job.status = 'SUCCEEDED'
+                job.finished_at = datetime.utcnow()
+        for from_status, ids in moved.items():
+            campaign_summary.move_campaigns(ids, from_status)
+        # Read before the commit expires the jobs
+        ad_group_jobs = [
+            (job.id, campaign_data, result) for job, campaign_data, result in zip(jobs, campaigns_data, results)
+            if not result['error'] and campaign_data['enabled_ad_groups_count']
+        ]
+        self._invalidate(*campaign_ids)
+        db.session.commit()
+
+        # These jobs stay RUNNING until their ad groups are out, so a crash here is resumed too
+        for job_id, campaign_data, result in ad_group_jobs:
+            campaign_data['google_campaign_id'] = result['google_campaign_id']
+            try:
+                failed = self._publish_ad_groups(job_id, campaign_data, uuid.UUID(campaign_data['id']) in retried)
+            except Exception as e:
+                db.session.rollback()
+                failed = [str(e)]
+            db.session.execute(
+                update(PublishJob).where(PublishJob.id == job_id).values(
+                    status='SUCCEEDED', finished_at=datetime.utcnow(),
+                    error=f"{len(failed)} ad group(s) failed to publish: {failed[0]}" if failed else None
+                )
+            )
+            db.session.commit()
+
+    def _enable_campaigns(self, google_campaign_ids):
+        """Enable published campaigns in Google Ads. Returns the ids it did not enable."""
+        if not google_campaign_ids:
+            return set()
+        try:
+            return set(self.ads_service.set_campaign_statuses(google_campaign_ids, 'ENABLED'))
+        except Exception:
+            self.app.logger.exception('Enabling %d published campaign(s) failed', len(google_campaign_ids))
+            return set(google_campaign_ids)
+
+    def _fail(self, job_ids, error):
+        """Mark the jobs still RUNNING as FAILED after an unexpected error, and put their
+        campaigns that are still PUBLISHING back to DRAFT so they can be published again.
+        Campaigns already published keep their status (the error came while publishing
+        their ad groups)."""
+        jobs = dict(db.session.execute(
+            select(PublishJob.id, PublishJob.campaign_id).where(PublishJob.id.in_(job_ids), PublishJob.status == 'RUNNING')
+        ).all())
+        if not jobs:
+            return
+        db.session.execute(
+            update(PublishJob).where(PublishJob.id.in_(list(jobs)), PublishJob.status == 'RUNNING')
+            .values(status='FAILED', error=f'Publish failed: {error}', finished_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        reverted = db.session.scalars(
+            update(Campaign).where(Campaign.id.in_(list(jobs.values())), Campaign.status == 'PUBLISHING')
+            .values(status='DRAFT').returning(Campaign.id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        campaign_summary.move_campaigns(reverted, 'PUBLISHING')
+        self._invalidate(*jobs.values())
+        db.session.commit()
+
+    def _adopt_remote_campaigns(self, campaigns_data, campaigns):
+        """Record the Google ids of resources an earlier attempt created for these campaigns
+        but never wrote back, so publish_campaigns skips them."""
+        found = self.ads_service.find_campaign_resources(campaigns_data)
+        if not found:
+            return
+        for campaign_data in campaigns_data:
+            for key, value in found.get(campaign_data['id'], {}).items():
+                if value and not campaign_data[key]:
+                    campaign_data[key] = value
+                    setattr(campaigns[uuid.UUID(campaign_data['id'])], key, value)
+        db.session.commit()
+
+    def _publish_ad_groups(self, job_id, campaign_data, retried=False):
+        """Push the campaign's ENABLED ad groups that have no Google id yet, a page at a time,
+        committing their ids (and the job heartbeat) after every page so a resumed job only
+        sends what is left. Returns the error messages of ad groups that were rejected."""
+        campaign_id = uuid.UUID(campaign_data['id'])
+        if retried:
+            self._adopt_remote_ad_groups(campaign_id, campaign_data['google_campaign_id'])
+
+        failed = []
+        last_id = None
+        while True:
+            query = (
+                select(AdGroup)
+                .where(AdGroup.campaign_id == campaign_id, AdGroup.status == 'ENABLED', AdGroup.google_ad_group_id.is_(None))
+                .order_by(AdGroup.id)
+                .limit(AD_GROUP_PAGE_SIZE)
+            )
+            if last_id is not None:
+                # Rejected ad groups keep a NULL id; page past them
+                query = query.where(AdGroup.id > last_id)
+            rows = db.session.execute(query).scalars().all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            published = []
+            for result in self.ads_service.publish_ad_groups(campaign_data, [row.to_dict() for row in rows]):
+                if result['error']:
+                    failed.append(result['error'])
+                else:
+                    published.append({'id': uuid.UUID(result['id']), 'google_ad_group_id': result['google_ad_group_id']})
+
+            if published:
+                _record_google_ids(published)
+            last_page = len(rows) < AD_GROUP_PAGE_SIZE
+            if not last_page:
+                db.session.execute(update(PublishJob).where(PublishJob.id == job_id).values(heartbeat_at=datetime.utcnow()))
+            self._invalidate(campaign_id, *[row['id'] for row in published])
+            db.session.commit()
+            if last_page:
+                break
+        return failed
+
+    def _adopt_remote_ad_groups(self, campaign_id, google_campaign_id):
+        """Record ad groups an interrupted attempt created but never wrote back, matched
+        by name (unique within a Google Ads campaign)."""
+        remote = self.ads_service.find_ad_groups(google_campaign_id)
+        if not remote:
+            return
+        rows = db.session.execute(
+            select(AdGroup.id, AdGroup.name)
+            .where(AdGroup.campaign_id == campaign_id, AdGroup.status == 'ENABLED', AdGroup.google_ad_group_id.is_(None))
+        ).all()
+        names = Counter(row.name for row in rows)
+        adopted = [
+            {'id': row.id, 'google_ad_group_id': remote[row.name]}
+            for row in rows if row.name in remote and names[row.name] == 1
+        ]
+        if adopted:
+            _record_google_ids(adopted)
+            self._invalidate(campaign_id, *[row['id'] for row in adopted])
+            db.session.commit()
+
+    def _invalidate(self, *scopes):
+        if self.response_cache is not None:
+            self.response_cache.invalidate(*scopes)
+
+
+def _record_google_ids(rows):
+    """Write each row's google_ad_group_id ({'id', 'google_ad_group_id'} dicts) to its ad
+    group with one executemany UPDATE by primary key, bumping the version so a client
+    holding the previous one gets a 409 instead of overwriting the change."""
+    db.session.execute(update(AdGroup).values(version=AdGroup.version + 1), rows)
@@ -0,0 +1,145 @@
+import grpc
+import random
+import threading
+import time
+
+# gRPC status codes worth retrying: quota blips and transient backend failures
+RETRYABLE_STATUS_CODES = {
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.ABORTED,
+}
+RETRYABLE_QUOTA_ERRORS = {'RESOURCE_EXHAUSTED', 'RESOURCE_TEMPORARILY_EXHAUSTED'}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` tokens/sec, holding at most `capacity`."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._blocked_until = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self._clock()
+                if now >= self._blocked_until:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                else:
+                    wait = self._blocked_until - now
+            self._sleep(wait)
+
+    def block_for(self, seconds):
+        """Hold back every caller of this bucket, e.g. when the server asks us to back off."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+            self._tokens = 0
+            self._updated = self._blocked_until
+
+
+class RateLimiter:
+    """
+    Shared client-side limiter for Google Ads RPCs.
+
+    Calls are throttled by a token bucket per (customer id, service), capped at
+    `max_concurrency` in flight, and retried on quota / transient errors with full-jitter
+    exponential backoff. A server-provided retry delay takes precedence over the backoff
+    and pauses the whole bucket, not just the failing caller.
+    """
+
+    def __init__(self, qps=10, burst=20, max_concurrency=8, max_retries=5,
+                 backoff_base=1.0, backoff_max=60.0, clock=time.monotonic, sleep=time.sleep):
+        self.qps = qps
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    @classmethod
+    def from_config(cls, config, processes=1):
+        """The limiter for one of `processes` processes sharing app.config's GOOGLE_ADS_* limits:
+        each gets an equal share of the rate, burst and concurrency (at least 1 of the latter two)."""
+        return cls(
+            qps=config['GOOGLE_ADS_RATE_LIMIT_QPS'] / processes,
+            burst=max(1, config['GOOGLE_ADS_RATE_LIMIT_BURST'] // processes),
+            max_concurrency=max(1, config['GOOGLE_ADS_MAX_CONCURRENT_REQUESTS'] // processes),
+            max_retries=config['GOOGLE_ADS_MAX_RETRIES'],
+            backoff_base=config['GOOGLE_ADS_BACKOFF_BASE'],
+            backoff_max=config['GOOGLE_ADS_BACKOFF_MAX'],
+        )
+
+    def bucket(self, customer_id, service_name):
+        key = (customer_id, service_name)
+        with self._buckets_lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(self.qps, self.burst, clock=self._clock, sleep=self._sleep)
+            return self._buckets[key]
+
+    def call(self, customer_id, service_name, fn, /, *args, **kwargs):
+        bucket = self.bucket(customer_id, service_name)
+        attempt = 0
+        while True:
+            bucket.acquire()
+            with self._semaphore:
+                try:
+                    return fn(*args, **kwargs)
+                except Exception as ex:
+                    retryable, retry_delay = classify_error(ex)
+                    if not retryable or attempt >= self.max_retries:
+                        raise
+                    # A hint longer than our cap means a daily quota, not a blip
+                    if retry_delay is not None and retry_delay > self.backoff_max:
+                        raise
+
+            if retry_delay is not None:
+                bucket.block_for(retry_delay)
+                delay = retry_delay
+            else:
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            print(f"Retrying {service_name} call for customer {customer_id} in {delay:.2f}s "
+                  f"(attempt {attempt + 1}/{self.max_retries})")
+            self._sleep(delay)
+            attempt += 1
+
+
+def classify_error(ex):
+    """Returns (retryable, retry_delay_seconds or None) for an exception raised by an RPC."""
+    # Imported here to keep google-ads off the app's import path
+    from google.ads.googleads.errors import GoogleAdsException
+
+    if isinstance(ex, GoogleAdsException):
+        retry_delay = None
+        retryable = ex.error.code() in RETRYABLE_STATUS_CODES
+        for error in ex.failure.errors:
+            quota_error = getattr(error.error_code.quota_error, 'name', '')
+            internal_error = getattr(error.error_code.internal_error, 'name', '')
+            if quota_error in RETRYABLE_QUOTA_ERRORS or internal_error == 'TRANSIENT_ERROR':
+                retryable = True
+            hint = error.details.quota_error_details.retry_delay
+            # proto-plus surfaces Duration fields as timedelta
+            delay = hint.total_seconds() if hasattr(hint, 'total_seconds') else hint.seconds + hint.nanos / 1e9
+            if delay > 0:
+                retry_delay = max(retry_delay or 0, delay)
+        return retryable, retry_delay
+
+    if isinstance(ex, grpc.RpcError) and callable(getattr(ex, 'code', None)):
+        return ex.code() in RETRYABLE_STATUS_CODES, None
+
+    return False, None
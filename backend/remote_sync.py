@@ -0,0 +1,201 @@
+from models import db, upsert, Campaign, CampaignRemoteState, CampaignDailyMetric, SyncState
+from sqlalchemy import or_, select, update
+from datetime import date, datetime, timedelta
+import threading
+import time
+import traceback
+
+# A claim older than this belongs to a process that died mid-sync
+CLAIM_TIMEOUT = timedelta(hours=1)
+
+
+class RemoteSync:
+    """
+    Pulls campaign status, budget and daily metrics from Google Ads into
+    campaign_remote_states and campaign_daily_metrics.
+
+    A run reads two kinds of SearchStream queries per customer: one row per campaign for
+    status and budget, and one row per campaign and day with traffic for metrics
+    (date-segmented rows only exist for days with traffic, so they can't carry the status
+    of idle campaigns). Each is paged, by campaign id and by day, so the rows buffered
+    per stream stay bounded. Rows are upserted in chunks of `batch_size` as they come.
+
+    Metrics sync incrementally. The customer's sync_states row keeps the last day synced
+    (the high-water mark), and the next run starts `lookback_days` before it because
+    Google Ads keeps revising recent days. A full sync, or the first one for a customer,
+    goes back `initial_days`. The sync_states row is also claimed with a conditional
+    UPDATE, so one process syncs a customer at a time.
+    """
+
+    def __init__(self, ads_service, app=None, interval=0, batch_size=1000, lookback_days=3, initial_days=90):
+        self.app = None
+        self.ads_service = ads_service
+        self.interval = interval
+        self.batch_size = batch_size
+        self.lookback_days = lookback_days
+        self.initial_days = initial_days
+        self._thread = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Sync within `app`'s context, with its REMOTE_SYNC_* settings. Nothing runs until
+        start() or run()."""
+        self.app = app
+        self.interval = app.config.get('REMOTE_SYNC_INTERVAL', self.interval)
+        self.batch_size = app.config.get('REMOTE_SYNC_BATCH_SIZE', self.batch_size)
+        self.lookback_days = app.config.get('REMOTE_SYNC_LOOKBACK_DAYS', self.lookback_days)
+        self.initial_days = app.config.get('REMOTE_SYNC_INITIAL_DAYS', self.initial_days)
+
+    def start(self):
+        """Sync every `interval` seconds from a background thread (no-op when interval is 0)."""
+        if self.interval <= 0 or self._thread:
+            return
+        with self._lock:
+            if self._thread:
+                return
+            self._thread = threading.Thread(target=self._loop, name='remote-sync', daemon=True)
+            self._thread.start()
+
+    def run_in_background(self, full=False):
+        threading.Thread(target=self._run_logged, args=(full,), name='remote-sync-once', daemon=True).start()
+
+    def run(self, full=False):
+        """Sync every customer once. Returns one stats dict per customer synced by this call."""
+        with self.app.app_context():
+            results = []
+            for customer_id in self.customer_ids():
+                result = self.sync_customer(customer_id, full)
+                if result is not None:
+                    results.append(result)
+            return results
+
+    def customer_ids(self):
+        # Every campaign is published to the one configured account
+        return [self.ads_service.customer_id] if self.ads_service.customer_id else []
+
+    def sync_customer(self, customer_id, full=False):
+        """
+        Sync one customer, unless another process is already on it (then returns None).
+        Returns {'customer_id', 'full', 'start_date', 'end_date', 'states', 'metrics', 'seconds'}.
+        """
+        state = self._claim(customer_id)
+        if state is None:
+            return None
+
+        started = time.perf_counter()
+        today = date.today()
+        full = full or state.high_water_mark is None
+        if full:
+            start_date = today - timedelta(days=self.initial_days)
+        else:
+            start_date = min(state.high_water_mark, today) - timedelta(days=self.lookback_days)
+        try:
+            campaign_ids = dict(db.session.execute(
+                select(Campaign.google_campaign_id, Campaign.id).where(Campaign.google_campaign_id.isnot(None))
+            ).all())
+            states = self._sync_states(customer_id, campaign_ids)
+            metrics = self._sync_metrics(campaign_ids, start_date, today)
+        except Exception as e:
+            db.session.rollback()
+            self._release(customer_id, last_error=str(e))
+            raise
+
+        now = datetime.utcnow()
+        values = {'high_water_mark': today, 'last_synced_at': now, 'last_error': None}
+        if full:
+            values['last_full_sync_at'] = now
+        self._release(customer_id, **values)
+        return {
+            'customer_id': customer_id,
+            'full': full,
+            'start_date': start_date.isoformat(),
+            'end_date': today.isoformat(),
+            'states': states,
+            'metrics': metrics,
+            'seconds': round(time.perf_counter() - started, 3),
+        }
+
+    def _sync_states(self, customer_id, campaign_ids):
+        now = datetime.utcnow()
+        count = 0
+        batch = []
+        for google_campaign_id, status, budget_amount_micros in self.ads_service.stream_campaign_states():
+            campaign_id = campaign_ids.get(google_campaign_id)
+            if campaign_id is None:
+                # Not created by us
+                continue
+            batch.append({
+                'campaign_id': campaign_id,
+                'customer_id': customer_id,
+                'google_campaign_id': google_campaign_id,
+                'status': status,
+                'budget_amount_micros': budget_amount_micros,
+                'synced_at': now,
+            })
+            if len(batch) >= self.batch_size:
+                count += self._flush(CampaignRemoteState, batch, ['campaign_id'])
+        return count + self._flush(CampaignRemoteState, batch, ['campaign_id'])
+
+    def _sync_metrics(self, campaign_ids, start_date, end_date):
+        now = datetime.utcnow()
+        count = 0
+        batch = []
+        for google_campaign_id, day, impressions, clicks, cost_micros in self.ads_service.stream_campaign_metrics(start_date, end_date):
+            campaign_id = campaign_ids.get(google_campaign_id)
+            if campaign_id is None:
+                continue
+            batch.append({
+                'campaign_id': campaign_id,
+                'date': date.fromisoformat(day),
+                'impressions': impressions,
+                'clicks': clicks,
+                'cost_micros': cost_micros,
+                'synced_at': now,
+            })
+            if len(batch) >= self.batch_size:
+                count += self._flush(CampaignDailyMetric, batch, ['campaign_id', 'date'])
+        return count + self._flush(CampaignDailyMetric, batch, ['campaign_id', 'date'])
+
+    def _flush(self, model, batch, key_columns):
+        """Upsert and commit the batch, then empty it. Returns the number of rows written."""
+        count = len(batch)
+        upsert(model, batch, key_columns)
+        db.session.commit()
+        batch.clear()
+        return count
+
+    def _claim(self, customer_id):
+        """Mark the customer's sync as running; None if another process holds it."""
+        upsert(SyncState, [{'customer_id': customer_id}], ['customer_id'], update_columns=())
+        now = datetime.utcnow()
+        claimed = db.session.execute(
+            update(SyncState)
+            .where(SyncState.customer_id == customer_id,
+                   or_(SyncState.running_since.is_(None), SyncState.running_since < now - CLAIM_TIMEOUT))
+            .values(running_since=now)
+        ).rowcount
+        db.session.commit()
+        if not claimed:
+            return None
+        return db.session.get(SyncState, customer_id)
+
+    def _release(self, customer_id, **values):
+        db.session.execute(
+            update(SyncState).where(SyncState.customer_id == customer_id).values(running_since=None, **values)
+        )
+        db.session.commit()
+
+    def _run_logged(self, full=False):
+        try:
+            for result in self.run(full):
+                print(f"Synced customer {result['customer_id']}: {result['states']} campaign states, "
+                      f"{result['metrics']} daily metric rows in {result['seconds']}s")
+        except Exception:
+            print(traceback.format_exc())
+
+    def _loop(self):
+        while True:
+            self._run_logged()
+            time.sleep(self.interval)
@@ -0,0 +1,153 @@
+from flask import current_app, g, request
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from models import db
+import functools
+import itertools
+import threading
+import time
+
+# Set for PIN_SECONDS after a client's successful write; its reads go to the primary meanwhile
+PIN_COOKIE = 'db_primary_until'
+# Response header of read-only requests naming the database that served them
+ROUTE_HEADER = 'X-Database'
+# Methods that don't write, so don't pin the client
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Seconds a PostgreSQL replica is behind the primary (0 when it has replayed all it received)
+POSTGRESQL_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def read_only(view):
+    """Mark a view as safe to serve from a read replica: it must not write."""
+    view.read_only = True
+    return view
+
+
+def pinned():
+    """Whether this request's client wrote recently, so must read its own writes."""
+    return g.get('db_pinned', False)
+
+
+def from_replica():
+    """Whether this request's reads are served by a read replica, so may predate recent writes."""
+    return g.get('db_route', 'primary') != 'primary'
+
+
+class ReplicaRouter:
+    """
+    Sends the queries of read-only views (see read_only()) to the read replicas
+    configured as DATABASE_REPLICA_URLS (the `replica_<n>` binds), round robin, and
+    everything else to the primary.
+
+    - Read-your-writes: any successful write request sets a cookie that sends the same client's
+      reads to the primary for `pin_seconds`, longer than the replicas usually lag.
+    - Failover: a replica is picked at the start of the request by checking out a
+      connection from it. If that fails, or the replica disconnects later, it is
+      skipped for `retry_seconds` and the next one (or the primary) serves the request.
+      PostgreSQL replicas more than `max_lag_seconds` behind are skipped too; their lag
+      is checked at most every `check_interval` seconds.
+
+    Routing happens in the session (see RoutingSession in models.py): every statement
+    of a read-only request goes to its replica, except flushes and INSERT / UPDATE /
+    DELETE statements, which always go to the primary. Background threads and CLI
+    commands always use the primary.
+    """
+
+    def __init__(self, app=None, pin_seconds=5, retry_seconds=30, max_lag_seconds=5, check_interval=5):
+        self.bind_keys = ()
+        self.pin_seconds = pin_seconds
+        self.retry_seconds = retry_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._rotation = itertools.count()
+        self._unhealthy_until = {}
+        self._checked_at = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Route `app`'s read-only requests to its replica binds, with its REPLICA_* settings.
+        Must run after db.init_app(app). No-op without replicas."""
+        self.pin_seconds = app.config.get('REPLICA_PIN_SECONDS', self.pin_seconds)
+        self.retry_seconds = app.config.get('REPLICA_RETRY_SECONDS', self.retry_seconds)
+        self.max_lag_seconds = app.config.get('REPLICA_MAX_LAG_SECONDS', self.max_lag_seconds)
+        self.check_interval = app.config.get('REPLICA_CHECK_INTERVAL', self.check_interval)
+        self.bind_keys = tuple(sorted(key for key in app.config.get('SQLALCHEMY_BINDS', {}) if key.startswith('replica_')))
+        if not self.bind_keys:
+            return
+        with app.app_context():
+            for key in self.bind_keys:
+                event.listen(db.engines[key], 'handle_error', functools.partial(self._on_error, key))
+        app.before_request(self._route)
+        app.after_request(self._after_request)
+
+    def health(self):
+        """{bind key: seconds until an unhealthy replica is tried again, 0 when healthy}"""
+        now = time.monotonic()
+        with self._lock:
+            return {key: round(max(0.0, self._unhealthy_until.get(key, 0) - now), 1) for key in self.bind_keys}
+
+    def _route(self):
+        view = current_app.view_functions.get(request.endpoint)
+        if not getattr(view, 'read_only', False):
+            return
+        g.db_route = 'primary'
+        pinned_until = request.cookies.get(PIN_COOKIE, '')
+        if pinned_until.isdigit() and int(pinned_until) > time.time():
+            g.db_pinned = True
+            return
+        for key in self._candidates():
+            g.db_read_engine = db.engines[key]
+            try:
+                # Checks out the replica connection the whole request will use
+                connection = db.session.connection()
+                if self._lagging(key, connection):
+                    raise LookupError(f'{key} is more than {self.max_lag_seconds}s behind the primary')
+                g.db_route = key
+                return
+            except (DBAPIError, LookupError) as e:
+                db.session.rollback()
+                g.pop('db_read_engine')
+                self._mark_unhealthy(key, e)
+
+    def _after_request(self, response):
+        if request.method not in SAFE_METHODS:
+            # Rejected or failed writes changed nothing to read back
+            if response.status_code < 400:
+                response.set_cookie(PIN_COOKIE, str(int(time.time() + self.pin_seconds)), max_age=self.pin_seconds,
+                                    httponly=True, samesite='Lax')
+        elif 'db_route' in g:
+            response.headers[ROUTE_HEADER] = g.db_route
+        return response
+
+    def _candidates(self):
+        """Healthy replicas, starting from the next one in the rotation."""
+        offset = next(self._rotation) % len(self.bind_keys)
+        now = time.monotonic()
+        with self._lock:
+            return [key for key in self.bind_keys[offset:] + self.bind_keys[:offset]
+                    if self._unhealthy_until.get(key, 0) <= now]
+
+    def _lagging(self, key, connection):
+        if not self.max_lag_seconds or connection.dialect.name != 'postgresql':
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at.get(key, float('-inf')) < self.check_interval:
+                return False
+            self._checked_at[key] = now
+        return connection.execute(POSTGRESQL_LAG_QUERY).scalar() > self.max_lag_seconds
+
+    def _mark_unhealthy(self, key, error):
+        with self._lock:
+            self._unhealthy_until[key] = time.monotonic() + self.retry_seconds
+        print(f'Replica {key} unhealthy, skipped for {self.retry_seconds}s: {error}')
+
+    def _on_error(self, key, context):
+        if context.is_disconnect:
+            self._mark_unhealthy(key, context.original_exception)
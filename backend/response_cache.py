@@ -0,0 +1,105 @@
+from cachetools import TTLCache
+from datetime import datetime, timedelta
+from models import db, upsert, CacheVersion
+from sqlalchemy import select
+import hashlib
+import threading
+
+# cache_versions row bumped by clear(), covering every scope
+ALL_SCOPES = '*'
+
+
+class ResponseCache:
+    """
+    In-process LRU + TTL cache of serialized JSON responses with strong ETags.
+
+    Entries are grouped by scope (a campaign or ad group id). Each scope carries a version,
+    kept in the cache_versions table so every worker process sees it, that write paths bump
+    through invalidate() in the transaction of the write itself. Lookups read the scope's version (one
+    primary key query, always on the primary database) and entries are stored under the
+    version read before their data was, so a response built concurrently with a write is
+    never served after it, by this process or any other.
+
+    Data read from a read replica may predate a write the primary already has, so callers
+    pass `settle_seconds` for such reads: they are only stored once the scope has gone that
+    long without an invalidation.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def init_app(self, app):
+        """Resize to app.config's RESPONSE_CACHE_MAXSIZE / RESPONSE_CACHE_TTL (empties the cache)."""
+        maxsize = app.config.get('RESPONSE_CACHE_MAXSIZE', self._entries.maxsize)
+        ttl = app.config.get('RESPONSE_CACHE_TTL', self._entries.ttl)
+        with self._lock:
+            self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get_or_build(self, scope, key, build, dumps, refresh=False, settle_seconds=0):
+        """Returns (body, etag) for `key` within `scope`, calling build() and dumps() on a miss.
+        With `refresh`, always builds (and stores the result), for callers that must see
+        their own writes even if an older entry was stored after them. With `settle_seconds`,
+        the result is only stored if the scope was last invalidated at least that long ago."""
+        scope = str(scope)
+        version, invalidated_at = self._version(scope)
+        with self._lock:
+            entry = None if refresh else self._entries.get((scope, key, version))
+            if entry is not None:
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        body = dumps(build())
+        entry = (body, hashlib.sha1(body.encode()).hexdigest())
+        # A write that lands while we build bumps the version, so this entry is never looked up
+        if not settle_seconds or invalidated_at is None or datetime.utcnow() - invalidated_at >= timedelta(seconds=settle_seconds):
+            with self._lock:
+                self._entries[(scope, key, version)] = entry
+        return entry
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def invalidate(self, *scopes):
+        """Bump the versions of `scopes` in the current transaction: every process sees the
+        new versions when, and only when, the write that called this commits."""
+        now = datetime.utcnow()
+        # Sorted, so concurrent invalidations lock the rows in the same order
+        rows = [{'scope': scope, 'version': 1, 'invalidated_at': now} for scope in sorted({str(scope) for scope in scopes})]
+        upsert(CacheVersion, rows, ['scope'], increment=('version',))
+
+    def clear(self):
+        """Drop everything, for writes whose affected scopes aren't known (e.g. filtered bulk updates)."""
+        self.invalidate(ALL_SCOPES)
+        with self._lock:
+            self._entries.clear()
+
+    def _version(self, scope):
+        """((version of every scope, version of `scope`), when either was last bumped or None)"""
+        rows = db.session.execute(
+            select(CacheVersion.scope, CacheVersion.version, CacheVersion.invalidated_at)
+            .where(CacheVersion.scope.in_((ALL_SCOPES, scope))),
+            # The primary: a lagging replica would hand back versions older than the data
+            bind_arguments={'bind': db.engine}
+        ).all()
+        versions = {row.scope: row.version for row in rows}
+        invalidated_at = max((row.invalidated_at for row in rows), default=None)
+        return (versions.get(ALL_SCOPES, 0), versions.get(scope, 0)), invalidated_at
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self._entries.maxsize,
+                'ttl': self._entries.ttl
+            }
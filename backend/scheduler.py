@@ -0,0 +1,263 @@
+from models import db, Campaign, ScheduleRun
+from sqlalchemy import or_, select, tuple_, update
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, deque
+from datetime import datetime, timedelta
+import campaign_summary
+import threading
+import time
+import traceback
+
+# (counter, from status, date column, to status, Google Ads status or None when the remote
+# campaign is already paused), applied in this order. Ending goes first so a flight that
+# was over before it could start never gets enabled. Published campaigns waiting for their
+# start date, or that Google Ads didn't enable when they were published, are SCHEDULED
+# (and PAUSED in Google Ads); see publish_queue.
+TRANSITIONS = (
+    ('ended', 'PUBLISHED', 'end_date', 'ENDED', 'PAUSED'),
+    ('ended', 'PAUSED', 'end_date', 'ENDED', None),
+    ('ended', 'SCHEDULED', 'end_date', 'ENDED', None),
+    ('activated', 'SCHEDULED', 'start_date', 'PUBLISHED', 'ENABLED'),
+)
+# Campaign errors kept in a run's `error` (the count is in `failed`)
+MAX_RECORDED_ERRORS = 5
+# A claim older than this belongs to a pass that died between claiming a batch and
+# writing it back (well over a mutate with every retry and backoff)
+CLAIM_TIMEOUT = timedelta(minutes=15)
+
+
+def is_due(date_column, as_of):
+    """Flights start on their start_date and end after their end_date."""
+    column = getattr(Campaign, date_column)
+    return column <= as_of if date_column == 'start_date' else column < as_of
+
+
+class Scheduler:
+    """
+    Starts and ends campaign flights on their dates: SCHEDULED campaigns are enabled in
+    Google Ads once their start_date comes, and campaigns whose end_date has passed are
+    paused there and marked ENDED.
+
+    Every `interval` seconds a pass walks the due campaigns of each transition with the
+    (status, date) indexes, `batch_size` at a time, and hands the batches to a pool of
+    `concurrency` threads. Each batch takes two short transactions around its Google Ads
+    mutate, so no row lock is held during the RPC: the rows still due are claimed
+    (locked FOR UPDATE SKIP LOCKED on PostgreSQL just long enough to set
+    schedule_claimed_at) and committed, Google Ads is updated with one multi-operation
+    mutate, and then only the campaigns Google Ads accepted change status, releasing
+    every claim. Passes in several processes or on several nodes therefore split the
+    work instead of repeating it: rows another pass has claimed are skipped, and rows
+    found already moved are left alone. Campaigns Google Ads rejects stay due and are
+    retried by the next pass; claims of a pass that died expire after CLAIM_TIMEOUT.
+
+    Only passes that find due campaigns are recorded in schedule_runs, and of those
+    only the ones that moved or failed a campaign are kept.
+    """
+
+    def __init__(self, ads_service, app=None, interval=0, batch_size=1000, concurrency=4, response_cache=None):
+        self.app = None
+        self.ads_service = ads_service
+        self.response_cache = response_cache
+        self.interval = interval
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self._thread = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Run within `app`'s context, with its SCHEDULER_* settings. Nothing runs until
+        start() or run()."""
+        self.app = app
+        self.interval = app.config.get('SCHEDULER_INTERVAL', self.interval)
+        self.batch_size = app.config.get('SCHEDULER_BATCH_SIZE', self.batch_size)
+        self.concurrency = app.config.get('SCHEDULER_CONCURRENCY', self.concurrency)
+
+    def start(self):
+        """Run a pass every `interval` seconds from a background thread (no-op when interval is 0)."""
+        if self.interval <= 0 or self._thread:
+            return
+        with self._lock:
+            if self._thread:
+                return
+            self._thread = threading.Thread(target=self._loop, name='scheduler', daemon=True)
+            self._thread.start()
+
+    def run_in_background(self):
+        threading.Thread(target=self._run_logged, name='scheduler-once', daemon=True).start()
+
+    def run(self, as_of=None):
+        """Apply every transition due on `as_of` (default today, UTC). Returns the run as a dict."""
+        as_of = as_of or datetime.utcnow().date()
+        with self.app.app_context():
+            started_at = datetime.utcnow()
+            if not self._has_due_work(as_of):
+                # Every process passes every interval; don't write a run row for nothing
+                return ScheduleRun(as_of=as_of, status='SUCCEEDED', activated=0, ended=0, failed=0,
+                                   started_at=started_at, finished_at=datetime.utcnow()).to_dict()
+            run = ScheduleRun(as_of=as_of, status='RUNNING', started_at=started_at)
+            db.session.add(run)
+            db.session.commit()
+            run_id = run.id
+
+            counts = Counter()
+            errors = []
+            status, error = 'SUCCEEDED', None
+            try:
+                with ThreadPoolExecutor(self.concurrency, thread_name_prefix='scheduler-batch') as executor:
+                    for transition in TRANSITIONS:
+                        self._apply(executor, transition, as_of, counts, errors)
+            except Exception as e:
+                print(traceback.format_exc())
+                status, error = 'FAILED', str(e)
+            db.session.rollback()
+            if errors and error is None:
+                error = f"{counts['failed']} campaign(s) failed: " + '; '.join(errors)
+
+            run = db.session.get(ScheduleRun, run_id)
+            run.status = status
+            run.activated = counts['activated']
+            run.ended = counts['ended']
+            run.failed = counts['failed']
+            run.error = error
+            run.finished_at = datetime.utcnow()
+            result = run.to_dict()
+            if status == 'SUCCEEDED' and not (run.activated or run.ended or run.failed):
+                # Another pass took the due work; only keep the passes that did something
+                db.session.delete(run)
+            db.session.commit()
+            return result
+
+    @staticmethod
+    def _has_due_work(as_of):
+        """Whether any campaign is due for a transition, from one indexed probe per transition."""
+        try:
+            return any(
+                db.session.scalar(
+                    select(Campaign.id).where(Campaign.status == from_status, is_due(date_column, as_of)).limit(1)
+                ) is not None
+                for _, from_status, date_column, _, _ in TRANSITIONS
+            )
+        finally:
+            db.session.rollback()
+
+    def _apply(self, executor, transition, as_of, counts, errors):
+        """Walk the campaigns due for `transition` on keyset pages and apply each page in the
+        pool, keeping at most two batches per thread in flight."""
+        _, from_status, date_column, _, _ = transition
+        column = getattr(Campaign, date_column)
+        query = (
+            select(column, Campaign.id)
+            .where(Campaign.status == from_status, is_due(date_column, as_of))
+            .order_by(column, Campaign.id)
+            .limit(self.batch_size)
+        )
+        pending = deque()
+        last = None
+        while True:
+            page = db.session.execute(query if last is None else query.where(tuple_(column, Campaign.id) > last)).all()
+            # Don't hold a snapshot (or locks) while the pool works
+            db.session.rollback()
+            if not page:
+                break
+            last = tuple(page[-1])
+            pending.append(executor.submit(self._apply_batch, transition, [row.id for row in page], as_of))
+            while len(pending) >= self.concurrency * 2:
+                self._collect(pending.popleft(), counts, errors)
+        while pending:
+            self._collect(pending.popleft(), counts, errors)
+
+    def _apply_batch(self, transition, campaign_ids, as_of):
+        """Move the campaigns of one batch that are still due. Returns (counter, moved, failed, errors)."""
+        counter, from_status, date_column, to_status, remote_status = transition
+        with self.app.app_context():
+            claimed_at = datetime.utcnow()
+            claimed_ids = []
+            try:
+                rows = db.session.execute(
+                    select(Campaign.id, Campaign.google_campaign_id)
+                    .where(Campaign.id.in_(campaign_ids), Campaign.status == from_status, is_due(date_column, as_of),
+                           or_(Campaign.schedule_claimed_at.is_(None),
+                               Campaign.schedule_claimed_at < claimed_at - CLAIM_TIMEOUT))
+                    .with_for_update(skip_locked=True)
+                ).all()
+                if not rows:
+                    db.session.rollback()
+                    return counter, 0, 0, []
+                claimed_ids = [row.id for row in rows]
+                db.session.execute(
+                    update(Campaign).where(Campaign.id.in_(claimed_ids)).values(schedule_claimed_at=claimed_at)
+                )
+                db.session.commit()
+
+                # No transaction (or lock) is open during the RPC
+                remote_ids = [row.google_campaign_id for row in rows if row.google_campaign_id]
+                remote_errors = {}
+                if remote_status and remote_ids:
+                    remote_errors = self.ads_service.set_campaign_statuses(remote_ids, remote_status)
+                accepted = [row.id for row in rows if row.google_campaign_id not in remote_errors]
+
+                moved = []
+                if accepted:
+                    moved = db.session.scalars(
+                        update(Campaign)
+                        .where(Campaign.id.in_(accepted), Campaign.schedule_claimed_at == claimed_at,
+                               Campaign.status == from_status, is_due(date_column, as_of))
+                        .values(status=to_status, schedule_claimed_at=None)
+                        .returning(Campaign.id)
+                    ).all()
+                if moved:
+                    campaign_summary.move_campaigns(moved, from_status)
+                    if self.response_cache is not None:
+                        self.response_cache.invalidate(*moved)
+                # The rest (rejected by Google Ads, or changed meanwhile) stay as they are
+                self._release(claimed_ids, claimed_at)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(traceback.format_exc())
+                if claimed_ids:
+                    self._release_after_error(claimed_ids, claimed_at)
+                return counter, 0, len(campaign_ids), [f'{from_status} -> {to_status} batch: {e}']
+            errors = [f'{google_id}: {message}' for google_id, message in remote_errors.items()]
+            return counter, len(moved), len(remote_errors), errors
+
+    @staticmethod
+    def _release(campaign_ids, claimed_at):
+        """Clear this batch's claims that are still held (the caller commits)."""
+        db.session.execute(
+            update(Campaign)
+            .where(Campaign.id.in_(campaign_ids), Campaign.schedule_claimed_at == claimed_at)
+            .values(schedule_claimed_at=None)
+        )
+
+    def _release_after_error(self, campaign_ids, claimed_at):
+        """Best effort: claims left behind expire after CLAIM_TIMEOUT anyway."""
+        try:
+            self._release(campaign_ids, claimed_at)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            print(traceback.format_exc())
+
+    @staticmethod
+    def _collect(future, counts, errors):
+        counter, moved, failed, batch_errors = future.result()
+        counts[counter] += moved
+        counts['failed'] += failed
+        errors.extend(batch_errors[:max(0, MAX_RECORDED_ERRORS - len(errors))])
+
+    def _run_logged(self):
+        try:
+            result = self.run()
+            if result['activated'] or result['ended'] or result['failed']:
+                print(f"Scheduler: {result['activated']} activated, {result['ended']} ended, "
+                      f"{result['failed']} failed for {result['as_of']}")
+        except Exception:
+            print(traceback.format_exc())
+
+    def _loop(self):
+        while True:
+            self._run_logged()
+            time.sleep(self.interval)
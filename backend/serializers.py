@@ -0,0 +1,114 @@
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import select
+from instrumentation import timed
+from datetime import date
+import csv
+import io
+import uuid
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib json module
+    orjson = None
+
+
+# ============================================
+# JSON PROVIDER
+# ============================================
+
+def _default(o):
+    # Same wire format as to_dict() and orjson: ISO 8601 dates, UUIDs as strings
+    if isinstance(o, date):
+        return o.isoformat()
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes with orjson when it is installed and the stdlib json
+    module otherwise. Both paths serialize UUID, date and datetime values natively, so
+    handlers can return raw row values without converting each one in Python.
+    """
+
+    default = staticmethod(_default)
+
+    @timed('serialize')
+    def dumps(self, obj, **kwargs):
+        option = self._orjson_option(**kwargs)
+        if option is None:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """jsonify(): the body straight from orjson's bytes, indented like Flask's in debug
+        mode (or with compact=False) and compact otherwise."""
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        option = self._orjson_option(indent=2 if pretty else None) | orjson.OPT_APPEND_NEWLINE
+        return self._app.response_class(self._dumps_bytes(obj, option), mimetype=self.mimetype)
+
+    @timed('serialize')
+    def _dumps_bytes(self, obj, option):
+        return orjson.dumps(obj, default=_default, option=option)
+
+    def _orjson_option(self, indent=None, separators=None, **kwargs):
+        """orjson options giving the same document as json.dumps(**kwargs), or None when
+        orjson can't: it isn't installed, or kwargs ask for other formatting."""
+        if orjson is None or kwargs or indent not in (None, 2) or separators not in (None, (',', ':')):
+            return None
+        return orjson.OPT_SORT_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+
+
+# ============================================
+# ROW SERIALIZATION
+# ============================================
+
+def select_fields(model, fields=None):
+    """SELECT of just the columns behind `fields` (default: all of model.SERIALIZABLE_FIELDS),
+    so rows come back as tuples instead of full ORM instances."""
+    return select(*[getattr(model, field) for field in fields or model.SERIALIZABLE_FIELDS])
+
+
+@timed('serialize')
+def rows_to_dicts(rows, fields):
+    """Zip row tuples from select_fields() into dicts. Values are left as-is for the JSON provider."""
+    return [dict(zip(fields, row)) for row in rows]
+
+
+# ============================================
+# STREAMING EXPORT
+# ============================================
+
+def iter_ndjson(rows, fields, dumps):
+    """One JSON object per line for each row tuple."""
+    for row in rows:
+        yield dumps(dict(zip(fields, row))) + '\n'
+
+
+def iter_csv(rows, fields, batch_size=1000):
+    """CSV with a header line, emitted in blocks of `batch_size` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for index, row in enumerate(rows, 1):
+        writer.writerow([_csv_value(value) for value in row])
+        if index % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _csv_value(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
@@ -0,0 +1,52 @@
+"""
+Fixtures for the backend tests: the app on a fresh SQLite database per test, with Google
+Ads in mock mode and no background workers running.
+
+    cd backend && python -m pytest
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Config reads the environment when it is imported, so this must come first
+DATABASE_PATH = os.path.join(tempfile.mkdtemp(prefix='campaign-manager-tests-'), 'test.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DATABASE_PATH}'
+os.environ['DATABASE_REPLICA_URLS'] = ''
+
+from app import create_app  # noqa: E402
+from extensions import response_cache  # noqa: E402
+from models import db  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        response_cache.clear()
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def statements(app):
+    """SQL statements sent to the database, appended as they are executed."""
+    executed = []
+
+    def record(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(db.engine, 'before_cursor_execute', record)
@@ -0,0 +1,77 @@
+from models import db, AdGroup
+import uuid
+
+
+def create_ad_groups(client, count):
+    campaign_id = client.post('/api/campaigns', json={
+        'name': 'Campaign', 'objective': 'Sales', 'daily_budget': 100,
+        'start_date': '2026-01-01', 'end_date': '2026-02-01',
+    }).get_json()['id']
+    return [client.post(f'/api/campaigns/{campaign_id}/ad-groups', json={'name': f'Ad group {index}'}).get_json()
+            for index in range(count)]
+
+
+def stored(ad_group_id):
+    db.session.expire_all()
+    ad_group = db.session.get(AdGroup, uuid.UUID(ad_group_id))
+    return ad_group.name, ad_group.version
+
+
+def test_update_with_the_version_last_read_bumps_it(client):
+    ad_group, = create_ad_groups(client, 1)
+
+    response = client.put(f"/api/ad-groups/{ad_group['id']}", json={'name': 'Renamed', 'version': ad_group['version']})
+    assert response.status_code == 200
+    assert response.get_json()['version'] == ad_group['version'] + 1
+    assert stored(ad_group['id']) == ('Renamed', ad_group['version'] + 1)
+
+    # Without a version the write is unconditional, and still bumps it
+    response = client.put(f"/api/ad-groups/{ad_group['id']}", json={'name': 'Renamed again'})
+    assert response.get_json()['version'] == ad_group['version'] + 2
+
+
+def test_update_with_a_stale_version_is_a_conflict(client):
+    ad_group, = create_ad_groups(client, 1)
+    client.put(f"/api/ad-groups/{ad_group['id']}", json={'name': 'Renamed', 'version': ad_group['version']})
+
+    response = client.put(f"/api/ad-groups/{ad_group['id']}", json={'name': 'Lost update', 'version': ad_group['version']})
+    assert response.status_code == 409
+    assert response.get_json()['version'] == ad_group['version'] + 1
+    assert stored(ad_group['id']) == ('Renamed', ad_group['version'] + 1)
+
+    assert client.put(f'/api/ad-groups/{uuid.uuid4()}', json={'name': 'Nobody', 'version': 1}).status_code == 404
+    assert client.put(f"/api/ad-groups/{ad_group['id']}", json={'name': 'Bad', 'version': '2'}).status_code == 400
+
+
+def test_bulk_update_reports_conflicts_and_missing_ad_groups(client):
+    current, stale, untouched = create_ad_groups(client, 3)
+    client.put(f"/api/ad-groups/{stale['id']}", json={'name': 'Changed meanwhile'})
+    missing = str(uuid.uuid4())
+
+    response = client.patch('/api/ad-groups', json={'changes': {'name': 'Bulk'}, 'items': [
+        {'id': current['id'], 'version': current['version']},
+        {'id': stale['id'], 'version': stale['version']},
+        {'id': missing, 'version': 1},
+    ]})
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'updated': [{'id': current['id'], 'version': current['version'] + 1}],
+        'conflicts': [stale['id']],
+        'not_found': [missing],
+    }
+    assert stored(current['id']) == ('Bulk', current['version'] + 1)
+    assert stored(stale['id']) == ('Changed meanwhile', stale['version'] + 1)
+    assert stored(untouched['id']) == ('Ad group 2', untouched['version'])
+
+
+def test_bulk_update_by_ids_bumps_every_version(client):
+    ad_groups = create_ad_groups(client, 3)
+
+    response = client.patch('/api/ad-groups', json={
+        'changes': {'status': 'PAUSED'}, 'ids': [ad_group['id'] for ad_group in ad_groups] + [str(uuid.uuid4())],
+    })
+    body = response.get_json()
+    assert sorted((row['id'], row['version']) for row in body['updated']) == sorted(
+        (ad_group['id'], ad_group['version'] + 1) for ad_group in ad_groups
+    )
+    assert (body['conflicts'], len(body['not_found'])) == ([], 1)
@@ -0,0 +1,78 @@
+from extensions import publish_queue
+from models import db, Campaign, AdGroup
+from sqlalchemy import update
+import campaign_summary
+import pytest
+import uuid
+
+
+def recount():
+    """summarize() computed from scratch, campaign by campaign."""
+    totals = dict.fromkeys(campaign_summary.COUNT_COLUMNS, 0)
+    breakdowns = {'by_status': {}, 'by_objective': {}, 'by_bidding_strategy': {}}
+    db.session.expire_all()
+    for campaign in Campaign.query:
+        counts = {'campaigns': 1, 'daily_budget': campaign.daily_budget, 'ad_groups': len(campaign.ad_groups)}
+        keys = (('by_status', campaign.status or 'DRAFT'), ('by_objective', campaign.objective),
+                ('by_bidding_strategy', campaign.bidding_strategy or 'UNSPECIFIED'))
+        for name, key in keys:
+            bucket = breakdowns[name].setdefault(key, dict.fromkeys(campaign_summary.COUNT_COLUMNS, 0))
+            for column, value in counts.items():
+                bucket[column] += value
+        for column, value in counts.items():
+            totals[column] += value
+    totals['ad_groups_per_campaign'] = round(totals['ad_groups'] / totals['campaigns'], 2) if totals['campaigns'] else 0.0
+    return dict(totals, **breakdowns)
+
+
+def create_campaign(client, index, **values):
+    return client.post('/api/campaigns', json=dict({
+        'name': f'Campaign {index}', 'objective': ('Sales', 'Leads')[index % 2], 'daily_budget': 10 * (index + 1),
+        'start_date': '2026-01-01', 'end_date': '2026-02-01',
+    }, **values)).get_json()['id']
+
+
+@pytest.fixture
+def campaigns(client):
+    ids = [create_campaign(client, index, **({'bidding_strategy': 'TARGET_CPA'} if index % 3 == 0 else {}))
+           for index in range(6)]
+    for index, campaign_id in enumerate(ids):
+        for position in range(index % 3):
+            client.post(f'/api/campaigns/{campaign_id}/ad-groups', json={'name': f'Ad group {position}'})
+    return [uuid.UUID(campaign_id) for campaign_id in ids]
+
+
+def test_summary_matches_a_recount_after_creates_status_moves_and_deletes(client, campaigns):
+    assert campaign_summary.summarize() == recount()
+
+    for campaign_id in campaigns[:4]:
+        client.post(f'/api/campaigns/{campaign_id}/publish')
+        publish_queue.join()
+    assert client.post(f'/api/campaigns/{campaigns[0]}/pause').status_code == 200
+    assert client.post('/api/campaigns:bulk-status', json={'status': 'PAUSED', 'ids': campaigns[1:3]}).status_code == 200
+    assert campaign_summary.summarize() == recount()
+
+    ad_group_id = client.post(f'/api/campaigns/{campaigns[2]}/ad-groups', json={'name': 'Extra'}).get_json()['id']
+    client.delete(f'/api/ad-groups/{ad_group_id}')
+    for ad_group in AdGroup.query.filter_by(campaign_id=campaigns[4]).all():
+        client.delete(f'/api/ad-groups/{ad_group.id}')
+    assert campaign_summary.summarize() == recount()
+
+    # The summary also agrees with the table rebuilt from scratch
+    summary = campaign_summary.summarize()
+    campaign_summary.rebuild()
+    assert campaign_summary.summarize() == summary
+
+
+def test_campaigns_without_a_status_are_counted_as_drafts(client, campaigns):
+    # Rows written before the status default (or outside the ORM) can hold NULL
+    db.session.execute(update(Campaign).where(Campaign.id.in_(campaigns[:2])).values(status=None))
+    campaign_summary.move_campaigns(campaigns[:2], 'DRAFT')
+    db.session.commit()
+    client.post(f'/api/campaigns/{campaigns[1]}/ad-groups', json={'name': 'Extra'})
+
+    summary = campaign_summary.summarize()
+    assert summary == recount()
+    assert set(summary['by_status']) == {'DRAFT'}
+    campaign_summary.rebuild()
+    assert campaign_summary.summarize() == summary
@@ -0,0 +1,121 @@
+from datetime import date, datetime
+from models import db, Campaign, AdGroup
+import base64
+import json
+import pytest
+import uuid
+
+
+def add_campaigns(count, ad_groups_per_campaign=3):
+    for index in range(count):
+        campaign = Campaign(name=f'Campaign {index}', objective='Sales', daily_budget=100,
+                            start_date=date(2026, 1, 1), end_date=date(2026, 2, 1))
+        campaign.ad_groups = [AdGroup(name=f'Ad group {index}-{position}') for position in range(ad_groups_per_campaign)]
+        db.session.add(campaign)
+    db.session.commit()
+
+
+def list_statements(client, statements):
+    """Statements issued by one GET /api/campaigns covering every campaign."""
+    del statements[:]
+    response = client.get('/api/campaigns?limit=500')
+    assert response.status_code == 200
+    return len(response.get_json()), len(statements)
+
+
+def test_list_campaigns_statement_count_does_not_grow_with_campaigns(client, statements):
+    add_campaigns(2)
+    listed, few = list_statements(client, statements)
+    assert listed == 2
+
+    add_campaigns(48)
+    listed, many = list_statements(client, statements)
+    assert listed == 50
+    assert many == few == 1
+
+
+def test_list_campaigns_counts_ad_groups(client):
+    add_campaigns(3, ad_groups_per_campaign=2)
+    add_campaigns(1, ad_groups_per_campaign=0)
+
+    counts = sorted(campaign['ad_groups_count'] for campaign in client.get('/api/campaigns').get_json())
+    assert counts == [0, 2, 2, 2]
+
+
+
+def list_pages(client, query):
+    """Every page of GET /api/campaigns?<query>, following X-Next-Cursor. Returns
+    (pages of campaigns, whether each page came with a cursor)."""
+    pages, cursors = [], []
+    cursor = None
+    while True:
+        response = client.get(f'/api/campaigns?{query}' + (f'&cursor={cursor}' if cursor else ''))
+        assert response.status_code == 200
+        pages.append(response.get_json())
+        cursor = response.headers.get('X-Next-Cursor')
+        cursors.append(cursor is not None)
+        if cursor is None:
+            return pages, cursors
+
+
+def test_cursor_pages_cover_campaigns_created_in_the_same_instant_once(client):
+    add_campaigns(10, ad_groups_per_campaign=0)
+    # Seven share a timestamp, so only the id tells them apart
+    same_instant = [campaign.id for campaign in Campaign.query.limit(7)]
+    Campaign.query.filter(Campaign.id.in_(same_instant)).update({'created_at': datetime(2026, 1, 1, 12)})
+    db.session.commit()
+
+    pages, cursors = list_pages(client, 'limit=3&fields=id,name')
+    listed = [campaign['id'] for page in pages for campaign in page]
+    expected = [str(campaign.id) for campaign in
+                Campaign.query.order_by(Campaign.created_at.desc(), Campaign.id.desc())]
+    assert listed == expected
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+    assert cursors == [True, True, True, False]
+    assert set(pages[0][0]) == {'id', 'name'}
+
+
+def test_a_full_last_page_has_no_next_cursor(client):
+    add_campaigns(6, ad_groups_per_campaign=0)
+    pages, cursors = list_pages(client, 'limit=3')
+    assert [len(page) for page in pages] == [3, 3]
+    assert cursors == [True, False]
+
+
+@pytest.mark.parametrize('cursor', [
+    'not-a-cursor',
+    base64.urlsafe_b64encode(b'no separator').decode(),
+    base64.urlsafe_b64encode(b'2026-01-01T00:00:00|not-a-uuid').decode(),
+    base64.urlsafe_b64encode(b'yesterday|00000000-0000-0000-0000-000000000000').decode(),
+    base64.urlsafe_b64encode(b'\xff\xfe').decode(),
+])
+def test_invalid_cursors_are_rejected(client, cursor):
+    response = client.get(f'/api/campaigns?cursor={cursor}')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid cursor'}
+
+
+def test_ad_groups_count_matches_the_ad_groups_table(client):
+    created = client.post('/api/campaigns:batch', json=[
+        {'name': f'Campaign {index}', 'objective': 'Sales', 'daily_budget': 100,
+         'start_date': '2026-01-01', 'end_date': '2026-02-01'}
+        for index in range(4)
+    ]).get_json()['ids']
+    for index, campaign_id in enumerate(created):
+        client.post(f'/api/campaigns/{campaign_id}/ad-groups:batch',
+                    json=[{'name': f'Ad group {position}'} for position in range(index * 2)])
+    client.post(f'/api/campaigns/{created[0]}/ad-groups', json={'name': 'Single'})
+    removed = AdGroup.query.filter_by(campaign_id=uuid.UUID(created[3])).first()
+    client.delete(f'/api/ad-groups/{removed.id}')
+
+    listed = {campaign['id']: campaign['ad_groups_count'] for campaign in client.get('/api/campaigns').get_json()}
+    db.session.expire_all()
+    counted = {str(campaign.id): AdGroup.query.filter_by(campaign_id=campaign.id).count() for campaign in Campaign.query}
+    assert listed == counted == dict(zip(created, [1, 2, 4, 5]))
+
+@pytest.mark.parametrize('path', ['/api/campaigns:bulk-status', '/api/ad-groups:bulk-status', '/api/sync'])
+@pytest.mark.parametrize('body', [[{'status': 'PAUSED'}], 'PAUSED', 42])
+def test_request_bodies_that_are_not_json_objects_are_rejected(client, path, body):
+    response = client.post(path, data=json.dumps(body), content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Body must be a JSON object'}
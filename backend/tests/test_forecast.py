@@ -0,0 +1,123 @@
+from datetime import date
+from forecast import (
+    simulate, daily_spend_curve, STRATEGIES, STRATEGY_MODELS, DEFAULT_STRATEGY, DEFAULT_CPC, DEFAULT_CTR,
+    DEFAULT_CONVERSION_RATE, SPENDING_STATUSES,
+)
+import math
+import numpy as np
+import pytest
+
+AS_OF = date(2026, 3, 10)
+
+
+def columns(campaigns):
+    """simulate() inputs, shaped as load_campaigns() returns them, from one dict per campaign."""
+    def column(name, dtype, default=None):
+        return np.array([campaign.get(name, default) for campaign in campaigns], dtype=dtype)
+    return {
+        'id': list(range(len(campaigns))),
+        'status': column('status', object),
+        'bidding_strategy': column('bidding_strategy', object),
+        'daily_budget': column('daily_budget', float, 100.0),
+        'target_cpa': column('target_cpa', float),
+        'start_date': column('start_date', 'datetime64[D]', '2026-03-01'),
+        'end_date': column('end_date', 'datetime64[D]', '2026-03-31'),
+        'cpc_bid': column('cpc_bid', float),
+        'cpm_bid': column('cpm_bid', float),
+        'spend': column('spend', float, 0.0),
+        'clicks': column('clicks', float, 0.0),
+    }
+
+
+def test_only_published_and_scheduled_campaigns_are_projected_to_spend():
+    statuses = ['DRAFT', 'PUBLISHING', 'PUBLISHED', 'PAUSED', 'SCHEDULED', 'ENDED', None]
+    campaign_columns = columns([
+        {'status': status, 'spend': 500.0, 'clicks': 250.0,
+         # The scheduled campaign starts in five days
+         'start_date': '2026-03-15' if status == 'SCHEDULED' else '2026-03-01'}
+        for status in statuses
+    ])
+    result = simulate(campaign_columns, AS_OF)
+
+    remaining = dict(zip(statuses, result['remaining_days'].tolist()))
+    assert remaining == {
+        'DRAFT': 0, 'PUBLISHING': 0, 'PUBLISHED': 21, 'PAUSED': 0, 'SCHEDULED': 17, 'ENDED': 0, None: 0,
+    }
+    live = np.isin(np.array(statuses, dtype=object), SPENDING_STATUSES)
+    assert (result['projected_spend'][~live] == 500.0).all()
+    assert result['projected_spend'][statuses.index('PUBLISHED')] == 500.0 + 100.0 * 21
+    assert result['projected_spend'][statuses.index('SCHEDULED')] == 500.0 + 100.0 * 17
+
+    # The scheduled campaign joins the daily curve on its start date, not before
+    curve = daily_spend_curve(campaign_columns, result, AS_OF, days=10)
+    assert curve.tolist() == [100.0] * 5 + [200.0] * 5
+
+
+def reference(campaign, as_of):
+    """One campaign's simulate() figures, computed the slow way."""
+    start, end = date.fromisoformat(campaign['start_date']), date.fromisoformat(campaign['end_date'])
+    flight_days = (end - start).days + 1
+    elapsed_days = min(max((as_of - start).days + 1, 0), flight_days)
+    remaining_days = flight_days - elapsed_days if campaign['status'] in SPENDING_STATUSES else 0
+
+    if campaign['clicks'] > 0:
+        cpc = campaign['spend'] / campaign['clicks']
+    elif not math.isnan(campaign['cpc_bid']):
+        cpc = campaign['cpc_bid']
+    else:
+        cpc = campaign['cpm_bid'] / 1000 / DEFAULT_CTR
+    if math.isnan(cpc) or cpc <= 0:
+        cpc = DEFAULT_CPC
+
+    strategy = campaign['bidding_strategy'] if campaign['bidding_strategy'] in STRATEGIES else DEFAULT_STRATEGY
+    cpc_factor, conversion_factor = STRATEGY_MODELS[strategy]
+    conversion_rate = DEFAULT_CONVERSION_RATE * conversion_factor
+    reachable_cpa = cpc * cpc_factor / conversion_rate
+    spend_share = 1.0
+    if strategy == 'TARGET_CPA' and campaign['target_cpa'] > 0:
+        spend_share = min(1.0, campaign['target_cpa'] / reachable_cpa)
+    daily_spend = campaign['daily_budget'] * spend_share
+    daily_clicks = daily_spend / (cpc * cpc_factor)
+    daily_conversions = daily_clicks * conversion_rate
+    return {
+        'remaining_days': remaining_days,
+        'cpc': cpc,
+        'daily_spend': daily_spend,
+        'daily_clicks': daily_clicks,
+        'daily_conversions': daily_conversions,
+        'projected_spend': campaign['spend'] + daily_spend * remaining_days,
+        'projected_conversions': campaign['spend'] / reachable_cpa + daily_conversions * remaining_days,
+    }
+
+
+def random_campaigns(count, seed=7):
+    rng = np.random.default_rng(seed)
+    statuses = ['DRAFT', 'PUBLISHING', 'PUBLISHED', 'PAUSED', 'SCHEDULED', 'ENDED']
+    strategies = list(STRATEGIES) + [None, 'MANUAL_CPC']
+    campaigns = []
+    for _ in range(count):
+        start = np.datetime64('2026-02-01') + rng.integers(0, 60)
+        clicks = float(rng.integers(0, 500)) if rng.random() < 0.6 else 0.0
+        campaigns.append({
+            'status': statuses[rng.integers(len(statuses))],
+            'bidding_strategy': strategies[rng.integers(len(strategies))],
+            'daily_budget': round(float(rng.uniform(10, 1000)), 2),
+            'target_cpa': round(float(rng.uniform(1, 80)), 2) if rng.random() < 0.5 else math.nan,
+            'start_date': str(start),
+            'end_date': str(start + rng.integers(0, 90)),
+            'cpc_bid': round(float(rng.uniform(0.1, 5)), 2) if rng.random() < 0.5 else math.nan,
+            'cpm_bid': round(float(rng.uniform(1, 20)), 2) if rng.random() < 0.5 else math.nan,
+            'spend': round(float(rng.uniform(0, 5000)), 2) if clicks or rng.random() < 0.3 else 0.0,
+            'clicks': clicks,
+        })
+    return campaigns
+
+
+@pytest.mark.parametrize('as_of', [date(2026, 1, 15), AS_OF, date(2026, 6, 30)])
+def test_vectorized_simulation_matches_a_per_campaign_reference(as_of):
+    campaigns = random_campaigns(500)
+    result = simulate(columns(campaigns), as_of)
+
+    expected = [reference(campaign, as_of) for campaign in campaigns]
+    for name in expected[0]:
+        np.testing.assert_allclose(result[name], [figures[name] for figures in expected], rtol=1e-12, err_msg=name)
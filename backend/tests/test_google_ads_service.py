@@ -0,0 +1,179 @@
+from datetime import date
+from google_ads_service import GoogleAdsService
+from rate_limiter import RateLimiter
+from types import SimpleNamespace
+import google_ads_service
+import grpc
+import os
+import pytest
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from fake_ads import FakeGoogleAdsClient  # noqa: E402
+
+
+class StreamError(grpc.RpcError):
+    def __init__(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+class StreamingClient:
+    """Stands in for GoogleAdsClient: GoogleAdsService.search_stream answers every query
+    with `batches`, raising `error` after the first batch of the first `failures` calls."""
+
+    def __init__(self, batches, failures=0, error=grpc.StatusCode.RESOURCE_EXHAUSTED):
+        self.batches = batches
+        self.failures = failures
+        self.error = error
+        self.queries = []
+
+    def get_service(self, name):
+        return self
+
+    def search_stream(self, customer_id, query):
+        self.queries.append(query)
+        failing = len(self.queries) <= self.failures
+        for index, batch in enumerate(self.batches):
+            if failing and index == 1:
+                raise StreamError(self.error)
+            yield batch
+
+
+def batch(*values):
+    rows = [SimpleNamespace(value=value) for value in values]
+    return SimpleNamespace(results=rows, _pb=SimpleNamespace(results=rows))
+
+
+def ads_service(client):
+    service = GoogleAdsService()
+    service.rate_limiter = RateLimiter(backoff_base=0.001, sleep=lambda seconds: None)
+    service.client = client
+    return service
+
+
+def test_errors_while_reading_a_stream_are_retried_from_the_start():
+    client = StreamingClient([batch(1, 2), batch(3)], failures=2)
+    rows = [row.value for row in ads_service(client)._search('SELECT campaign.id FROM campaign')]
+    assert rows == [1, 2, 3]
+    assert len(client.queries) == 3
+
+
+def test_non_retryable_errors_while_reading_a_stream_are_raised():
+    client = StreamingClient([batch(1), batch(2)], failures=1, error=grpc.StatusCode.INVALID_ARGUMENT)
+    with pytest.raises(StreamError):
+        list(ads_service(client)._search('SELECT campaign.id FROM campaign'))
+    assert len(client.queries) == 1
+
+
+def test_campaign_metrics_are_read_one_day_per_stream():
+    client = StreamingClient([])
+    list(ads_service(client).stream_campaign_metrics(date(2026, 1, 30), date(2026, 2, 1)))
+    assert [query.split('BETWEEN ')[1] for query in client.queries] == [
+        "'2026-01-30' AND '2026-01-30'", "'2026-01-31' AND '2026-01-31'", "'2026-02-01' AND '2026-02-01'",
+    ]
+
+
+@pytest.mark.parametrize('campaigns, searches', [(25, 3), (20, 3), (0, 1)])
+def test_campaign_states_are_read_in_pages_of_campaign_ids(monkeypatch, campaigns, searches):
+    monkeypatch.setattr(google_ads_service, 'CAMPAIGN_STATES_PER_SEARCH', 10)
+    client = FakeGoogleAdsClient()
+    google_ids = [str(1000 + index * 7) for index in range(campaigns)]
+    client.add_campaigns(reversed(google_ids[::2]), status='ENABLED')
+    client.add_campaigns(google_ids[1::2], status='PAUSED')
+
+    states = list(ads_service(client).stream_campaign_states())
+    assert [google_id for google_id, _, _ in states] == google_ids
+    assert {google_id: status for google_id, status, _ in states} == {
+        google_id: 'ENABLED' if index % 2 == 0 else 'PAUSED' for index, google_id in enumerate(google_ids)
+    }
+    assert client.rpc_count == searches
+
+
+def campaign_data(index, **values):
+    return dict({
+        'id': f'00000000-0000-0000-0000-{index:012d}', 'name': f'Campaign {index}', 'daily_budget': index + 1,
+        'start_date': '2026-01-01', 'end_date': '2026-02-01', 'enabled_ad_groups_count': 0,
+    }, **values)
+
+
+def rejected_owners(client, owner_of_budget):
+    """Who owns each operation the fake client rejected, worked out from the requests alone:
+    resources are linked to their owner through the resource names they reference."""
+    rejected = set()
+    for _, operations, failed in client.requests:
+        owners = {}
+        resources = []
+        for operation in operations:
+            kind = operation._pb.WhichOneof('operation')
+            resource = getattr(operation, kind).create
+            if kind == 'campaign_budget_operation':
+                owners[resource.resource_name] = owner_of_budget(resource)
+            elif kind == 'campaign_operation':
+                owners[resource.resource_name] = owners[resource.campaign_budget]
+            elif kind == 'ad_group_operation':
+                owners[resource.resource_name] = owners.get(resource.campaign, resource.name)
+            resources.append(resource.ad_group if kind == 'ad_group_ad_operation' else resource.resource_name)
+        rejected.update(owners[resources[index]] for index in failed)
+    return rejected
+
+
+def test_campaigns_are_published_with_one_mutate_per_chunk_and_failures_map_to_their_campaign(monkeypatch):
+    # 10 campaigns (4 operations each) per request
+    monkeypatch.setattr(google_ads_service, 'MAX_MUTATE_OPERATIONS', 40)
+    client = FakeGoogleAdsClient(error_rate=0.05, seed=3, record_requests=True)
+    service = ads_service(client)
+    service.customer_id = '123'
+    campaigns = [campaign_data(index) for index in range(25)]
+
+    results = service.publish_campaigns(campaigns)
+
+    assert [(method, len(operations)) for method, operations, _ in client.requests] == [('mutate', 40), ('mutate', 40), ('mutate', 20)]
+    rejected = rejected_owners(client, lambda budget: budget.name.removeprefix('Budget '))
+    failed = {campaign['id'] for campaign, result in zip(campaigns, results) if result['error']}
+    assert rejected and failed == rejected
+    for campaign, result in zip(campaigns, results):
+        if campaign['id'] in rejected:
+            continue
+        # The campaign was linked to its own budget through their temporary resource names
+        assert client.campaigns[result['google_campaign_id']][1] == campaign['daily_budget'] * 1000000
+        assert result['google_ad_group_id'] and result['google_ad_id']
+    created = [result['google_campaign_id'] for result in results if result['google_campaign_id']]
+    assert len(set(created)) == len(created)
+
+
+def test_resumed_publishes_only_send_the_missing_steps():
+    client = FakeGoogleAdsClient(record_requests=True)
+    service = ads_service(client)
+    service.customer_id = '123'
+
+    result = service.publish_campaigns([campaign_data(1, google_budget_id='777', google_campaign_id='888')])[0]
+
+    (_, operations, _), = client.requests
+    assert [operation._pb.WhichOneof('operation') for operation in operations] == ['ad_group_operation', 'ad_group_ad_operation']
+    assert operations[0].ad_group_operation.create.campaign == 'customers/123/campaigns/888'
+    assert (result['google_budget_id'], result['google_campaign_id'], result['error']) == ('777', '888', None)
+    assert result['google_ad_group_id'] and result['google_ad_id']
+
+
+def test_ad_groups_are_published_with_one_mutate_per_chunk_and_failures_map_to_their_ad_group(monkeypatch):
+    # 10 ad groups (2 operations each) per request
+    monkeypatch.setattr(google_ads_service, 'MAX_MUTATE_OPERATIONS', 20)
+    client = FakeGoogleAdsClient(error_rate=0.1, seed=5, record_requests=True)
+    service = ads_service(client)
+    service.customer_id = '123'
+    ad_groups = [{'id': f'ad-group-{index}', 'name': f'Ad group {index}', 'cpc_bid': 1.5} for index in range(25)]
+
+    results = list(service.publish_ad_groups(campaign_data(1, google_campaign_id='888'), iter(ad_groups)))
+
+    assert [(method, len(operations)) for method, operations, _ in client.requests] == [('mutate', 20), ('mutate', 20), ('mutate', 10)]
+    assert {operation.ad_group_operation.create.campaign for _, operations, _ in client.requests
+            for operation in operations[::2]} == {'customers/123/campaigns/888'}
+    rejected = rejected_owners(client, None)
+    assert [result['id'] for result in results] == [ad_group['id'] for ad_group in ad_groups]
+    failed = {ad_group['name'] for ad_group, result in zip(ad_groups, results) if result['error']}
+    assert rejected and failed == rejected
+    created = [result['google_ad_group_id'] for result in results if not result['error']]
+    assert all(created) and len(set(created)) == 25 - len(rejected)
@@ -0,0 +1,25 @@
+import instrumentation
+import pytest
+
+
+def profiles(app, header_value):
+    """Whether a request sending `X-Profile: header_value` is run under the profiler."""
+    with app.test_request_context(headers={instrumentation.PROFILE_HEADER: header_value}):
+        instrumentation._before_request()
+        profiled = instrumentation._local.stats.profiler is not None
+        instrumentation._teardown_request(None)
+    return profiled
+
+
+@pytest.mark.parametrize('header_value, profiled', [
+    ('1', True), ('true', True), ('True', True),
+    ('0', False), ('false', False), ('yes', False), ('anything', False), ('', False),
+])
+def test_only_1_or_true_asks_for_a_profile(app, monkeypatch, header_value, profiled):
+    monkeypatch.setattr(instrumentation, '_profiling', True)
+    assert profiles(app, header_value) == profiled
+
+
+def test_profile_header_is_ignored_without_profiling_enabled(app, monkeypatch):
+    monkeypatch.setattr(instrumentation, '_profiling', False)
+    assert not profiles(app, '1')
@@ -0,0 +1,36 @@
+def create_ad_group(client, keywords):
+    campaign_id = client.post('/api/campaigns', json={
+        'name': 'Campaign', 'objective': 'Sales', 'daily_budget': 100,
+        'start_date': '2026-01-01', 'end_date': '2026-02-01',
+    }).get_json()['id']
+    return client.post(f'/api/campaigns/{campaign_id}/ad-groups', json={'name': 'Ad group', 'keywords': keywords}).get_json()['id']
+
+
+def keyword_bids(client, ad_group_id):
+    keywords = client.get(f'/api/ad-groups/{ad_group_id}/keywords').get_json()
+    return {(keyword['text'], keyword['match_type']): keyword['cpc_bid'] for keyword in keywords}
+
+
+def test_plain_text_keywords_keep_stored_bids(client):
+    ad_group_id = create_ad_group(client, [
+        {'text': 'running shoes', 'match_type': 'EXACT', 'cpc_bid': 2.5},
+        {'text': 'trail shoes', 'cpc_bid': 1.25},
+        'hiking boots',
+    ])
+
+    response = client.put(f'/api/ad-groups/{ad_group_id}', json={'keywords': '[Running  Shoes], "trail shoes", hiking boots, sandals'})
+    assert response.status_code == 200
+    assert keyword_bids(client, ad_group_id) == {
+        ('Running Shoes', 'EXACT'): 2.5,
+        # Another match type is another keyword, with no bid of its own yet
+        ('trail shoes', 'PHRASE'): None,
+        ('hiking boots', 'BROAD'): None,
+        ('sandals', 'BROAD'): None,
+    }
+
+
+def test_keyword_bids_sent_with_keywords_replace_stored_ones(client):
+    ad_group_id = create_ad_group(client, [{'text': 'running shoes', 'cpc_bid': 2.5}])
+
+    client.put(f'/api/ad-groups/{ad_group_id}', json={'keywords': [{'text': 'running shoes', 'cpc_bid': 3.0}]})
+    assert keyword_bids(client, ad_group_id) == {('running shoes', 'BROAD'): 3.0}
@@ -0,0 +1,197 @@
+from datetime import datetime, timedelta
+from extensions import publish_queue, scheduler
+from models import db, Campaign, PublishJob
+from publish_queue import PublishQueue
+from sqlalchemy import event
+import campaign_summary
+import uuid
+
+
+def create_campaign(client, start_date='2026-01-01', end_date='2026-02-01'):
+    return client.post('/api/campaigns', json={
+        'name': 'Campaign', 'objective': 'Sales', 'daily_budget': 100,
+        'start_date': str(start_date), 'end_date': str(end_date),
+    }).get_json()['id']
+
+
+def test_publish_succeeds_in_mock_mode(client):
+    campaign_id = create_campaign(client)
+    response = client.post(f'/api/campaigns/{campaign_id}/publish')
+    assert response.status_code == 202
+    publish_queue.join()
+
+    job = client.get(f"/api/publish-jobs/{response.get_json()['id']}").get_json()
+    assert job['status'] == 'SUCCEEDED'
+    assert client.get(f'/api/campaigns/{campaign_id}').get_json()['status'] == 'PUBLISHED'
+
+
+def test_unexpected_worker_error_fails_the_job_and_releases_the_campaign(client, monkeypatch):
+    def broken_publish(self, job_ids):
+        raise RuntimeError('database went away')
+
+    monkeypatch.setattr(PublishQueue, '_publish', broken_publish)
+    campaign_id = create_campaign(client)
+    job_id = client.post(f'/api/campaigns/{campaign_id}/publish').get_json()['id']
+    publish_queue.join()
+
+    db.session.expire_all()
+    job = db.session.get(PublishJob, uuid.UUID(job_id))
+    assert (job.status, job.error) == ('FAILED', 'Publish failed: database went away')
+    assert db.session.get(Campaign, job.campaign_id).status == 'DRAFT'
+    summary = campaign_summary.summarize()
+    campaign_summary.rebuild()
+    assert campaign_summary.summarize() == summary
+
+    # It can be published again once the error is gone
+    monkeypatch.undo()
+    assert client.post(f'/api/campaigns/{campaign_id}/publish').status_code == 202
+    publish_queue.join()
+    assert client.get(f'/api/campaigns/{campaign_id}').get_json()['status'] == 'PUBLISHED'
+
+
+def test_mock_publishes_get_distinct_google_ids(client):
+    # Separate batches in the same second used to get the same mock id, which the unique
+    # index on google_campaign_id rejects
+    campaign_ids = [create_campaign(client) for _ in range(3)]
+    for campaign_id in campaign_ids:
+        client.post(f'/api/campaigns/{campaign_id}/publish')
+        publish_queue.join()
+
+    campaigns = [client.get(f'/api/campaigns/{campaign_id}').get_json() for campaign_id in campaign_ids]
+    assert [campaign['status'] for campaign in campaigns] == ['PUBLISHED'] * 3
+    assert len({campaign['google_campaign_id'] for campaign in campaigns}) == 3
+
+
+def test_campaigns_whose_flight_has_started_are_enabled_when_published(client, monkeypatch):
+    calls = []
+    rejecting = [False]
+
+    def set_campaign_statuses(google_campaign_ids, status):
+        calls.append((list(google_campaign_ids), status))
+        return {google_id: 'Rejected' for google_id in google_campaign_ids if rejecting[0]}
+
+    monkeypatch.setattr(publish_queue.ads_service, 'set_campaign_statuses', set_campaign_statuses)
+    today = datetime.utcnow().date()
+    started = create_campaign(client, today - timedelta(days=1), today + timedelta(days=30))
+    upcoming = create_campaign(client, today + timedelta(days=1), today + timedelta(days=30))
+    for campaign_id in (started, upcoming):
+        client.post(f'/api/campaigns/{campaign_id}/publish')
+        publish_queue.join()
+
+    started, upcoming = [client.get(f'/api/campaigns/{campaign_id}').get_json() for campaign_id in (started, upcoming)]
+    assert (started['status'], upcoming['status']) == ('PUBLISHED', 'SCHEDULED')
+    # The upcoming flight stays paused in Google Ads until the scheduler starts it
+    assert calls == [([started['google_campaign_id']], 'ENABLED')]
+
+    # A campaign Google Ads doesn't enable is left for the scheduler to enable
+    calls.clear()
+    rejecting[0] = True
+    campaign_id = create_campaign(client, today, today + timedelta(days=30))
+    client.post(f'/api/campaigns/{campaign_id}/publish')
+    publish_queue.join()
+    campaign = client.get(f'/api/campaigns/{campaign_id}').get_json()
+    assert campaign['status'] == 'SCHEDULED'
+
+    rejecting[0] = False
+    assert scheduler.run(today)['activated'] == 1
+    assert client.get(f'/api/campaigns/{campaign_id}').get_json()['status'] == 'PUBLISHED'
+    assert calls == [([campaign['google_campaign_id']], 'ENABLED')] * 2
+
+
+def test_publishing_ad_groups_bumps_their_version(client, monkeypatch):
+    campaign_id = create_campaign(client)
+    ad_groups = [client.post(f'/api/campaigns/{campaign_id}/ad-groups', json={'name': name}).get_json()
+                 for name in ('Adopted', 'Created')]
+    # An earlier attempt created the first one but never recorded it
+    adopted_id = 'G-ADOPTED'
+    monkeypatch.setattr(publish_queue.ads_service, 'find_ad_groups', lambda google_campaign_id: {'Adopted': adopted_id})
+    with publish_queue.app.app_context():
+        publish_queue._publish_ad_groups(uuid.uuid4(), {'id': campaign_id, 'google_campaign_id': 'G1'}, retried=True)
+
+    adopted, created = [client.get(f"/api/ad-groups/{ad_group['id']}").get_json() for ad_group in ad_groups]
+    assert adopted['google_ad_group_id'] == adopted_id
+    assert created['google_ad_group_id']
+    assert [adopted['version'], created['version']] == [ad_group['version'] + 1 for ad_group in ad_groups]
+
+    # So an edit based on the version read before the publish doesn't overwrite it
+    response = client.put(f"/api/ad-groups/{ad_groups[1]['id']}", json={'name': 'Stale', 'version': ad_groups[1]['version']})
+    assert response.status_code == 409
+
+
+def record_submits(monkeypatch):
+    """Job ids enqueued from now on, which are not run."""
+    submitted = []
+    monkeypatch.setattr(publish_queue, 'submit', submitted.append)
+    return submitted
+
+
+def publish(client, campaign_id, key=None):
+    return client.post(f'/api/campaigns/{campaign_id}/publish', headers={'Idempotency-Key': key} if key else {})
+
+
+def test_repeating_a_publish_with_its_idempotency_key_returns_the_same_job(client, monkeypatch):
+    submitted = record_submits(monkeypatch)
+    campaign_id = create_campaign(client)
+
+    first, again = publish(client, campaign_id, 'key-1'), publish(client, campaign_id, 'key-1')
+    assert (first.status_code, again.status_code) == (202, 202)
+    assert again.get_json()['id'] == first.get_json()['id']
+    assert submitted == [uuid.UUID(first.get_json()['id'])]
+    assert PublishJob.query.count() == 1
+
+    # Reusing the key for another campaign is an error, and publishes nothing
+    other_id = create_campaign(client)
+    response = publish(client, other_id, 'key-1')
+    assert response.status_code == 422
+    assert client.get(f'/api/campaigns/{other_id}').get_json()['status'] == 'DRAFT'
+    assert len(submitted) == 1
+
+
+def test_a_publish_that_loses_the_draft_claim_gets_the_winners_job(app, client, monkeypatch):
+    submitted = record_submits(monkeypatch)
+    campaign_id = create_campaign(client)
+    winner = {}
+
+    # Another request publishes the campaign after this one read it as DRAFT, just
+    # before this one claims it
+    def publish_first(conn, cursor, statement, *args):
+        if 'job' not in winner and statement.startswith('UPDATE campaigns SET status'):
+            winner['job'] = None
+            winner['job'] = publish(app.test_client(), campaign_id, 'winner').get_json()
+
+    event.listen(db.engine, 'before_cursor_execute', publish_first)
+    try:
+        response = publish(client, campaign_id, 'loser')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', publish_first)
+
+    assert response.status_code == 202
+    assert response.get_json()['id'] == winner['job']['id']
+    assert submitted == [uuid.UUID(winner['job']['id'])]
+    assert PublishJob.query.count() == 1
+    assert client.get(f'/api/campaigns/{campaign_id}').get_json()['status'] == 'PUBLISHING'
+
+
+def test_jobs_of_a_crashed_process_are_resumed_by_recover_pending(client, monkeypatch):
+    with monkeypatch.context() as crashed:
+        record_submits(crashed)
+        stale_id, fresh_id = create_campaign(client), create_campaign(client)
+        stale_job, fresh_job = [uuid.UUID(publish(client, campaign_id).get_json()['id'])
+                                for campaign_id in (stale_id, fresh_id)]
+    # Both were claimed by the crashed process, but only one has been silent for long
+    long_ago = datetime.utcnow() - timedelta(seconds=publish_queue.stale_after + 60)
+    PublishJob.query.filter_by(id=stale_job).update({'status': 'RUNNING', 'started_at': long_ago,
+                                                     'heartbeat_at': long_ago, 'attempts': 1})
+    PublishJob.query.filter_by(id=fresh_job).update({'status': 'RUNNING', 'started_at': datetime.utcnow(),
+                                                     'heartbeat_at': datetime.utcnow(), 'attempts': 1})
+    db.session.commit()
+
+    assert publish_queue.recover_pending() == 1
+    publish_queue.join()
+
+    db.session.expire_all()
+    job = db.session.get(PublishJob, stale_job)
+    assert (job.status, job.attempts) == ('SUCCEEDED', 2)
+    assert client.get(f'/api/campaigns/{stale_id}').get_json()['status'] == 'PUBLISHED'
+    assert db.session.get(PublishJob, fresh_job).status == 'RUNNING'
+    assert client.get(f'/api/campaigns/{fresh_id}').get_json()['status'] == 'PUBLISHING'
@@ -0,0 +1,204 @@
+from datetime import timedelta
+from google.ads.googleads.client import GoogleAdsClient
+from google.ads.googleads.errors import GoogleAdsException
+from google.oauth2.credentials import Credentials
+from rate_limiter import RateLimiter, TokenBucket, classify_error
+import grpc
+import pytest
+import rate_limiter
+import threading
+import time
+
+CONFIG = {
+    'GOOGLE_ADS_RATE_LIMIT_QPS': 10.0, 'GOOGLE_ADS_RATE_LIMIT_BURST': 20, 'GOOGLE_ADS_MAX_CONCURRENT_REQUESTS': 8,
+    'GOOGLE_ADS_MAX_RETRIES': 5, 'GOOGLE_ADS_BACKOFF_BASE': 1.0, 'GOOGLE_ADS_BACKOFF_MAX': 60.0,
+}
+
+
+def test_worker_processes_split_the_configured_limits():
+    limiter = RateLimiter.from_config(CONFIG, processes=4)
+    assert (limiter.qps, limiter.burst, limiter._semaphore._value) == (2.5, 5, 2)
+
+    limiter = RateLimiter.from_config(CONFIG, processes=16)
+    assert (limiter.qps, limiter.burst, limiter._semaphore._value) == (0.625, 1, 1)
+
+    limiter = RateLimiter.from_config(CONFIG)
+    assert (limiter.qps, limiter.burst, limiter._semaphore._value) == (10.0, 20, 8)
+
+
+class FakeClock:
+    """Monotonic clock that only moves when slept on; records every sleep."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+class RpcError(grpc.RpcError):
+    def __init__(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+@pytest.fixture(scope='module')
+def ads_client():
+    return GoogleAdsClient(credentials=Credentials(token='fake'), developer_token='fake', use_proto_plus=True)
+
+
+def ads_exception(ads_client, code, quota_error=None, internal_error=None, retry_delay=None):
+    """A GoogleAdsException as raised by the client library, with one GoogleAdsError."""
+    error = ads_client.get_type('GoogleAdsError')
+    if quota_error:
+        error.error_code.quota_error = ads_client.get_type('QuotaErrorEnum').QuotaError[quota_error]
+    if internal_error:
+        error.error_code.internal_error = ads_client.get_type('InternalErrorEnum').InternalError[internal_error]
+    if not quota_error and not internal_error:
+        error.error_code.field_error = ads_client.get_type('FieldErrorEnum').FieldError.REQUIRED
+    if retry_delay is not None:
+        error.details.quota_error_details.retry_delay = timedelta(seconds=retry_delay)
+    failure = ads_client.get_type('GoogleAdsFailure')
+    failure.errors.append(error)
+    return GoogleAdsException(RpcError(code), None, failure, 'request-id')
+
+
+def failing(*errors, result='ok'):
+    """A call raising `errors` in turn, then returning `result`; counts its attempts."""
+    remaining = list(errors)
+
+    def call():
+        call.attempts += 1
+        if remaining:
+            raise remaining.pop(0)
+        return result
+    call.attempts = 0
+    return call
+
+
+def test_token_bucket_allows_a_burst_then_refills_at_its_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+
+    bucket.acquire()
+    assert clock.sleeps == [0.5]
+
+    # Refills up to the capacity, no further
+    clock.now += 60
+    for _ in range(4):
+        bucket.acquire()
+    assert clock.sleeps == [0.5, 0.5]
+
+
+def test_server_retry_delay_pauses_the_bucket_and_overrides_the_backoff(ads_client):
+    clock = FakeClock()
+    limiter = RateLimiter(qps=1, burst=10, backoff_base=1, backoff_max=60, clock=clock, sleep=clock.sleep)
+    call = failing(ads_exception(ads_client, grpc.StatusCode.RESOURCE_EXHAUSTED, quota_error='RESOURCE_EXHAUSTED', retry_delay=7))
+
+    assert limiter.call('123', 'CampaignService', call) == 'ok'
+    assert call.attempts == 2
+    # The hint, not the 1s backoff; the paused bucket then refills from empty
+    assert clock.sleeps == [7, 1]
+    # Other callers of the same customer and service wait out a delay too, then a refill
+    start = clock.now
+    bucket = limiter.bucket('123', 'CampaignService')
+    bucket.block_for(5)
+    bucket.acquire()
+    assert clock.now - start == 6
+
+
+def test_retry_delays_longer_than_the_backoff_cap_are_not_waited_for(ads_client):
+    clock = FakeClock()
+    limiter = RateLimiter(backoff_max=60, clock=clock, sleep=clock.sleep)
+    error = ads_exception(ads_client, grpc.StatusCode.RESOURCE_EXHAUSTED, quota_error='RESOURCE_EXHAUSTED', retry_delay=3600)
+    call = failing(error)
+
+    with pytest.raises(GoogleAdsException):
+        limiter.call('123', 'CampaignService', call)
+    assert call.attempts == 1
+    assert clock.sleeps == []
+
+
+def test_backoff_doubles_up_to_its_cap_until_retries_run_out(monkeypatch):
+    # Full jitter: pin it to the top of its range
+    monkeypatch.setattr(rate_limiter.random, 'uniform', lambda low, high: high)
+    clock = FakeClock()
+    limiter = RateLimiter(max_retries=4, backoff_base=1, backoff_max=5, clock=clock, sleep=clock.sleep)
+    call = failing(*[RpcError(grpc.StatusCode.UNAVAILABLE) for _ in range(10)])
+
+    with pytest.raises(RpcError):
+        limiter.call('123', 'CampaignService', call)
+    assert call.attempts == 5
+    assert clock.sleeps == [1, 2, 4, 5]
+
+
+def test_permanent_errors_are_not_retried(ads_client):
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+    call = failing(ads_exception(ads_client, grpc.StatusCode.INVALID_ARGUMENT))
+
+    with pytest.raises(GoogleAdsException):
+        limiter.call('123', 'CampaignService', call)
+    assert call.attempts == 1
+    assert clock.sleeps == []
+
+
+def test_calls_in_flight_are_capped_across_threads():
+    limiter = RateLimiter(qps=1000, burst=1000, max_concurrency=2)
+    lock = threading.Lock()
+    release = threading.Event()
+    in_flight = []
+    peak = [0]
+
+    def call():
+        with lock:
+            in_flight.append(1)
+            peak[0] = max(peak[0], len(in_flight))
+        release.wait(5)
+        with lock:
+            in_flight.pop()
+
+    threads = [threading.Thread(target=limiter.call, args=('123', 'CampaignService', call)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while len(in_flight) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert len(in_flight) == 2
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+
+
+@pytest.mark.parametrize('error, classified', [
+    (dict(code=grpc.StatusCode.RESOURCE_EXHAUSTED, quota_error='RESOURCE_EXHAUSTED', retry_delay=30), (True, 30.0)),
+    (dict(code=grpc.StatusCode.INVALID_ARGUMENT, quota_error='RESOURCE_TEMPORARILY_EXHAUSTED'), (True, None)),
+    (dict(code=grpc.StatusCode.INTERNAL, internal_error='TRANSIENT_ERROR'), (True, None)),
+    (dict(code=grpc.StatusCode.UNAVAILABLE), (True, None)),
+    (dict(code=grpc.StatusCode.INVALID_ARGUMENT), (False, None)),
+    (dict(code=grpc.StatusCode.INTERNAL, internal_error='INTERNAL_ERROR'), (False, None)),
+])
+def test_google_ads_errors_are_classified_by_status_and_error_code(ads_client, error, classified):
+    assert classify_error(ads_exception(ads_client, **error)) == classified
+
+
+@pytest.mark.parametrize('error, classified', [
+    (RpcError(grpc.StatusCode.UNAVAILABLE), (True, None)),
+    (RpcError(grpc.StatusCode.DEADLINE_EXCEEDED), (True, None)),
+    (RpcError(grpc.StatusCode.PERMISSION_DENIED), (False, None)),
+    (ValueError('bad request'), (False, None)),
+])
+def test_other_errors_are_classified_by_grpc_status(error, classified):
+    assert classify_error(error) == classified
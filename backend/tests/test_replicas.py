@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from flask import Response
+from models import db, CacheVersion
+from replicas import ReplicaRouter
+from response_cache import ResponseCache
+import pytest
+import replicas
+
+
+def pins(app, method, status):
+    """Whether a `method` request answered with `status` sets the read-your-writes cookie."""
+    with app.test_request_context(method=method):
+        response = ReplicaRouter()._after_request(Response(status=status))
+    return replicas.PIN_COOKIE in response.headers.get('Set-Cookie', '')
+
+
+@pytest.mark.parametrize('method, status, pinned', [
+    ('POST', 201, True), ('PUT', 200, True), ('DELETE', 204, True), ('POST', 202, True),
+    ('POST', 400, False), ('PUT', 404, False), ('DELETE', 409, False), ('POST', 500, False),
+    ('GET', 200, False),
+])
+def test_only_successful_writes_pin_the_client_to_the_primary(app, method, status, pinned):
+    assert pins(app, method, status) == pinned
+
+
+def test_credentialed_cors_is_limited_to_configured_origins(app, client):
+    allowed = app.config['CORS_ORIGINS'][0]
+    response = client.get('/api/campaigns', headers={'Origin': allowed})
+    assert response.headers['Access-Control-Allow-Origin'] == allowed
+    assert response.headers['Access-Control-Allow-Credentials'] == 'true'
+
+    response = client.get('/api/campaigns', headers={'Origin': 'https://evil.example'})
+    assert 'Access-Control-Allow-Origin' not in response.headers
+
+
+def invalidated_seconds_ago(seconds):
+    CacheVersion.query.update({'invalidated_at': datetime.utcnow() - timedelta(seconds=seconds)})
+    db.session.commit()
+
+
+def test_replica_reads_are_not_cached_until_the_last_write_settles(app):
+    cache = ResponseCache()
+    builds = []
+
+    def get(settle_seconds):
+        return cache.get_or_build('campaigns', 'list', lambda: builds.append(1) or len(builds), str,
+                                  settle_seconds=settle_seconds)
+
+    cache.invalidate('campaigns')
+    invalidated_seconds_ago(2)
+    get(settle_seconds=5)
+    get(settle_seconds=5)
+    assert len(builds) == 2
+
+    invalidated_seconds_ago(5)
+    get(settle_seconds=5)
+    get(settle_seconds=5)
+    assert len(builds) == 3
+
+    # Primary reads are stored right away, also after a clear()
+    cache.clear()
+    get(settle_seconds=5)
+    get(settle_seconds=0)
+    get(settle_seconds=0)
+    assert len(builds) == 5
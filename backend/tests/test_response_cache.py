@@ -0,0 +1,45 @@
+from extensions import response_cache
+from response_cache import ResponseCache
+import app as app_module
+
+
+def create_ad_group(client):
+    campaign_id = client.post('/api/campaigns', json={
+        'name': 'Campaign', 'objective': 'Sales', 'daily_budget': 100,
+        'start_date': '2026-01-01', 'end_date': '2026-02-01',
+    }).get_json()['id']
+    return client.post(f'/api/campaigns/{campaign_id}/ad-groups', json={'name': 'Ad group'}).get_json()['id']
+
+
+def test_a_write_handled_by_another_process_is_not_answered_with_a_stale_304(client, monkeypatch):
+    ad_group_id = create_ad_group(client)
+    etag = client.get(f'/api/ad-groups/{ad_group_id}').headers['ETag']
+    hits = response_cache.hits
+    assert client.get(f'/api/ad-groups/{ad_group_id}', headers={'If-None-Match': etag}).status_code == 304
+    assert response_cache.hits == hits + 1
+
+    # Another worker process, sharing the database but not this one's cache, renames it
+    with monkeypatch.context() as other_process:
+        other_process.setattr(app_module, 'response_cache', ResponseCache())
+        assert client.put(f'/api/ad-groups/{ad_group_id}', json={'name': 'Renamed'}).status_code == 200
+
+    response = client.get(f'/api/ad-groups/{ad_group_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['name'] == 'Renamed'
+    assert response.headers['ETag'] != etag
+
+
+def test_clear_invalidates_every_scope_in_every_process(app):
+    this_process, other_process = ResponseCache(), ResponseCache()
+    builds = []
+
+    def get(cache, scope):
+        return cache.get_or_build(scope, 'key', lambda: builds.append(scope) or len(builds), str)
+
+    get(this_process, 'a'), get(this_process, 'b')
+    get(this_process, 'a'), get(this_process, 'b')
+    assert builds == ['a', 'b']
+
+    other_process.clear()
+    get(this_process, 'a'), get(this_process, 'b')
+    assert builds == ['a', 'b', 'a', 'b']
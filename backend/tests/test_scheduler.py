@@ -0,0 +1,77 @@
+from datetime import date, datetime, timedelta
+from models import db, Campaign, ScheduleRun
+from scheduler import CLAIM_TIMEOUT, Scheduler
+from sqlalchemy import func, select
+import campaign_summary
+
+AS_OF = date(2026, 3, 1)
+
+
+class RecordingAds:
+    """Stands in for GoogleAdsService: records the campaigns already claimed, as another
+    connection sees them, when set_campaign_statuses is called, and rejects `rejected`."""
+
+    def __init__(self, rejected=()):
+        self.rejected = set(rejected)
+        self.calls = []
+        self.claimed_during_call = []
+
+    def set_campaign_statuses(self, google_campaign_ids, status):
+        with db.engine.connect() as connection:
+            self.claimed_during_call = sorted(connection.execute(
+                select(Campaign.google_campaign_id).where(Campaign.schedule_claimed_at.isnot(None))
+            ).scalars())
+        self.calls.append((sorted(google_campaign_ids), status))
+        return {google_id: 'Rejected' for google_id in google_campaign_ids if google_id in self.rejected}
+
+
+def add_scheduled(count, start_date=AS_OF, **values):
+    campaigns = [
+        Campaign(name=f'Campaign {index}', objective='Sales', daily_budget=100, start_date=start_date,
+                 end_date=AS_OF + timedelta(days=30), status='SCHEDULED', google_campaign_id=f'G{index}', **values)
+        for index in range(count)
+    ]
+    db.session.add_all(campaigns)
+    db.session.commit()
+    campaign_summary.rebuild()
+    return [campaign.id for campaign in campaigns]
+
+
+def statuses():
+    db.session.expire_all()
+    return sorted((campaign.google_campaign_id, campaign.status, campaign.schedule_claimed_at)
+                  for campaign in Campaign.query)
+
+
+def test_claims_are_committed_before_the_rpc_and_released_after(app):
+    add_scheduled(3)
+    ads = RecordingAds(rejected={'G2'})
+    result = Scheduler(ads, app).run(AS_OF)
+
+    assert ads.calls == [(['G0', 'G1', 'G2'], 'ENABLED')]
+    assert ads.claimed_during_call == ['G0', 'G1', 'G2']
+    assert (result['activated'], result['failed']) == (2, 1)
+    # The rejected campaign stays due, unclaimed, for the next pass
+    assert statuses() == [('G0', 'PUBLISHED', None), ('G1', 'PUBLISHED', None), ('G2', 'SCHEDULED', None)]
+
+
+def test_campaigns_claimed_by_another_pass_are_skipped_until_the_claim_expires(app):
+    add_scheduled(1, schedule_claimed_at=datetime.utcnow())
+    ads = RecordingAds()
+    assert Scheduler(ads, app).run(AS_OF)['activated'] == 0
+    assert ads.calls == []
+
+    Campaign.query.update({'schedule_claimed_at': datetime.utcnow() - CLAIM_TIMEOUT - timedelta(minutes=1)})
+    db.session.commit()
+    assert Scheduler(ads, app).run(AS_OF)['activated'] == 1
+    assert statuses() == [('G0', 'PUBLISHED', None)]
+
+
+def test_passes_without_due_campaigns_write_no_run(app, statements):
+    add_scheduled(1, start_date=AS_OF + timedelta(days=1))
+    del statements[:]
+    result = Scheduler(RecordingAds(), app).run(AS_OF)
+
+    assert (result['id'], result['status'], result['activated']) == (None, 'SUCCEEDED', 0)
+    assert not [statement for statement in statements if 'schedule_runs' in statement]
+    assert db.session.scalar(select(func.count()).select_from(ScheduleRun)) == 0
@@ -0,0 +1,24 @@
+from datetime import date
+from flask import jsonify
+import flask.json.provider
+import uuid
+
+
+def no_stdlib_json(*args, **kwargs):
+    raise AssertionError('encoded with the stdlib json module')
+
+
+def test_jsonify_encodes_with_orjson(app, monkeypatch):
+    monkeypatch.setattr(flask.json.provider.json, 'dumps', no_stdlib_json)
+    campaign_id = uuid.uuid4()
+    with app.test_request_context():
+        body = jsonify({'id': campaign_id, 'start_date': date(2026, 1, 1), 'name': 'Campaign'}).get_data(as_text=True)
+    assert body == f'{{"id":"{campaign_id}","name":"Campaign","start_date":"2026-01-01"}}\n'
+
+
+def test_jsonify_indents_when_not_compact(app, monkeypatch):
+    monkeypatch.setattr(flask.json.provider.json, 'dumps', no_stdlib_json)
+    monkeypatch.setattr(app.json, 'compact', False)
+    with app.test_request_context():
+        body = jsonify(b=1, a=[1]).get_data(as_text=True)
+    assert body == '{\n  "a": [\n    1\n  ],\n  "b": 1\n}\n'
@@ -1,27 +1,49 @@
 import axios from 'axios';
-import { Campaign, CampaignFormData, AdGroup, AdGroupFormData } from './types';
+import { Campaign, CampaignFormData, CampaignSummary, CampaignListParams, AdGroup, AdGroupFormData, PublishJob, BulkStatusRequest, BulkStatusResponse, AdGroupBulkUpdateRequest, AdGroupBulkUpdateResponse } from './types';
 
 const API_BASE_URL = 'http://localhost:5000/api';
 
 const api = axios.create({
   baseURL: API_BASE_URL,
+  // Sends back the backend's read-your-writes cookie, which pins our reads to the primary database after a write
+  withCredentials: true,
 });
 
 // Campaign APIs
-export const getCampaigns = () => api.get<Campaign[]>('/campaigns');
+// Pages are keyset-based: pass the `x-next-cursor` header of one response as `cursor` to fetch the next.
+export const getCampaigns = (params?: CampaignListParams) => api.get<Campaign[]>('/campaigns', { params });
+export const getCampaignSummary = () => api.get<CampaignSummary>('/campaigns/summary');
 export const getCampaign = (id: string) => api.get<Campaign & { ad_groups: AdGroup[] }>(`/campaigns/${id}`);
 export const createCampaign = (data: CampaignFormData) => api.post<Campaign>('/campaigns', data);
-export const publishCampaign = (id: string) => api.post<Campaign>(`/campaigns/${id}/publish`);
+// Publishing is asynchronous: the API answers 202 with a PublishJob to poll (or 200 if already published).
+// Retrying with the same idempotency key returns the job of the first call instead of starting another.
+export const publishCampaign = (id: string, idempotencyKey?: string) =>
+  api.post<PublishJob>(`/campaigns/${id}/publish`, null, idempotencyKey ? { headers: { 'Idempotency-Key': idempotencyKey } } : undefined);
+export const getPublishJob = (id: string) => api.get<PublishJob>(`/publish-jobs/${id}`);
 export const pauseCampaign = (id: string) => api.post<Campaign>(`/campaigns/${id}/pause`);
 export const disableCampaign = (id: string) => api.post(`/campaigns/${id}/disable`);
+export const bulkCampaignStatus = (data: BulkStatusRequest) => api.post<BulkStatusResponse>('/campaigns:bulk-status', data);
 
 // Ad Group APIs
 export const getAdGroups = (campaignId: string) => api.get<AdGroup[]>(`/campaigns/${campaignId}/ad-groups`);
 export const getAdGroup = (id: string) => api.get<AdGroup>(`/ad-groups/${id}`);
 export const createAdGroup = (campaignId: string, data: AdGroupFormData) => api.post<AdGroup>(`/campaigns/${campaignId}/ad-groups`, data);
-export const updateAdGroup = (id: string, data: Partial<AdGroupFormData>) => api.put<AdGroup>(`/ad-groups/${id}`, data);
+// Pass the version the ad group was read at; the API answers 409 if it has changed since.
+export const updateAdGroup = (id: string, data: Partial<AdGroupFormData> & { version?: number }) => api.put<AdGroup>(`/ad-groups/${id}`, data);
+export const bulkUpdateAdGroups = (data: AdGroupBulkUpdateRequest) => api.patch<AdGroupBulkUpdateResponse>('/ad-groups', data);
 export const deleteAdGroup = (id: string) => api.delete(`/ad-groups/${id}`);
 export const pauseAdGroup = (id: string) => api.post<AdGroup>(`/ad-groups/${id}/pause`);
 export const enableAdGroup = (id: string) => api.post<AdGroup>(`/ad-groups/${id}/enable`);
+export const bulkAdGroupStatus = (data: BulkStatusRequest) => api.post<BulkStatusResponse>('/ad-groups:bulk-status', data);
+
+// Poll a publish job until it finishes; rejects with the job error if it FAILED.
+export const waitForPublishJob = async (jobId: string, intervalMs = 1000): Promise<PublishJob> => {
+  for (;;) {
+    const { data: job } = await getPublishJob(jobId);
+    if (job.status === 'SUCCEEDED') return job;
+    if (job.status === 'FAILED') throw { response: { data: { error: job.error } } };
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+  }
+};
 
 export default api;
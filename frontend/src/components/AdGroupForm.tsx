@@ -72,7 +72,7 @@ export default function AdGroupForm({ campaign, adGroup, onCancel, onSuccess }:
     
     try {
       if (isEditing && adGroup) {
-        await updateAdGroup(adGroup.id, formData);
+        await updateAdGroup(adGroup.id, { ...formData, version: adGroup.version });
         toast.success('Ad group updated successfully!');
       } else {
         await createAdGroup(campaign.id, formData);
@@ -199,7 +199,7 @@ export default function AdGroupForm({ campaign, adGroup, onCancel, onSuccess }:
                 rows={4}
               />
               <p className="text-xs text-text-muted mt-1">
-                Keywords trigger your ads. Use commas to separate multiple keywords.
+                Keywords trigger your ads. Use commas to separate multiple keywords; wrap a keyword in "quotes" for phrase match or [brackets] for exact match.
               </p>
             </div>
 
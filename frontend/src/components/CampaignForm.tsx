@@ -1,6 +1,6 @@
 import { useState, ChangeEvent } from 'react';
 import { ChevronLeft, Rocket, Info, Wand2 } from 'lucide-react';
-import { createCampaign, publishCampaign } from '../api';
+import { createCampaign, publishCampaign, waitForPublishJob } from '../api';
 import toast from 'react-hot-toast';
 import confetti from 'canvas-confetti';
 import { CampaignFormData } from '../types';
@@ -89,7 +89,10 @@ export default function CampaignForm({ onCancel, onSuccess }: CampaignFormProps)
       // 2. Publish if requested
       if (publishNow) {
         toast.loading('Pushing to Google Ads...', { id: toastId });
-        await publishCampaign(campaignId);
+        const publishRes = await publishCampaign(campaignId);
+        if (publishRes.status === 202) {
+          await waitForPublishJob(publishRes.data.id);
+        }
         confetti({
           particleCount: 150,
           spread: 70,
@@ -1,10 +1,10 @@
 import { useState, useEffect, MouseEvent } from 'react';
 import { Plus, Rocket, CheckCircle, DollarSign, LayoutGrid, List as ListIcon, BarChart3, PauseCircle, TrendingUp, Layers } from 'lucide-react';
-import { getCampaigns, publishCampaign, pauseCampaign } from '../api';
+import { getCampaigns, getCampaignSummary, publishCampaign, pauseCampaign, waitForPublishJob } from '../api';
 import toast from 'react-hot-toast';
 import confetti from 'canvas-confetti';
 import { motion } from 'framer-motion';
-import { Campaign } from '../types';
+import { Campaign, CampaignSummary } from '../types';
 
 interface CampaignListProps {
   onNewCampaign: () => void;
@@ -13,9 +13,12 @@ interface CampaignListProps {
 
 export default function CampaignList({ onNewCampaign, onViewAdGroups }: CampaignListProps) {
   const [campaigns, setCampaigns] = useState<Campaign[]>([]);
+  const [summary, setSummary] = useState<CampaignSummary | null>(null);
   const [loading, setLoading] = useState(true);
   const [processing, setProcessing] = useState<string | null>(null); 
   const [viewMode, setViewMode] = useState<'grid' | 'list'>('grid'); 
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchCampaigns();
@@ -23,8 +26,10 @@ export default function CampaignList({ onNewCampaign, onViewAdGroups }: Campaign
 
   const fetchCampaigns = async () => {
     try {
-      const response = await getCampaigns();
+      const [response, summaryResponse] = await Promise.all([getCampaigns(), getCampaignSummary()]);
       setCampaigns(response.data);
+      setSummary(summaryResponse.data);
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch {
       toast.error("Failed to fetch campaigns");
     } finally {
@@ -32,10 +37,26 @@ export default function CampaignList({ onNewCampaign, onViewAdGroups }: Campaign
     }
   };
 
+  const fetchMoreCampaigns = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await getCampaigns({ cursor: nextCursor });
+      setCampaigns(prev => [...prev, ...response.data]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+    } catch {
+      toast.error("Failed to fetch campaigns");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handlePublish = async (id: string, e?: MouseEvent) => {
     if(e) e.stopPropagation();
     setProcessing(id);
-    const promise = publishCampaign(id);
+    const promise = publishCampaign(id).then(response =>
+      response.status === 202 ? waitForPublishJob(response.data.id) : response.data
+    );
     
     toast.promise(promise, {
       loading: 'Connecting to Google Ads...',
@@ -80,9 +101,9 @@ export default function CampaignList({ onNewCampaign, onViewAdGroups }: Campaign
     }
   };
 
-  // Stats
-  const totalSpend = campaigns.reduce((acc, c) => acc + (c.daily_budget || 0), 0);
-  const activeCount = campaigns.filter(c => c.status === 'PUBLISHED').length;
+  // Stats (totals over every campaign, not just the pages loaded)
+  const totalSpend = summary?.daily_budget ?? 0;
+  const activeCount = summary?.by_status.PUBLISHED?.campaigns ?? 0;
   
   // Calculate Avg ROAS for active campaigns
   const activeCampaigns = campaigns.filter(c => c.roas !== undefined && c.roas > 0);
@@ -105,7 +126,7 @@ export default function CampaignList({ onNewCampaign, onViewAdGroups }: Campaign
         <StatsCard 
           icon={<BarChart3 />} 
           title="Total Campaigns" 
-          value={campaigns.length} 
+          value={summary?.campaigns ?? campaigns.length} 
           sub="All time"
         />
         <StatsCard 
@@ -244,6 +265,14 @@ export default function CampaignList({ onNewCampaign, onViewAdGroups }: Campaign
                </table>
             </div>
           )}
+
+          {nextCursor && (
+            <div className="flex justify-center mt-8">
+              <button onClick={fetchMoreCampaigns} disabled={loadingMore} className="btn btn-secondary">
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
         </>
       )}
     </div>
@@ -385,6 +414,12 @@ function StatusBadge({ status }: { status: string }) {
   } else if (status === 'PAUSED') {
     styleClass = 'status-draft'; 
     dotColor = 'bg-yellow-500';
+  } else if (status === 'SCHEDULED') {
+    styleClass = 'status-draft';
+    dotColor = 'bg-blue-400';
+  } else if (status === 'ENDED') {
+    styleClass = 'status-draft';
+    dotColor = 'bg-slate-600';
   }
 
   return (
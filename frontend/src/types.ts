@@ -6,7 +6,7 @@ export interface Campaign {
   daily_budget: number;
   start_date: string;
   end_date: string;
-  status: 'DRAFT' | 'PUBLISHED' | 'PAUSED';
+  status: 'DRAFT' | 'PUBLISHING' | 'SCHEDULED' | 'PUBLISHED' | 'PAUSED' | 'ENDED';
   google_campaign_id?: string;
   ad_group_name?: string;
   ad_headline?: string;
@@ -24,6 +24,19 @@ export interface Campaign {
   roas?: number;
 }
 
+export interface SummaryCounts {
+  campaigns: number;
+  daily_budget: number;
+  ad_groups: number;
+}
+
+export interface CampaignSummary extends SummaryCounts {
+  ad_groups_per_campaign: number;
+  by_status: Record<string, SummaryCounts>;
+  by_objective: Record<string, SummaryCounts>;
+  by_bidding_strategy: Record<string, SummaryCounts>;
+}
+
 export interface CampaignFormData {
   name: string;
   objective: string;
@@ -39,6 +52,27 @@ export interface CampaignFormData {
   bidding_strategy?: string;
 }
 
+export interface PublishJob {
+  id: string;
+  campaign_id: string;
+  status: 'PENDING' | 'RUNNING' | 'SUCCEEDED' | 'FAILED';
+  error?: string;
+  google_campaign_id?: string;
+  attempts: number;
+  created_at: string;
+  started_at?: string;
+  finished_at?: string;
+}
+
+export interface CampaignListParams {
+  limit?: number;
+  cursor?: string;
+  status?: string;
+  objective?: string;
+  campaign_type?: string;
+  fields?: string;
+}
+
 export interface AdGroup {
   id: string;
   campaign_id: string;
@@ -58,6 +92,7 @@ export interface AdGroup {
   google_ad_group_id?: string;
   created_at: string;
   updated_at?: string;
+  version: number;
 }
 
 export interface AdGroupFormData {
@@ -74,3 +109,27 @@ export interface AdGroupFormData {
   final_url?: string;
   display_url?: string;
 }
+
+export interface BulkStatusRequest {
+  status: string;
+  ids?: string[];
+  filter?: Record<string, string | string[]>;
+}
+
+export interface BulkStatusResponse {
+  status: string;
+  counts: Record<string, number>;
+  results: { id: string; outcome: 'updated' | 'unchanged' | 'skipped' | 'failed' | 'not_found'; error?: string }[];
+}
+
+export interface AdGroupBulkUpdateRequest {
+  changes: Partial<AdGroupFormData> & { status?: AdGroup['status'] };
+  ids?: string[];
+  items?: { id: string; version: number }[];
+}
+
+export interface AdGroupBulkUpdateResponse {
+  updated: { id: string; version: number }[];
+  conflicts: string[];
+  not_found: string[];
+}